@@ -0,0 +1,171 @@
+"""
+Per-request latency with new, persistent and pooled database connections.
+
+Each mode runs in its own process, configured through the same DB_* settings
+as production, and serves GET /api/products/ requests through:
+
+- ``asgi``: the ASGI app, as gunicorn's uvicorn workers run it. Every request
+  runs its sync code in a fresh thread, so CONN_MAX_AGE alone cannot reuse
+  connections and only the pool avoids a connect per request.
+- ``threads``: a fixed pool of threads calling the WSGI handler, as WSGI
+  servers and the job worker do, where CONN_MAX_AGE applies.
+
+``connects`` counts real connections opened. Against PostgreSQL (DB_HOST
+set, USE_SQLITE=false) the connect cost is the real handshake; the ``pool``
+mode needs psycopg[pool]. On SQLite ``--connect-delay`` stands in for the
+network round trips and authentication of a remote server.
+
+Usage:
+    python -m benchmarks.bench_db_connections --requests 2000 --concurrency 8
+    USE_SQLITE=false DB_HOST=... python -m benchmarks.bench_db_connections --modes per_request pool
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    'per_request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'false'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'false'},
+    'pool': {'DB_POOL': 'true'},
+}
+
+
+def count_connects(database, delay):
+    """Wrap the driver's connect so every real connection is counted and costs ``delay`` seconds."""
+    counter = {'connects': 0}
+    lock = threading.Lock()
+
+    def wrap(connect):
+        def counted(*args, **kwargs):
+            with lock:
+                counter['connects'] += 1
+            if delay:
+                time.sleep(delay)
+            return connect(*args, **kwargs)
+        return counted
+
+    database.connect = wrap(database.connect)
+    if database.__name__ == 'psycopg':
+        # psycopg_pool opens connections through the class, not the module function
+        database.Connection.connect = wrap(database.Connection.connect)
+    return counter
+
+
+def serve_asgi(args, url):
+    import httpx
+    from django.core.asgi import get_asgi_application
+
+    async def run():
+        transport = httpx.ASGITransport(app=get_asgi_application())
+        async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def one(_):
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    assert response.status_code == 200, response.status_code
+                    return (time.perf_counter() - started) * 1000
+
+            return await asyncio.gather(*(one(i) for i in range(args.requests)))
+
+    return asyncio.run(run())
+
+
+def serve_threads(args, url):
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+
+    # The WSGI handler itself: django.test.Client keeps connections open across requests
+    app = get_wsgi_application()
+    environ = RequestFactory().get(url).environ
+
+    def one(_):
+        started = time.perf_counter()
+        status = []
+        response = app(dict(environ), lambda code, headers: status.append(code))
+        b''.join(response)
+        response.close()
+        assert status[0].startswith('200'), status[0]
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return list(pool.map(one, range(args.requests)))
+
+
+def run_mode(args, sqlite_file):
+    """Child process: serve ``args.requests`` requests and print latency and connects as JSON."""
+    from benchmarks.common import seed_products, setup_django, summarize, teardown_django
+
+    connection = setup_django(sqlite_file=sqlite_file)
+    try:
+        seed_products(1000)
+        # Setup ran on this thread's connection; start measuring from a closed one
+        connection.close()
+        counter = count_connects(connection.Database, args.connect_delay / 1000)
+        serve = serve_asgi if args.server == 'asgi' else serve_threads
+
+        started = time.perf_counter()
+        samples = serve(args, '/api/products/?per_page=20')
+        elapsed = time.perf_counter() - started
+        print(json.dumps({
+            'database': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'pooled': 'pool' in connection.settings_dict['OPTIONS'],
+            'connects': counter['connects'],
+            'requests_per_sec': round(args.requests / elapsed, 1),
+            **summarize(samples),
+        }))
+    finally:
+        if 'pool' in connection.settings_dict['OPTIONS']:
+            connection.close_pool()
+        teardown_django(connection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--server', choices=['asgi', 'threads'], default='asgi')
+    parser.add_argument('--connect-delay', type=float, default=0.0, help='Milliseconds added to every connect')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=None)
+    parser.add_argument('--child', choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument('--sqlite-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args, args.sqlite_file)
+        return
+
+    sqlite = os.environ.get('USE_SQLITE', 'true').lower() == 'true'
+    modes = args.modes or [mode for mode in MODES if not (sqlite and mode == 'pool')]
+    results = {
+        'server': args.server,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'connect_delay_ms': args.connect_delay,
+    }
+    with tempfile.TemporaryDirectory() as db_dir:
+        for mode in modes:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_db_connections', '--child', mode,
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+                 '--server', args.server, '--connect-delay', str(args.connect_delay),
+                 # SQLite: a file, since Django never closes in-memory test databases
+                 '--sqlite-file', os.path.join(db_dir, f'{mode}.sqlite3')],
+                env={**os.environ, **MODES[mode], 'DB_POOL_MAX_SIZE': str(args.concurrency)},
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Time bulk import and streaming export of products.
+
+Usage: python -m benchmarks.bench_import --rows 100000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import setup_django, teardown_django
+
+
+def ndjson_body(rows):
+    return '\n'.join(json.dumps({
+        'name': f'Bot {i}',
+        'description': f'Imported product number {i}',
+        'bot_username': f'bot_{i}',
+        'contract_months': i % 12 + 1,
+        'contract_start_date': '2026-01-01T00:00:00Z',
+        'customer_telegram': f'@customer_{i % 5000}',
+    }) for i in range(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    connection = setup_django()
+    try:
+        from django.test import Client
+
+        client = Client()
+        body = ndjson_body(args.rows)
+
+        started = time.perf_counter()
+        response = client.post('/api/products/import/', body, content_type='application/x-ndjson')
+        import_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exported = sum(chunk.count(b'\n') for chunk in client.get('/api/products/export/?output=csv'))
+        export_seconds = time.perf_counter() - started
+
+        print(json.dumps({
+            'rows': args.rows,
+            'import': {**response.json(), 'seconds': round(import_seconds, 2),
+                       'rows_per_sec': round(args.rows / import_seconds)},
+            'export_csv': {'lines': exported, 'seconds': round(export_seconds, 2)},
+        }, indent=2))
+    finally:
+        teardown_django(connection)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Request throughput with logging off, synchronous, and queued.
+
+Each mode runs in its own process, configured through the same LOG_*
+settings as production. Worker threads issue GET /api/products/ requests and
+emit ``--lines`` INFO records per request from the request thread, as
+request-scoped logging would. Console output goes to /dev/null and the log
+file to a temporary directory.
+
+Usage: python -m benchmarks.bench_logging --requests 2000 --threads 8 --lines 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    'off': {'LOG_LEVEL': 'CRITICAL', 'LOG_QUEUE': 'false'},
+    'sync_text': {'LOG_LEVEL': 'INFO', 'LOG_QUEUE': 'false', 'LOG_FORMAT': 'text'},
+    'sync_json': {'LOG_LEVEL': 'INFO', 'LOG_QUEUE': 'false', 'LOG_FORMAT': 'json'},
+    'queue_text': {'LOG_LEVEL': 'INFO', 'LOG_QUEUE': 'true', 'LOG_FORMAT': 'text'},
+    'queue_json': {'LOG_LEVEL': 'INFO', 'LOG_QUEUE': 'true', 'LOG_FORMAT': 'json'},
+}
+
+
+def run_mode(args):
+    """Child process: serve ``args.requests`` requests and print throughput as JSON."""
+    import logging
+
+    from benchmarks.common import seed_products, setup_django, summarize, teardown_django
+
+    connection = setup_django()
+    try:
+        from django.test import Client
+
+        seed_products(1000)
+        logger = logging.getLogger('benchmarks.request')
+
+        def one(i):
+            started = time.perf_counter()
+            logger.info('request started', extra={'request_no': i})
+            response = Client().get('/api/products/', {'page_size': 20})
+            for line in range(args.lines - 1):
+                logger.info('request step %d of %d', line, args.lines, extra={'request_no': i})
+            assert response.status_code == 200
+            return (time.perf_counter() - started) * 1000
+
+        one(0)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            samples = list(pool.map(one, range(args.requests)))
+        elapsed = time.perf_counter() - started
+        # Let a queued listener finish so the next mode starts on an idle machine
+        logging.shutdown()
+        print(json.dumps({
+            'requests_per_sec': round(args.requests / elapsed, 1),
+            **summarize(samples),
+        }))
+    finally:
+        teardown_django(connection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--lines', type=int, default=5, help='INFO records logged per request')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--child', choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args)
+        return
+
+    results = {'requests': args.requests, 'threads': args.threads, 'lines_per_request': args.lines}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode in args.modes:
+            env = {**os.environ, **MODES[mode], 'LOG_FILE': os.path.join(log_dir, f'{mode}.log')}
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_logging', '--child', mode,
+                 '--requests', str(args.requests), '--threads', str(args.threads), '--lines', str(args.lines)],
+                env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare page-number (COUNT + OFFSET) and cursor pagination at increasing depth.
+
+Usage: python -m benchmarks.bench_pagination --rows 500000 --pages 1 100 1000 10000
+"""
+import argparse
+import json
+
+from benchmarks.common import seed_products, setup_django, summarize, teardown_django, timed
+
+
+def cursor_for_page(page_number, per_page):
+    """Build the cursor a client would hold after walking to ``page_number``."""
+    from products.models import Product
+    from products.pagination import ProductPagination
+
+    if page_number == 1:
+        return ''
+    last = Product.objects.order_by(*ProductPagination.ordering)[(page_number - 1) * per_page - 1]
+    return ProductPagination().encode_cursor(page_number, last.created_at, last.pk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 1000, 10000])
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    connection = setup_django()
+    try:
+        from django.test import Client
+
+        seed_products(args.rows)
+        client = Client()
+        results = {'rows': args.rows, 'per_page': args.per_page, 'pages': {}}
+        for page in args.pages:
+            if (page - 1) * args.per_page >= args.rows:
+                continue
+            cursor = cursor_for_page(page, args.per_page)
+            offset_url = f'/api/products/?page={page}&per_page={args.per_page}'
+            cursor_url = f'/api/products/?cursor={cursor}&per_page={args.per_page}'
+            results['pages'][page] = {
+                'offset': summarize(timed(lambda: client.get(offset_url), args.iterations)),
+                'cursor': summarize(timed(lambda: client.get(cursor_url), args.iterations)),
+            }
+        print(json.dumps(results, indent=2))
+    finally:
+        teardown_django(connection)
+
+
+if __name__ == '__main__':
+    main()
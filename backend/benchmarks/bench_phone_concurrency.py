@@ -0,0 +1,87 @@
+"""
+Concurrency scaling of /api/phone/check against a slow stand-in registry.
+
+Compares four blocking sync workers (the old gunicorn setup) with a single
+ASGI worker serving the async views in-process.
+
+Usage: python -m benchmarks.bench_phone_concurrency --delay 0.2 --levels 1 10 50 100
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+import httpx
+
+from benchmarks import common  # noqa: F401  (sets DJANGO_SETTINGS_MODULE)
+
+
+def sync_workers(level, workers):
+    """Each request blocks one of ``workers`` threads for the full round trip."""
+    from django.test import Client
+
+    def one(i):
+        return Client().post(
+            '/api/phone/check', {'phone_number': f'+1555{i:07d}'}, content_type='application/json'
+        ).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(one, range(level)))
+    return time.perf_counter() - started, statuses
+
+
+async def asgi_worker(application, level):
+    """All requests are in flight at once on one event loop."""
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post('/api/phone/check', json={'phone_number': f'+1555{i:07d}'})
+            for i in range(level)
+        ))
+        return time.perf_counter() - started, [response.status_code for response in responses]
+
+
+def report(level, elapsed, statuses):
+    return {
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(level / elapsed, 1),
+        'errors': sum(1 for code in statuses if code != 200),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay', type=float, default=0.2, help='Registry latency in seconds')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 10, 50, 100])
+    parser.add_argument('--sync-workers', type=int, default=4)
+    args = parser.parse_args()
+
+    django.setup()
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from phone_registry.client import registry_client
+    from phone_registry.stub import StubRegistry
+
+    # Both runs check the same numbers; every check must reach the registry
+    settings.PHONE_CHECK_CACHE_BACKEND = 'none'
+    settings.PHONE_MIRROR_ENABLED = False
+
+    application = get_asgi_application()
+    results = {'registry_delay_s': args.delay, 'levels': {}}
+    with StubRegistry(delay=args.delay) as stub:
+        settings.PHONE_REGISTRY_URL = stub.url
+        for level in args.levels:
+            results['levels'][level] = {
+                f'sync_{args.sync_workers}_workers': report(level, *sync_workers(level, args.sync_workers)),
+                'asgi_1_worker': report(level, *asyncio.run(asgi_worker(application, level))),
+            }
+        registry_client.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
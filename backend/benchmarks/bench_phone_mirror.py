@@ -0,0 +1,79 @@
+"""
+Phone check latency: the registry vs the local mirror.
+
+Checks numbers one at a time through PhoneRegistryService against a local
+stand-in registry (``--delay`` adds its latency) with the check cache off:
+
+- remote: mirror disabled, every check is a registry call;
+- local_hit: numbers we registered, answered from the mirror table;
+- local_negative: unknown numbers after a full sync, ruled out by the Bloom filter
+  plus one index probe confirming the filter is current.
+
+Usage: python -m benchmarks.bench_phone_mirror --numbers 10000 --checks 2000 --delay 0.02
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import django
+
+from benchmarks import common
+
+
+async def timed_checks(service, numbers):
+    samples = []
+    for number in numbers:
+        started = time.perf_counter()
+        await service.check_phone(number)
+        samples.append((time.perf_counter() - started) * 1000)
+    return common.summarize(samples)
+
+
+async def run(args, settings):
+    from phone_registry.mirror import get_mirror
+    from phone_registry.services import PhoneRegistryService
+
+    service = PhoneRegistryService()
+    registered = [f'+1555{i:07d}' for i in range(args.numbers)]
+    unknown = [f'+1666{i:07d}' for i in range(args.checks)]
+    sample = registered[::max(1, args.numbers // args.checks)][:args.checks]
+
+    settings.PHONE_MIRROR_ENABLED = False
+    remote = await timed_checks(service, sample)
+
+    settings.PHONE_MIRROR_ENABLED = True
+    for start in range(0, len(registered), 1000):
+        await service.bulk_register_phones(registered[start:start + 1000])
+    await service.sync_mirror()
+    local_hit = await timed_checks(service, sample)
+    local_negative = await timed_checks(service, unknown)
+    return {'remote': remote, 'local_hit': local_hit, 'local_negative': local_negative, 'mirror': get_mirror().info()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--numbers', type=int, default=10000, help='Numbers registered before checking')
+    parser.add_argument('--checks', type=int, default=2000, help='Checks per scenario')
+    parser.add_argument('--delay', type=float, default=0.0, help='Registry latency in seconds')
+    args = parser.parse_args()
+
+    django.setup()
+    from django.conf import settings
+    from phone_registry.client import registry_client
+    from phone_registry.stub import StubRegistry
+
+    settings.PHONE_CHECK_CACHE_BACKEND = 'none'
+    connection = common.setup_django()
+    try:
+        with StubRegistry(delay=args.delay) as stub:
+            settings.PHONE_REGISTRY_URL = stub.url
+            results = asyncio.run(run(args, settings))
+            registry_client.close()
+    finally:
+        common.teardown_django(connection)
+    print(json.dumps({'numbers': args.numbers, 'delay': args.delay, **results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
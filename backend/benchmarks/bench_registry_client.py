@@ -0,0 +1,67 @@
+"""
+Requests/sec against a local stand-in registry: one client per call vs the pooled client.
+
+Usage: python -m benchmarks.bench_registry_client --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import django
+import httpx
+
+from benchmarks import common  # noqa: F401  (sets DJANGO_SETTINGS_MODULE)
+
+
+async def legacy_check(base_url, phone_number):
+    # What every PhoneRegistryService method used to do
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f'{base_url}/api/phone/check', json={'phone_number': phone_number}, timeout=10.0
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def drive(func, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await func(f'+1555{i:07d}')
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    return {'seconds': round(elapsed, 3), 'requests_per_sec': round(total / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    django.setup()
+    from django.conf import settings
+    from phone_registry.client import registry_client
+    from phone_registry.services import PhoneRegistryService
+    from phone_registry.stub import StubRegistry
+
+    with StubRegistry() as stub:
+        settings.PHONE_REGISTRY_URL = stub.url
+        service = PhoneRegistryService()
+        results = {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'per_call_client': asyncio.run(
+                drive(lambda number: legacy_check(stub.url, number), args.requests, args.concurrency)
+            ),
+            'pooled_client': asyncio.run(drive(service.check_phone, args.requests, args.concurrency)),
+        }
+        registry_client.close()
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare the legacy icontains search with the indexed search backend.
+
+Uses PostgreSQL when USE_SQLITE=false, otherwise SQLite with FTS5.
+Usage: python -m benchmarks.bench_search --rows 100000 --terms "Bot 4242" cosmic_news weather zzz
+"""
+import argparse
+import json
+
+from benchmarks.common import seed_products, setup_django, summarize, teardown_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--terms', nargs='+', default=['Bot 4242', 'cosmic_news', 'weather', 'zzz'])
+    args = parser.parse_args()
+
+    connection = setup_django()
+    try:
+        from products.models import Product
+        from products.search import icontains_filter, search_products
+
+        seed_products(args.rows)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE products')
+
+        def page(queryset):
+            return lambda: list(queryset[:args.per_page])
+
+        results = {'rows': args.rows, 'vendor': connection.vendor, 'terms': {}}
+        for term in args.terms:
+            legacy = icontains_filter(Product.objects.all(), term)
+            indexed = search_products(Product.objects.all(), term)
+            results['terms'][term] = {
+                'matches': indexed.count(),
+                'legacy': summarize(timed(page(legacy), args.iterations)),
+                'indexed': summarize(timed(page(indexed), args.iterations)),
+            }
+        print(json.dumps(results, indent=2))
+    finally:
+        teardown_django(connection)
+
+
+if __name__ == '__main__':
+    main()
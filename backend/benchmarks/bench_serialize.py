@@ -0,0 +1,69 @@
+"""
+Compare serialize + render time per list page: ProductSerializer + JSONRenderer
+against values() rows + RowSerializer + FastJSONRenderer.
+
+Usage: python -m benchmarks.bench_serialize --rows 5000 --per-page 100
+"""
+import argparse
+import json
+
+from benchmarks.common import seed_products, setup_django, summarize, teardown_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    connection = setup_django()
+    try:
+        from rest_framework.renderers import JSONRenderer
+
+        from products.models import Product
+        from products.renderers import FastJSONRenderer, orjson
+        from products.rows import RowSerializer
+        from products.serializers import ProductSerializer
+
+        seed_products(args.rows)
+        objects = list(Product.objects.all()[:args.per_page])
+        rows = RowSerializer(ProductSerializer)
+        values = list(Product.objects.values(*rows.sources)[:args.per_page])
+
+        def drf():
+            return JSONRenderer().render(ProductSerializer(objects, many=True).data)
+
+        def fast():
+            return FastJSONRenderer().render(rows.many(values))
+
+        assert drf() == fast(), 'fast read path output differs from ProductSerializer'
+        results = {
+            'per_page': args.per_page,
+            'orjson': orjson is not None,
+            'serialize_render': {
+                'drf': summarize(timed(drf, args.iterations)),
+                'fast': summarize(timed(fast, args.iterations)),
+            },
+            'query_and_render': {
+                'drf': summarize(timed(
+                    lambda: JSONRenderer().render(
+                        ProductSerializer(Product.objects.all()[:args.per_page], many=True).data
+                    ),
+                    args.iterations,
+                )),
+                'fast': summarize(timed(
+                    lambda: FastJSONRenderer().render(
+                        rows.many(Product.objects.values(*rows.sources)[:args.per_page])
+                    ),
+                    args.iterations,
+                )),
+            },
+        }
+        print(json.dumps(results, indent=2))
+    finally:
+        teardown_django(connection)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the legacy five-query stats endpoint with the aggregated, cached one.
+
+Usage: python -m benchmarks.bench_stats --rows 100000 --iterations 200
+"""
+import argparse
+import json
+from datetime import timedelta
+
+from benchmarks.common import seed_products, setup_django, summarize, teardown_django, timed
+
+
+def legacy_stats():
+    from django.utils import timezone
+    from products.models import Product, ProductStatus
+
+    now = timezone.now()
+    seven_days = now + timedelta(days=7)
+    thirty_days = now + timedelta(days=30)
+    not_expired = [ProductStatus.ACTIVE, ProductStatus.EXPIRING_SOON]
+    return {
+        'total_products': Product.objects.count(),
+        'active_products': Product.objects.filter(status=ProductStatus.ACTIVE).count(),
+        'expired_products': Product.objects.filter(status=ProductStatus.EXPIRED).count(),
+        'expiring_in_7_days': Product.objects.filter(
+            contract_end_date__lte=seven_days, contract_end_date__gte=now, status__in=not_expired
+        ).count(),
+        'expiring_in_30_days': Product.objects.filter(
+            contract_end_date__lte=thirty_days, contract_end_date__gte=now, status__in=not_expired
+        ).count(),
+    }
+
+
+def count_queries(connection, func) -> int:
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    return len(ctx.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    connection = setup_django()
+    try:
+        from django.core.cache import cache
+        from products.services import compute_dashboard_stats, get_dashboard_stats
+
+        seed_products(args.rows)
+        cache.clear()
+
+        results = {'rows': args.rows}
+        for name, func in [
+            ('legacy', legacy_stats),
+            ('aggregate', compute_dashboard_stats),
+            ('cached', get_dashboard_stats),
+        ]:
+            cache.clear()
+            queries = count_queries(connection, func)
+            results[name] = {'queries_first_call': queries, **summarize(timed(func, args.iterations))}
+        print(json.dumps(results, indent=2))
+    finally:
+        teardown_django(connection)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Time the set-based status refresh against a table of stale statuses.
+
+Usage: python -m benchmarks.bench_status_refresh --rows 1000000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import seed_products, setup_django, teardown_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    connection = setup_django()
+    try:
+        from products.models import Product, ProductStatus
+        from products.services import refresh_statuses
+
+        seed_products(args.rows)
+        # Simulate rows nobody has saved since their contracts ran out
+        Product.objects.update(status=ProductStatus.ACTIVE)
+
+        started = time.perf_counter()
+        changed = refresh_statuses()
+        first_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        refresh_statuses()
+        steady_ms = (time.perf_counter() - started) * 1000
+
+        print(json.dumps({
+            'rows': args.rows,
+            'changed': changed,
+            'first_refresh_ms': round(first_ms, 1),
+            'steady_state_refresh_ms': round(steady_ms, 1),
+        }, indent=2))
+    finally:
+        teardown_django(connection)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway test database so they never touch the
+development data in db.sqlite3. Run them from the backend directory, e.g.
+``python -m benchmarks.bench_stats --rows 100000``.
+"""
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+os.environ.setdefault('USE_SQLITE', 'true')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+
+def setup_django(sqlite_file=None):
+    """
+    Configure Django and create an isolated test database.
+
+    SQLite test databases live in shared-cache memory, where concurrent
+    writers fail at once with "table is locked" instead of waiting; pass
+    ``sqlite_file`` to use a file like production does.
+    """
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    if sqlite_file and connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = sqlite_file
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, keepdb=False)
+    return connection
+
+
+def teardown_django(connection):
+    connection.creation.destroy_test_db(connection.settings_dict['NAME'], verbosity=0)
+
+
+def seed_products(count: int, batch_size: int = 5000):
+    """Insert ``count`` generated products (see products.seeding)."""
+    from products.seeding import seed_products as seed
+
+    seed(count, batch_size=batch_size)
+
+
+def timed(func, iterations: int) -> list:
+    """Call ``func`` repeatedly and return the latency of each call in ms."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+    }
+
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,229 @@
+"""
+Scripted load scenarios against the API, reported as JSON.
+
+By default the API runs in-process (ASGI) on a throwaway test database
+seeded with ``--rows`` generated products, talking to phone_registry.stub
+as the registry. Pass ``--url`` to load a running server instead: seed it
+with ``manage.py seed_products`` and point PHONE_REGISTRY_URL at
+``python -m phone_registry.stub``.
+
+Each scenario runs ``--concurrency`` virtual users for ``--duration``
+seconds. Save a run with ``--output`` and pass it as ``--baseline`` on a
+later commit to get the relative change in throughput and latency.
+
+Usage:
+    python -m benchmarks.load --rows 100000 --duration 10 --concurrency 16
+    python -m benchmarks.load --scenarios search stats_polling --output after.json --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import django
+import httpx
+
+from benchmarks.common import setup_django, summarize, teardown_django
+
+
+async def list_paging(client, user):
+    """Walk the product list with keyset cursors, starting over after 20 pages."""
+    response = await client.get('/api/products/', params={'cursor': user.get('cursor', ''), 'per_page': 50})
+    cursor = response.json().get('next_cursor') if response.status_code == 200 else None
+    user['pages'] = user.get('pages', 0) + 1
+    if not cursor or user['pages'] >= 20:
+        cursor, user['pages'] = '', 0
+    user['cursor'] = cursor
+    return response
+
+
+async def search(client, user):
+    from products.seeding import ADJECTIVES, NOUNS
+
+    rng = user['rng']
+    term = rng.choice([rng.choice(NOUNS), f'{rng.choice(ADJECTIVES)}_{rng.choice(NOUNS)}'])
+    return await client.get('/api/products/', params={'search': term, 'per_page': 20})
+
+
+async def stats_polling(client, user):
+    """Dashboard tabs polling stats with If-None-Match, as the frontend does."""
+    headers = {'If-None-Match': user['etag']} if user.get('etag') else {}
+    response = await client.get('/api/products/stats/', headers=headers)
+    user['etag'] = response.headers.get('ETag', user.get('etag'))
+    return response
+
+
+async def renew_storm(client, user):
+    product_id = user['rng'].choice(user['ids'])
+    return await client.post(f'/api/products/{product_id}/renew/', params={'months': 1})
+
+
+async def bulk_phone(client, user):
+    """Stream a CSV of new numbers through the bulk registration pipeline."""
+    start = user['rng'].randrange(10 ** 9)
+    body = '\n'.join(f'+1{start + i:010d}' for i in range(user['phone_batch']))
+    response = await client.post(
+        '/api/phone/bulk-register/stream', content=body, headers={'Content-Type': 'text/csv'},
+    )
+    if response.status_code == 200 and any(
+        json.loads(line).get('failed') for line in response.text.splitlines() if line
+    ):
+        response.status_code = 502
+    return response
+
+
+SCENARIOS = {
+    'list_paging': list_paging,
+    'search': search,
+    'stats_polling': stats_polling,
+    'renew_storm': renew_storm,
+    'bulk_phone': bulk_phone,
+}
+
+
+async def sample_ids(client, limit=1000):
+    """Product ids for write scenarios, read through the API like any client."""
+    ids, cursor = [], ''
+    while len(ids) < limit:
+        response = await client.get('/api/products/', params={'cursor': cursor, 'per_page': 100, 'fields': 'id'})
+        page = response.json()
+        ids.extend(product['id'] for product in page['products'])
+        cursor = page.get('next_cursor')
+        if not cursor:
+            break
+    return ids
+
+
+async def run_scenario(client, scenario, args, ids):
+    latencies = []
+    statuses = Counter()
+    deadline = time.perf_counter() + args.duration
+
+    async def virtual_user(number):
+        user = {'rng': random.Random(args.seed + number), 'ids': ids, 'phone_batch': args.phone_batch}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = (await scenario(client, user)).status_code
+            except httpx.HTTPError:
+                status = 'error'
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(number) for number in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'errors': sum(count for status, count in statuses.items() if status == 'error' or status >= 400),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        **summarize(latencies),
+        'max_ms': round(max(latencies, default=0.0), 3),
+    }
+
+
+async def run_all(transport, base_url, args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60) as client:
+        ids = await sample_ids(client)
+        results = {}
+        for name in args.scenarios:
+            if name == 'renew_storm' and not ids:
+                continue
+            results[name] = await run_scenario(client, SCENARIOS[name], args, ids)
+        return results
+
+
+def compare(results, baseline):
+    """Relative change per scenario against a previous report (positive = more)."""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    return {
+        name: {
+            'requests_per_sec_pct': change(current['requests_per_sec'], baseline[name]['requests_per_sec']),
+            'p50_ms_pct': change(current['p50_ms'], baseline[name]['p50_ms']),
+            'p95_ms_pct': change(current['p95_ms'], baseline[name]['p95_ms']),
+            'p99_ms_pct': change(current['p99_ms'], baseline[name]['p99_ms']),
+        }
+        for name, current in results.items() if name in baseline
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--rows', type=int, default=100_000, help='Products to seed (in-process only)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='Virtual users per scenario')
+    parser.add_argument('--phone-batch', type=int, default=500, help='Numbers per bulk_phone upload')
+    parser.add_argument('--registry-delay', type=float, default=0.01, help='Stub registry latency (in-process only)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--url', help='Load a running server instead of the in-process app')
+    parser.add_argument('--output', help='Also write the report to this file')
+    parser.add_argument('--baseline', help='Previous report to compare against')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'target': args.url or 'in-process',
+            'rows': None if args.url else args.rows,
+            'duration_s': args.duration,
+            'concurrency': args.concurrency,
+        },
+    }
+    if args.url:
+        django.setup()
+        report['scenarios'] = asyncio.run(run_all(None, args.url, args))
+    else:
+        db_dir = tempfile.TemporaryDirectory()
+        connection = setup_django(sqlite_file=os.path.join(db_dir.name, 'load.sqlite3'))
+        try:
+            from django.conf import settings
+            from django.core.asgi import get_asgi_application
+            from phone_registry.client import registry_client
+            from phone_registry.stub import StubRegistry
+            from products.seeding import seed_products
+
+            seed_products(args.rows, seed=args.seed)
+            report['meta']['database'] = connection.vendor
+            with StubRegistry(delay=args.registry_delay) as stub:
+                settings.PHONE_REGISTRY_URL = stub.url
+                transport = httpx.ASGITransport(app=get_asgi_application())
+                report['scenarios'] = asyncio.run(run_all(transport, 'http://testserver', args))
+                registry_client.close()
+        finally:
+            teardown_django(connection)
+            db_dir.cleanup()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['vs_baseline'] = compare(report['scenarios'], json.load(f)['scenarios'])
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
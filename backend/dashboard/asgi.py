@@ -13,4 +13,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from products.events import websocket_application  # noqa: E402  (needs apps loaded)
+
+PRODUCT_EVENTS_WEBSOCKET_PATH = '/api/products/events/ws'
+
+
+async def application(scope, receive, send):
+    """Serve product events over WebSocket; everything else goes to Django."""
+    if scope['type'] == 'websocket':
+        if scope['path'] == PRODUCT_EVENTS_WEBSOCKET_PATH:
+            return await websocket_application(scope, receive, send)
+        await receive()
+        return await send({'type': 'websocket.close', 'code': 4404})
+    return await django_application(scope, receive, send)
@@ -0,0 +1,218 @@
+"""
+Logging handlers, formatter and filters used by ``LOGGING`` in settings.
+
+With ``LOG_QUEUE`` on, request threads only put records on a bounded
+in-memory queue (QueueLogHandler); one listener thread per process formats
+them and writes the file and console. If the queue is full the record is
+dropped and counted rather than blocking the request. Python 3.11's
+dictConfig cannot wire a QueueListener, so the handler builds its targets
+and starts its listener itself.
+
+The log file is shared by every gunicorn worker, so SharedRotatingFileHandler
+decides on rotation from the file on disk under an flock, and reopens the
+file when another process has rotated it.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import count
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; rotation is then per process
+    fcntl = None
+
+# Attributes every LogRecord has; anything else came from ``extra``
+RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the record's ``extra`` fields merged in."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of records below ERROR from high-volume loggers.
+
+    ``rates`` maps logger name prefixes to the fraction kept, e.g.
+    ``{'django.server': 0.1}``; the longest matching prefix wins. Sampling is
+    deterministic (every Nth record per prefix), so low rates stay even.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = {}
+        for prefix, rate in (rates or {}).items():
+            rate = float(rate)
+            if rate < 1:
+                self.rates[prefix] = (round(1 / rate) if rate > 0 else 0, count())
+        self.prefixes = sorted(self.rates, key=len, reverse=True)
+
+    def filter(self, record):
+        if not self.rates or record.levelno >= logging.ERROR:
+            return True
+        for prefix in self.prefixes:
+            if record.name == prefix or record.name.startswith(prefix + '.'):
+                every, counter = self.rates[prefix]
+                return every > 0 and next(counter) % every == 0
+        return True
+
+
+class SharedRotatingFileHandler(logging.FileHandler):
+    """
+    Size and/or time based rotation that is safe with several processes.
+
+    Rolls over when the file reaches ``max_bytes`` or when its last write
+    falls in an earlier ``interval`` (seconds, aligned to UTC) than now; 0
+    disables either check. ``backup_count`` rotated files are kept.
+    """
+
+    def __init__(self, filename, max_bytes=0, backup_count=5, interval=0, encoding='utf-8'):
+        super().__init__(filename, mode='a', encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.interval = interval
+        self._inode = None
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.max_bytes or self.interval:
+                self._maybe_rollover(len(msg.encode(self.encoding or 'utf-8')))
+            self._reopen_if_moved()
+            self.stream.write(msg)
+            self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def _due(self, st, size):
+        if self.max_bytes and st.st_size and st.st_size + size > self.max_bytes:
+            return True
+        return bool(self.interval) and st.st_size > 0 and (
+            st.st_mtime // self.interval < time.time() // self.interval
+        )
+
+    def _maybe_rollover(self, size):
+        try:
+            st = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return
+        if not self._due(st, size):
+            return
+        with open(self.baseFilename + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another process may have rotated while we waited for the lock
+            try:
+                st = os.stat(self.baseFilename)
+            except FileNotFoundError:
+                return
+            if self._due(st, size):
+                self._rotate()
+
+    def _rotate(self):
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f'{self.baseFilename}.{i}'
+                if os.path.exists(source):
+                    os.replace(source, f'{self.baseFilename}.{i + 1}')
+            os.replace(self.baseFilename, f'{self.baseFilename}.1')
+        else:
+            open(self.baseFilename, 'w').close()
+
+    def _reopen_if_moved(self):
+        try:
+            inode = os.stat(self.baseFilename).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self.stream is not None and inode == self._inode:
+            return
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+        self._inode = os.fstat(self.stream.fileno()).st_ino
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a listener thread that writes the log file and console.
+
+    Takes the SharedRotatingFileHandler arguments for its file target. The
+    handler's formatter is applied by the targets, not on the request thread.
+    """
+
+    def __init__(self, filename, max_bytes=0, backup_count=5, interval=0, console=True, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.targets = [SharedRotatingFileHandler(filename, max_bytes, backup_count, interval)]
+        if console:
+            self.targets.append(logging.StreamHandler())
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self.listener = None
+        self._start()
+
+    def _start(self):
+        self._pid = os.getpid()
+        self.listener = logging.handlers.QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        for target in self.targets:
+            target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge args now (they may not be thread-safe to format later) but keep
+        # the exception separate so the target's formatter can place it
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # A forked child inherits the queue but not the listener thread
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                    self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener is not None and self._pid == os.getpid():
+            # Drains the queue before returning
+            self.listener.stop()
+            self.listener = None
+        for target in self.targets:
+            target.close()
+        super().close()
@@ -0,0 +1,231 @@
+"""
+Request, database and upstream instrumentation.
+
+MetricsMiddleware times every request and collects per-request stats in a
+context variable. A query wrapper installed on every database connection
+(``connection.execute_wrappers``) counts queries and their time, and the
+phone registry client reports upstream calls, so work done in sync_to_async
+threads or on the registry loop is attributed to the request that caused
+it. Aggregates are kept in-process, rendered in the Prometheus text format at
+/api/metrics, and each response gets a Server-Timing header.
+
+Metrics are per process: with several workers each scrape reads the worker
+that served it.
+"""
+import bisect
+import contextvars
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}'
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        with self._lock:
+            values = {labels: list(series) for labels, series in self._values.items()}
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), series):
+                cumulative += count
+                le = format_labels((*self.labelnames, 'le'), (*labels, format_value(bound)))
+                yield f'{self.name}_bucket{le} {cumulative}'
+            base = format_labels(self.labelnames, labels)
+            yield f'{self.name}_sum{base} {format_value(series[-2])}'
+            yield f'{self.name}_count{base} {series[-1]}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route, method and status.', ('method', 'route', 'status'),
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response.', ('method', 'route'),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request.', ('method', 'route'), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Counter(
+    'http_request_db_seconds_total', 'Time spent in database queries.', ('method', 'route'),
+)
+UPSTREAM_DURATION = Histogram(
+    'phone_registry_request_duration_seconds', 'Phone registry HTTP calls.', ('method', 'path', 'status'),
+)
+METRICS = [REQUESTS, REQUEST_DURATION, REQUEST_QUERIES, REQUEST_DB_SECONDS, UPSTREAM_DURATION]
+
+
+class RequestStats:
+    __slots__ = ('db_queries', 'db_time', 'upstream_calls', 'upstream_time')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.upstream_calls = 0
+        self.upstream_time = 0.0
+
+
+current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper adding each query's time to the current request's stats."""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def observe_upstream(method, path, status, elapsed):
+    """Record one phone registry call (``status`` is the HTTP status or 'error')."""
+    UPSTREAM_DURATION.observe((method, path, str(status)), elapsed)
+    stats = current_stats.get()
+    if stats is not None:
+        stats.upstream_calls += 1
+        stats.upstream_time += elapsed
+
+
+class MetricsMiddleware:
+    """Time requests, attach Server-Timing and feed the /api/metrics aggregates."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.METRICS_ENABLED
+        if self.enabled:
+            connection_created.connect(install_query_timer, dispatch_uid='metrics_query_timer')
+            for connection in connections.all(initialized_only=True):
+                install_query_timer(None, connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        stats, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, started)
+
+    def start(self):
+        stats = RequestStats()
+        return stats, current_stats.set(stats), time.perf_counter()
+
+    def finish(self, request, response, stats, started):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        # Unmatched paths share one label to keep cardinality bounded
+        route = match.route if match else 'unmatched'
+        labels = (request.method, route)
+        REQUESTS.inc((*labels, str(response.status_code)))
+        REQUEST_DURATION.observe(labels, elapsed)
+        REQUEST_QUERIES.observe(labels, stats.db_queries)
+        if stats.db_time:
+            REQUEST_DB_SECONDS.inc(labels, stats.db_time)
+
+        timings = [f'app;dur={elapsed * 1000:.1f}']
+        if stats.db_queries:
+            timings.append(f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_queries} queries"')
+        if stats.upstream_calls:
+            timings.append(f'registry;dur={stats.upstream_time * 1000:.1f};desc="{stats.upstream_calls} calls"')
+        response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+def render_metrics() -> str:
+    return '\n'.join(line for metric in METRICS for line in metric.collect()) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's metrics."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,127 @@
+"""
+Read replica routing.
+
+Views opt in to replica reads with ``replica_reads(request)``; ProductViewSet
+does so for list (search included), retrieve and stats, so dashboard polling
+and search stay off the primary. Inside the block ReplicaRouter sends reads
+to the ``replica`` alias unless:
+
+- the client changed something in the last DB_REPLICA_PIN_SECONDS, marked by
+  a cookie ReplicaPinMiddleware sets on every unsafe request, so clients
+  read their own writes;
+- the replica lags more than DB_REPLICA_MAX_LAG seconds, or cannot be
+  reached. Lag is checked at most every DB_REPLICA_LAG_CHECK_INTERVAL
+  seconds per process.
+
+Everything else, and every write, uses ``default``.
+"""
+import contextlib
+import contextvars
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http.request import HttpRequest
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+REPLICA = 'replica'
+PIN_COOKIE = 'db_primary'
+
+# Alias ReplicaRouter sends reads to; None lets Django use default
+read_alias = contextvars.ContextVar('read_alias', default=None)
+# alias -> (checked_at, lag in seconds or None when unreachable)
+_lag_checks = {}
+
+# 0 when the standby has replayed everything it received, so an idle
+# primary does not look like lag; NULL on a server that is not a standby
+POSTGRES_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def replica_configured() -> bool:
+    return REPLICA in connections
+
+
+def current_read_alias() -> str:
+    return read_alias.get() or DEFAULT_DB_ALIAS
+
+
+def replica_lag(alias=REPLICA):
+    """Seconds ``alias`` trails the primary (0 when unknown), or None if it is unreachable."""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is not None and now - checked[0] < settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+        return checked[1]
+
+    connection = connections[alias]
+    try:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRES_LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+        else:
+            # Nothing to measure (e.g. a copied SQLite file); only check it is reachable
+            connection.ensure_connection()
+            lag = 0.0
+    except DatabaseError as exc:
+        logger.warning(f"Read replica {alias!r} unavailable, reading from the primary: {exc}")
+        lag = None
+    _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def choose_read_alias(request: HttpRequest):
+    """The alias a replica-safe read for ``request`` should use, or None for the primary."""
+    if not replica_configured() or PIN_COOKIE in request.COOKIES:
+        return None
+    lag = replica_lag()
+    if lag is None or lag > settings.DB_REPLICA_MAX_LAG:
+        return None
+    return REPLICA
+
+
+@contextlib.contextmanager
+def replica_reads(request: HttpRequest):
+    """Route reads inside the block to the replica when ``request`` may see slightly stale data."""
+    token = read_alias.set(choose_read_alias(request))
+    try:
+        yield read_alias.get()
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Reads go where replica_reads() chose; writes always go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or Django would save an instance back to the alias it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """Pin a client to the primary for a short while after it changes something."""
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DB_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -3,7 +3,9 @@ Django settings for dashboard project.
 """
 
 from pathlib import Path
+import importlib.util
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -36,11 +38,14 @@ INSTALLED_APPS = [
     # Local apps
     'products',
     'phone_registry',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'dashboard.metrics.MetricsMiddleware',  # Outermost, so timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS must be before CommonMiddleware
+    'dashboard.replicas.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -72,12 +77,36 @@ WSGI_APPLICATION = 'dashboard.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection management
+# Seconds a thread keeps its connection between requests (0 = close it after each request).
+# Keep 0 under ASGI (gunicorn.conf.py): every request runs in a fresh thread, so
+# persistent connections are never reused and pile up; only the pool reuses them.
+# Raise it only for WSGI/threaded servers or a dedicated job worker without a pool
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '0'))
+# Ping reused connections before handing them out, dropping dead ones
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+# psycopg3 connection pool per worker: 'auto' enables it when psycopg[pool] is installed
+DB_POOL = os.getenv('DB_POOL', 'auto').lower()
+DB_POOL_ENABLED = DB_POOL == 'true' or (DB_POOL == 'auto' and importlib.util.find_spec('psycopg_pool') is not None)
+# Connections all API workers may hold together; each worker's pool gets an equal share
+API_WORKERS = int(os.getenv('API_WORKERS', '4'))
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '40'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', str(max(1, DB_MAX_CONNECTIONS // API_WORKERS))))
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', str(min(2, DB_POOL_MAX_SIZE))))
+# Seconds a request waits for a free pooled connection before failing
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+# Seconds before idle connections above min_size are closed, and before any connection is recycled
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '600'))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '3600'))
+
 # Use PostgreSQL in production, SQLite in testing when DB_HOST is not set
 if os.getenv('USE_SQLITE', 'false').lower() == 'true':
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 else:
@@ -89,8 +118,85 @@ else:
             'PASSWORD': os.getenv('DB_PASSWORD', 'your_secure_password'),
             'HOST': os.getenv('DB_HOST', 'localhost'),
             'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+        }
+    }
+    if DB_POOL_ENABLED:
+        # Connections return to the per-worker pool at the end of each request;
+        # Django requires CONN_MAX_AGE = 0 with a pool
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': DB_POOL_MIN_SIZE,
+                'max_size': DB_POOL_MAX_SIZE,
+                'timeout': DB_POOL_TIMEOUT,
+                'max_idle': DB_POOL_MAX_IDLE,
+                'max_lifetime': DB_POOL_MAX_LIFETIME,
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+
+# Optional read replica for product list, search, detail and stats reads
+# (see dashboard/replicas.py). SQLite: DB_REPLICA_NAME is a file path;
+# PostgreSQL: other settings default to the primary's
+DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST', '')
+DB_REPLICA_NAME = os.getenv('DB_REPLICA_NAME', '')
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'NAME': DB_REPLICA_NAME or DATABASES['default']['NAME'],
+    }
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES['replica'].update({
+            'HOST': DB_REPLICA_HOST or DATABASES['default']['HOST'],
+            'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+            'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+            'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        })
+DATABASE_ROUTERS = ['dashboard.replicas.ReplicaRouter']
+# Fall back to the primary when the replica trails it by more than this many seconds
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', '5'))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', '1'))
+# Seconds a client reads from the primary after its own writes; keep above the max lag
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '10'))
+
+
+# Cache
+# Use Redis when REDIS_URL is set so every worker shares one cache,
+# otherwise fall back to a per-process in-memory cache
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
         }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Dashboard stats are cached per time bucket of this many seconds (0 disables)
+PRODUCT_STATS_CACHE_TTL = int(os.getenv('PRODUCT_STATS_CACHE_TTL', '30'))
+
+# Serve product listings from values() rows with precompiled converters
+PRODUCT_FAST_READ_PATH = os.getenv('PRODUCT_FAST_READ_PATH', 'true').lower() == 'true'
+
+# Seconds browsers may reuse product reads before revalidating with ETag (0 = always revalidate)
+PRODUCT_HTTP_MAX_AGE = int(os.getenv('PRODUCT_HTTP_MAX_AGE', '0'))
+
+# Live product events: 'memory' (per process), 'postgres' (LISTEN/NOTIFY) or 'auto'
+PRODUCT_EVENTS_BACKEND = os.getenv('PRODUCT_EVENTS_BACKEND', 'auto')
+# Seconds between keep-alive comments on idle event streams
+PRODUCT_EVENTS_HEARTBEAT = float(os.getenv('PRODUCT_EVENTS_HEARTBEAT', '15'))
+
+# Rows validated and inserted per transaction by /api/products/import
+PRODUCT_IMPORT_BATCH_SIZE = int(os.getenv('PRODUCT_IMPORT_BATCH_SIZE', '1000'))
 
 
 # Password validation
@@ -155,39 +261,86 @@ CORS_ALLOW_CREDENTIALS = True
 # Logging configuration
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
+# 'text' for humans, 'json' (one object per line) for log shippers
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+# Write logs from a background thread so request threads never block on I/O
+LOG_QUEUE = os.getenv('LOG_QUEUE', 'true').lower() == 'true'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Rotate the log file at this size and/or every this many seconds (0 disables)
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(50 * 1024 * 1024)))
+LOG_ROTATE_INTERVAL = int(os.getenv('LOG_ROTATE_INTERVAL', '0'))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+# Fraction of sub-ERROR records kept per logger, e.g. "django.server=0.1"
+LOG_SAMPLING = {
+    name.strip(): float(rate)
+    for name, _, rate in (item.partition('=') for item in os.getenv('LOG_SAMPLING', '').split(','))
+    if name.strip() and rate.strip()
+}
 
 # Create logs directory if it doesn't exist
 os.makedirs(BASE_DIR / 'logs', exist_ok=True)
 
+LOG_FILE_OPTIONS = {
+    'filename': str(BASE_DIR / LOG_FILE),
+    'max_bytes': LOG_MAX_BYTES,
+    'backup_count': LOG_BACKUP_COUNT,
+    'interval': LOG_ROTATE_INTERVAL,
+}
+
+if LOG_QUEUE:
+    LOG_HANDLERS = {
+        'queue': {
+            'level': LOG_LEVEL,
+            'class': 'dashboard.logs.QueueLogHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
+            'queue_size': LOG_QUEUE_SIZE,
+            **LOG_FILE_OPTIONS,
+        },
+    }
+else:
+    LOG_HANDLERS = {
+        'file': {
+            'level': LOG_LEVEL,
+            'class': 'dashboard.logs.SharedRotatingFileHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
+            **LOG_FILE_OPTIONS,
+        },
+        'console': {
+            'level': LOG_LEVEL,
+            'class': 'logging.StreamHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
+        },
+    }
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
+        'text': {
             'format': '{asctime} - {name} - {levelname} - {message}',
             'style': '{',
         },
-    },
-    'handlers': {
-        'file': {
-            'level': LOG_LEVEL,
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / LOG_FILE,
-            'formatter': 'verbose',
+        'json': {
+            '()': 'dashboard.logs.JSONFormatter',
         },
-        'console': {
-            'level': LOG_LEVEL,
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+    },
+    'filters': {
+        'sampling': {
+            '()': 'dashboard.logs.SamplingFilter',
+            'rates': LOG_SAMPLING,
         },
     },
+    'handlers': LOG_HANDLERS,
     'root': {
-        'handlers': ['file', 'console'],
+        'handlers': list(LOG_HANDLERS),
         'level': LOG_LEVEL,
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': list(LOG_HANDLERS),
             'level': LOG_LEVEL,
             'propagate': False,
         },
@@ -197,3 +350,91 @@ LOGGING = {
 # Phone Registry settings
 PHONE_REGISTRY_URL = os.getenv('PHONE_REGISTRY_URL', 'http://localhost:8000')
 PHONE_REGISTRY_API_KEY = os.getenv('PHONE_REGISTRY_API_KEY', 'your-api-key')
+
+# Pooled registry client: connection limits and timeouts (seconds)
+PHONE_REGISTRY_MAX_CONNECTIONS = int(os.getenv('PHONE_REGISTRY_MAX_CONNECTIONS', '100'))
+PHONE_REGISTRY_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('PHONE_REGISTRY_MAX_KEEPALIVE_CONNECTIONS', '20'))
+PHONE_REGISTRY_KEEPALIVE_EXPIRY = float(os.getenv('PHONE_REGISTRY_KEEPALIVE_EXPIRY', '30'))
+PHONE_REGISTRY_CONNECT_TIMEOUT = float(os.getenv('PHONE_REGISTRY_CONNECT_TIMEOUT', '5'))
+PHONE_REGISTRY_TIMEOUT = float(os.getenv('PHONE_REGISTRY_TIMEOUT', '10'))
+PHONE_REGISTRY_BULK_TIMEOUT = float(os.getenv('PHONE_REGISTRY_BULK_TIMEOUT', '30'))
+# auto: use HTTP/2 when the h2 package is installed
+PHONE_REGISTRY_HTTP2 = os.getenv('PHONE_REGISTRY_HTTP2', 'auto')
+
+# Circuit breaker: open after this many consecutive failures, probe again after the timeout (seconds)
+PHONE_REGISTRY_BREAKER_FAILURE_THRESHOLD = int(os.getenv('PHONE_REGISTRY_BREAKER_FAILURE_THRESHOLD', '5'))
+PHONE_REGISTRY_BREAKER_RESET_TIMEOUT = float(os.getenv('PHONE_REGISTRY_BREAKER_RESET_TIMEOUT', '30'))
+PHONE_REGISTRY_BREAKER_HALF_OPEN_CALLS = int(os.getenv('PHONE_REGISTRY_BREAKER_HALF_OPEN_CALLS', '1'))
+
+# Adaptive (AIMD) limit on concurrent registry requests per worker; starts
+# at the client pool size, calls over it wait up to the queue timeout (seconds)
+PHONE_REGISTRY_LIMIT_INITIAL = int(os.getenv('PHONE_REGISTRY_LIMIT_INITIAL', str(PHONE_REGISTRY_MAX_CONNECTIONS)))
+PHONE_REGISTRY_LIMIT_MIN = int(os.getenv('PHONE_REGISTRY_LIMIT_MIN', '1'))
+PHONE_REGISTRY_LIMIT_MAX = int(os.getenv('PHONE_REGISTRY_LIMIT_MAX', str(PHONE_REGISTRY_MAX_CONNECTIONS)))
+# Calls slower than this (seconds) shrink the limit
+PHONE_REGISTRY_LIMIT_LATENCY_TARGET = float(os.getenv('PHONE_REGISTRY_LIMIT_LATENCY_TARGET', '1.0'))
+PHONE_REGISTRY_LIMIT_QUEUE_TIMEOUT = float(os.getenv('PHONE_REGISTRY_LIMIT_QUEUE_TIMEOUT', '5'))
+
+# Phone check result cache: memory (per-process LRU), django (CACHES alias) or none
+PHONE_CHECK_CACHE_BACKEND = os.getenv('PHONE_CHECK_CACHE_BACKEND', 'memory')
+PHONE_CHECK_CACHE_ALIAS = os.getenv('PHONE_CHECK_CACHE_ALIAS', 'default')
+PHONE_CHECK_CACHE_MAX_SIZE = int(os.getenv('PHONE_CHECK_CACHE_MAX_SIZE', '10000'))
+PHONE_CHECK_CACHE_TTL = int(os.getenv('PHONE_CHECK_CACHE_TTL', '300'))
+PHONE_CHECK_CACHE_NEGATIVE_TTL = int(os.getenv('PHONE_CHECK_CACHE_NEGATIVE_TTL', '30'))
+
+# Micro-batch concurrent distinct phone checks into one upstream call made
+# every window (0 disables); requires the registry to expose a batch check path
+PHONE_REGISTRY_BATCH_CHECK_WINDOW_MS = float(os.getenv('PHONE_REGISTRY_BATCH_CHECK_WINDOW_MS', '0'))
+PHONE_REGISTRY_BATCH_CHECK_MAX_SIZE = int(os.getenv('PHONE_REGISTRY_BATCH_CHECK_MAX_SIZE', '100'))
+PHONE_REGISTRY_BATCH_CHECK_PATH = os.getenv('PHONE_REGISTRY_BATCH_CHECK_PATH', '/api/phone/bulk-check')
+
+# Local mirror of registered numbers (phone_registry.mirror). Numbers we
+# registered or saw registered are answered from the database; once the
+# delta sync has run, so are numbers the registry does not have
+PHONE_MIRROR_ENABLED = os.getenv('PHONE_MIRROR_ENABLED', 'true').lower() == 'true'
+# Country code (digits) for numbers given in national format; empty leaves them to the registry
+PHONE_DEFAULT_COUNTRY_CODE = os.getenv('PHONE_DEFAULT_COUNTRY_CODE', '')
+# Delta sync from the registry's change feed every interval seconds. The
+# mirror only answers "not registered" after a sync, so it requires one
+PHONE_REGISTRY_SYNC_PATH = os.getenv('PHONE_REGISTRY_SYNC_PATH', '/api/phone/changes')
+PHONE_MIRROR_SYNC_INTERVAL = int(os.getenv('PHONE_MIRROR_SYNC_INTERVAL', '300' if PHONE_MIRROR_ENABLED else '0'))
+if PHONE_MIRROR_ENABLED and PHONE_MIRROR_SYNC_INTERVAL <= 0:
+    raise ImproperlyConfigured(
+        'PHONE_MIRROR_ENABLED requires PHONE_MIRROR_SYNC_INTERVAL > 0; '
+        'set PHONE_MIRROR_ENABLED=false to run without the mirror'
+    )
+PHONE_MIRROR_SYNC_BATCH_SIZE = int(os.getenv('PHONE_MIRROR_SYNC_BATCH_SIZE', '1000'))
+# "Not registered" is only answered locally while the last sync is at most this old (seconds)
+PHONE_MIRROR_MAX_STALENESS = int(os.getenv('PHONE_MIRROR_MAX_STALENESS', '900'))
+# Without a fresh sync, a row answers "registered" for this long after it was written (seconds)
+PHONE_MIRROR_POSITIVE_MAX_AGE = int(os.getenv('PHONE_MIRROR_POSITIVE_MAX_AGE', str(PHONE_CHECK_CACHE_TTL)))
+# How often each worker adds rows written by other processes to its Bloom filter (seconds)
+PHONE_MIRROR_REFRESH_INTERVAL = float(os.getenv('PHONE_MIRROR_REFRESH_INTERVAL', '5'))
+# How long a worker trusts its filter on a miss before probing the table for such rows again (seconds)
+PHONE_MIRROR_CURRENT_TTL = float(os.getenv('PHONE_MIRROR_CURRENT_TTL', '1'))
+PHONE_MIRROR_BLOOM_CAPACITY = int(os.getenv('PHONE_MIRROR_BLOOM_CAPACITY', '1000000'))
+PHONE_MIRROR_BLOOM_ERROR_RATE = float(os.getenv('PHONE_MIRROR_BLOOM_ERROR_RATE', '0.01'))
+
+# Streaming bulk registration (/api/phone/bulk-register/stream)
+PHONE_BULK_CHUNK_SIZE = int(os.getenv('PHONE_BULK_CHUNK_SIZE', '500'))
+PHONE_BULK_CONCURRENCY = int(os.getenv('PHONE_BULK_CONCURRENCY', '4'))
+PHONE_BULK_MAX_RETRIES = int(os.getenv('PHONE_BULK_MAX_RETRIES', '3'))
+PHONE_BULK_RETRY_BACKOFF = float(os.getenv('PHONE_BULK_RETRY_BACKOFF', '0.5'))
+
+# Background jobs (python manage.py run_jobs)
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', '4'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1.0'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', '5'))
+# A running job whose worker has not finished within this many seconds is requeued
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '600'))
+JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))
+# Periodic jobs queued by the worker: {kind: interval in seconds}, 0 disables
+JOB_SCHEDULE = {
+    'products.refresh_statuses': int(os.getenv('STATUS_REFRESH_INTERVAL', '300')),
+    'jobs.prune': 24 * 60 * 60,
+    'phone_registry.sync_mirror': PHONE_MIRROR_SYNC_INTERVAL,
+}
+
+# Request/DB/registry metrics at /api/metrics plus a Server-Timing header
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
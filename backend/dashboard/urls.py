@@ -4,16 +4,25 @@ URL configuration for dashboard project.
 from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
+from dashboard.metrics import metrics_view
+from phone_registry.resilience import CircuitBreaker, resilience_info
 
 
 def health_check(request):
-    """Health check endpoint."""
-    return JsonResponse({'status': 'healthy'})
+    """Health check endpoint, including the phone registry circuit breaker and limiter."""
+    registry = resilience_info()
+    healthy = registry['circuit_breaker']['state'] == CircuitBreaker.CLOSED
+    return JsonResponse({
+        'status': 'healthy' if healthy else 'degraded',
+        'phone_registry': registry,
+    })
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/health', health_check, name='health'),
+    path('api/metrics', metrics_view, name='metrics'),
     path('api/', include('products.urls')),
     path('api/', include('phone_registry.urls')),
+    path('api/', include('jobs.urls')),
 ]
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for production (see dashboard.sh start).
+
+Run as: gunicorn dashboard.asgi:application -c gunicorn.conf.py
+"""
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.getenv('API_WORKERS', '4'))
+# Serve dashboard.asgi so async views multiplex registry calls on one worker
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+
+def worker_exit(server, worker):
+    """Close pooled phone registry and database connections when a worker shuts down."""
+    from django.db import connections
+    from phone_registry.client import registry_client
+
+    registry_client.close()
+    for conn in connections.all(initialized_only=True):
+        if getattr(conn, 'pool', None) is not None:
+            conn.close_pool()
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job, JobStatus
+from .queue import job
+
+
+@job('jobs.prune')
+def prune_finished_jobs():
+    """Delete finished jobs older than JOB_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(
+        status__in=[JobStatus.SUCCEEDED, JobStatus.FAILED], finished_at__lt=cutoff,
+    ).delete()
+    return {'deleted': deleted}
@@ -0,0 +1,88 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim, enqueue_periodic, requeue_expired, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs and the periodic job schedule.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help='Jobs run in parallel by this worker (default: JOB_WORKER_CONCURRENCY).',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help='Seconds to wait between polls when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every due job, then exit.',
+        )
+        parser.add_argument(
+            '--no-schedule',
+            action='store_true',
+            help='Do not queue periodic jobs from JOB_SCHEDULE.',
+        )
+
+    def handle(self, *args, **options):
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        concurrency = max(1, options['concurrency'])
+        slots = threading.Semaphore(concurrency)
+        self.stdout.write(f'Worker {self.worker_id} running {concurrency} job(s) at a time')
+
+        poll_interval = options['poll_interval']
+        housekeeping_at = 0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as pool:
+            while not self.stopping.is_set():
+                if time.monotonic() >= housekeeping_at:
+                    requeue_expired()
+                    if not options['no_schedule']:
+                        enqueue_periodic(settings.JOB_SCHEDULE)
+                    housekeeping_at = time.monotonic() + poll_interval
+
+                # Only claim when a thread is free to run the job
+                if not slots.acquire(timeout=poll_interval):
+                    continue
+                claimed = claim(self.worker_id)
+                if claimed is None:
+                    slots.release()
+                    if options['once']:
+                        break
+                    self.stopping.wait(poll_interval)
+                    continue
+                pool.submit(self.run, claimed).add_done_callback(lambda _: slots.release())
+            # Leaving the pool waits for running jobs to finish
+
+    def run(self, claimed):
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            run_job(claimed)
+        finally:
+            close_old_connections()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'Job {claimed.id} {claimed.kind}: {claimed.status} in {elapsed_ms:.1f} ms')
+
+    def stop(self, signum, frame):
+        self.stdout.write('Stopping after running jobs finish')
+        self.stopping.set()
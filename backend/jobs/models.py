@@ -0,0 +1,54 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = 'queued', 'Queued'
+    RUNNING = 'running', 'Running'
+    SUCCEEDED = 'succeeded', 'Succeeded'
+    FAILED = 'failed', 'Failed'
+
+
+class Job(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=1)
+    # Queued by the worker from JOB_SCHEDULE rather than by a request
+    periodic = models.BooleanField(default=False)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['-created_at']
+        indexes = [
+            # Backs claiming: the next due job in a given status
+            models.Index(fields=['status', 'run_at'], name='jobs_status_run_at_idx'),
+            models.Index(fields=['kind', 'status'], name='jobs_kind_status_idx'),
+        ]
+        constraints = [
+            # At most one pending periodic job per kind, however many workers schedule
+            models.UniqueConstraint(
+                fields=['kind'],
+                condition=models.Q(periodic=True, status__in=['queued', 'running']),
+                name='jobs_one_pending_periodic',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} ({self.status})'
+
+    @property
+    def finished(self):
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
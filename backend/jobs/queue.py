@@ -0,0 +1,178 @@
+"""
+Database-backed job queue.
+
+Jobs are rows in the ``jobs`` table. Handlers are plain or async functions
+registered with ``@job('kind')`` in an app's ``jobs.py``. Workers (``manage.py
+run_jobs``) claim due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it, and with a compare-and-set UPDATE otherwise (SQLite
+serializes writers, so the CAS alone is enough there). A claimed job holds a
+lease; jobs whose worker died are requeued once it expires.
+"""
+import inspect
+import logging
+import traceback
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+handlers = {}
+
+
+class Retry(Exception):
+    """Raised by a handler to run the job again after ``delay`` seconds."""
+
+    def __init__(self, message='', delay=None):
+        super().__init__(message)
+        self.delay = delay
+
+
+def job(kind):
+    """Register the decorated function as the handler for jobs of ``kind``."""
+    def decorator(func):
+        handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, run_at=None, max_attempts=None, periodic=False) -> Job:
+    """Queue a job and return it; the caller hands ``job.id`` to the client."""
+    if kind not in handlers:
+        raise ValueError(f'No handler registered for job kind "{kind}"')
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        periodic=periodic,
+    )
+
+
+aenqueue = sync_to_async(enqueue)
+
+
+def claim(worker_id, now=None):
+    """Claim the next due job for ``worker_id``, or return None if there is none."""
+    if now is None:
+        now = timezone.now()
+    due = Job.objects.filter(status=JobStatus.QUEUED, run_at__lte=now).order_by('run_at', 'created_at')
+    lease = {
+        'status': JobStatus.RUNNING,
+        'locked_by': worker_id,
+        'locked_until': now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+        'started_at': now,
+        'attempts': F('attempts') + 1,
+    }
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            candidate = due.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+            if candidate is None:
+                return None
+            Job.objects.filter(pk=candidate).update(**lease)
+        else:
+            for candidate in due.values_list('pk', flat=True)[:10]:
+                if Job.objects.filter(pk=candidate, status=JobStatus.QUEUED).update(**lease):
+                    break
+            else:
+                return None
+        return Job.objects.get(pk=candidate)
+
+
+def requeue_expired(now=None) -> int:
+    """
+    Release jobs whose worker's lease ran out and return how many there were.
+
+    A job with attempts left goes back to the queue; one that has used up
+    ``max_attempts`` is failed, so a job that keeps killing its worker stops.
+    """
+    if now is None:
+        now = timezone.now()
+    expired = Job.objects.filter(status=JobStatus.RUNNING, locked_until__lt=now)
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=JobStatus.FAILED, error='Lease expired', locked_by=None, locked_until=None, finished_at=now,
+    )
+    if failed:
+        logger.error(f"Failed {failed} job(s) whose lease expired on their last attempt")
+    requeued = expired.filter(attempts__lt=F('max_attempts')).update(
+        status=JobStatus.QUEUED, locked_by=None, locked_until=None, run_at=now,
+    )
+    return failed + requeued
+
+
+def run_job(claimed):
+    """Run a claimed job's handler and record the outcome."""
+    handler = handlers.get(claimed.kind)
+    try:
+        if handler is None:
+            raise LookupError(f'No handler registered for job kind "{claimed.kind}"')
+        if inspect.iscoroutinefunction(handler):
+            result = async_to_sync(handler)(**claimed.payload)
+        else:
+            result = handler(**claimed.payload)
+    except Exception as e:
+        if claimed.attempts < claimed.max_attempts:
+            delay = e.delay if isinstance(e, Retry) else None
+            if delay is None:
+                delay = settings.JOB_RETRY_BACKOFF * 2 ** (claimed.attempts - 1)
+            logger.warning(f"Job {claimed.id} ({claimed.kind}) failed, retrying in {delay:.1f}s: {e}")
+            finish(claimed, JobStatus.QUEUED, error=str(e), run_at=timezone.now() + timedelta(seconds=delay))
+        else:
+            logger.error(f"Job {claimed.id} ({claimed.kind}) failed: {e}")
+            finish(claimed, JobStatus.FAILED, error=''.join(traceback.format_exception_only(e)).strip())
+        return claimed
+
+    finish(claimed, JobStatus.SUCCEEDED, result=result)
+    return claimed
+
+
+def finish(claimed, job_status, result=None, error=None, run_at=None):
+    fields = {
+        'status': job_status,
+        'result': result,
+        'error': error,
+        'locked_by': None,
+        'locked_until': None,
+        'finished_at': None if job_status == JobStatus.QUEUED else timezone.now(),
+    }
+    if run_at is not None:
+        fields['run_at'] = run_at
+    # Only the lease holder may record the outcome
+    Job.objects.filter(pk=claimed.pk, locked_by=claimed.locked_by).update(**fields)
+    for name, value in fields.items():
+        setattr(claimed, name, value)
+
+
+def enqueue_periodic(schedule, now=None) -> list:
+    """
+    Queue each ``{kind: seconds}`` periodic job that is due.
+
+    A kind is due when none is queued or running and the last one was
+    created at least ``seconds`` ago. Two workers can both find a kind due;
+    the ``jobs_one_pending_periodic`` constraint lets only one insert win.
+    """
+    if now is None:
+        now = timezone.now()
+    queued = []
+    for kind, interval in schedule.items():
+        if interval <= 0 or kind not in handlers:
+            continue
+        jobs = Job.objects.filter(kind=kind)
+        if jobs.filter(status__in=[JobStatus.QUEUED, JobStatus.RUNNING]).exists():
+            continue
+        if jobs.filter(created_at__gt=now - timedelta(seconds=interval)).exists():
+            continue
+        try:
+            with transaction.atomic():
+                queued.append(enqueue(kind, periodic=True))
+        except IntegrityError:
+            # Another worker queued it first
+            continue
+    return queued
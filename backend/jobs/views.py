@@ -0,0 +1,20 @@
+from django.urls import reverse
+from rest_framework import generics
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """Poll a background job's status and result."""
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+
+def accepted_body(job) -> dict:
+    """Response body for a request whose work was queued as ``job``."""
+    return {
+        'job_id': str(job.id),
+        'status': job.status,
+        'status_url': reverse('job-detail', args=[job.id]),
+    }
@@ -0,0 +1,181 @@
+"""
+Streaming bulk registration pipeline.
+
+Phone numbers are read line by line from a CSV or NDJSON request body,
+grouped into chunks and sent to the registry concurrently. Chunks that hit
+a transport error, a 5xx or 429 response or an open circuit are retried
+with exponential backoff; other failures are final. Every chunk's outcome is yielded
+as soon as it is known, so the caller can stream NDJSON progress back.
+Only ``concurrency`` chunks are held in memory at any time, whatever the
+size of the upload.
+"""
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import random
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from .resilience import RegistryUnavailable
+
+logger = logging.getLogger(__name__)
+
+MAX_PHONE_LENGTH = 20
+CSV_HEADERS = {'phone', 'phone_number', 'phone_numbers', 'number'}
+READ_BATCH_LINES = 1000
+
+
+async def read_lines(stream, batch_size=READ_BATCH_LINES):
+    """
+    Yield the lines of a file-like ``stream`` without blocking the event loop.
+
+    Under ASGI Django spools the request body to a temporary file, which may
+    be on disk, so lines are read ``batch_size`` at a time in a worker thread.
+    """
+    read_batch = sync_to_async(lambda: list(itertools.islice(stream, batch_size)))
+    while lines := await read_batch():
+        for line in lines:
+            yield line
+
+
+async def parse_lines(lines, content_type):
+    """
+    Yield ``(line_number, phone_number, error)`` for each non-empty line.
+
+    CSV input takes the first column and skips a header row; NDJSON input
+    accepts either a JSON string or an object with a ``phone_number`` key.
+    """
+    ndjson = 'json' in content_type
+    line_number = 0
+    async for raw in lines:
+        line_number += 1
+        line = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+        line = line.strip()
+        if not line:
+            continue
+
+        if ndjson:
+            try:
+                value = json.loads(line)
+            except ValueError:
+                yield line_number, None, 'Invalid JSON'
+                continue
+            if isinstance(value, dict):
+                value = value.get('phone_number')
+        else:
+            value = next(csv.reader([line]), [''])[0]
+            if line_number == 1 and value.strip().lower() in CSV_HEADERS:
+                continue
+
+        if not isinstance(value, str) or not value.strip():
+            yield line_number, None, 'Missing phone number'
+        elif len(value.strip()) > MAX_PHONE_LENGTH:
+            yield line_number, None, f'Ensure this field has no more than {MAX_PHONE_LENGTH} characters.'
+        else:
+            yield line_number, value.strip(), None
+
+
+async def chunk_numbers(parsed, chunk_size):
+    """Group parsed lines into chunks of up to ``chunk_size`` valid numbers."""
+    numbers, invalid = [], []
+    async for line_number, phone_number, error in parsed:
+        if error:
+            invalid.append({'line': line_number, 'error': error})
+            continue
+        numbers.append(phone_number)
+        if len(numbers) >= chunk_size:
+            yield numbers, invalid
+            numbers, invalid = [], []
+    if numbers or invalid:
+        yield numbers, invalid
+
+
+def is_retryable(error):
+    """Whether a failed chunk may succeed if sent again."""
+    if isinstance(error, RegistryUnavailable):
+        return True
+    # PhoneRegistryService re-raises httpx errors with the original as the cause
+    cause = error if isinstance(error, httpx.HTTPError) else error.__cause__
+    if isinstance(cause, httpx.TransportError):
+        return True
+    if isinstance(cause, httpx.HTTPStatusError):
+        return cause.response.status_code >= 500 or cause.response.status_code == 429
+    return False
+
+
+async def send_chunk(service, index, numbers, invalid, max_retries, backoff):
+    """Register one chunk, retrying transient failures with exponential backoff and jitter."""
+    result = {'chunk': index, 'size': len(numbers), 'attempts': 0, 'invalid': invalid}
+    if not numbers:
+        return {**result, 'success': 0, 'failed': len(invalid)}
+
+    for attempt in range(max_retries + 1):
+        result['attempts'] = attempt + 1
+        try:
+            response = await service.bulk_register_phones(numbers)
+        except Exception as e:
+            error = str(e)
+            if attempt >= max_retries or not is_retryable(e):
+                break
+            delay = backoff * (2 ** attempt)
+            # Don't retry into an open circuit before it is due to probe again
+            delay = max(delay, getattr(e, 'retry_after', 0))
+            await asyncio.sleep(delay + random.uniform(0, delay))
+            continue
+        return {
+            **result,
+            'success': response.get('success', len(numbers)),
+            'failed': response.get('failed', 0) + len(invalid),
+            'results': response.get('results', []),
+        }
+
+    logger.error(f"Bulk registration chunk {index} failed after {result['attempts']} attempts: {error}")
+    return {**result, 'success': 0, 'failed': len(numbers) + len(invalid), 'error': error}
+
+
+async def run_pipeline(service, chunks, concurrency, max_retries, backoff):
+    """
+    Send ``chunks`` with at most ``concurrency`` in flight, yielding each
+    chunk's result as it completes, followed by a summary record.
+    """
+    pending = set()
+    totals = {'chunks': 0, 'success': 0, 'failed': 0}
+
+    def collect(done):
+        for task in done:
+            result = task.result()
+            totals['chunks'] += 1
+            totals['success'] += result['success']
+            totals['failed'] += result['failed']
+            yield result
+
+    try:
+        index = 0
+        async for numbers, invalid in chunks:
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for result in collect(done):
+                    yield result
+            pending.add(asyncio.ensure_future(
+                send_chunk(service, index, numbers, invalid, max_retries, backoff)
+            ))
+            index += 1
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for result in collect(done):
+                yield result
+    finally:
+        # Client went away or the pipeline failed: stop outstanding chunks
+        for task in pending:
+            task.cancel()
+
+    yield {'done': True, **totals}
+
+
+async def stream_ndjson(records):
+    async for record in records:
+        yield json.dumps(record) + '\n'
@@ -0,0 +1,210 @@
+"""
+Cache for phone check results.
+
+Positive answers ("exists") and negative answers are kept for separate TTLs,
+since a number that is missing now may be registered soon. Two backends are
+available: an in-process LRU and Django's cache framework (shared between
+workers when it is backed by Redis). Both count hits, misses and evictions.
+``clear()`` drops every answer, e.g. after the registry's cleanup removed
+numbers that cached positives still report as registered. The in-process
+backend only clears the calling process; other workers' entries expire
+after PHONE_CHECK_CACHE_TTL, so use the django backend on a shared cache
+(REDIS_URL) to clear every worker at once.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class CheckCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class BaseCheckCache:
+    backend = None
+
+    def __init__(self, ttl, negative_ttl):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = CheckCacheStats()
+
+    def ttl_for(self, result):
+        return self.ttl if result.get('exists') else self.negative_ttl
+
+    async def get(self, phone_number):
+        result = await self._get(phone_number)
+        self.stats.record('hits' if result is not None else 'misses')
+        return result
+
+    async def set(self, phone_number, result):
+        ttl = self.ttl_for(result)
+        if ttl > 0:
+            await self._set(phone_number, result, ttl)
+
+    async def delete(self, phone_number):
+        await self._delete(phone_number)
+
+    async def clear(self):
+        await self._clear()
+
+    async def mark_registered(self, phone_number, registered_at=None):
+        """Record a number we just registered so later checks answer locally."""
+        await self.set(phone_number, {
+            'exists': True,
+            'phone_number': phone_number,
+            'registered_at': registered_at,
+        })
+
+    def info(self):
+        return {'backend': self.backend, **self.stats.as_dict()}
+
+
+class NullCheckCache(BaseCheckCache):
+    backend = 'none'
+
+    async def _get(self, phone_number):
+        return None
+
+    async def _set(self, phone_number, result, ttl):
+        pass
+
+    async def _delete(self, phone_number):
+        pass
+
+    async def _clear(self):
+        pass
+
+
+class MemoryCheckCache(BaseCheckCache):
+    """Bounded in-process LRU with per-entry expiry."""
+    backend = 'memory'
+
+    def __init__(self, ttl, negative_ttl, max_size, clock=time.monotonic):
+        super().__init__(ttl, negative_ttl)
+        self.max_size = max_size
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def _get(self, phone_number):
+        with self._lock:
+            entry = self._entries.get(phone_number)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= self.clock():
+                del self._entries[phone_number]
+                return None
+            self._entries.move_to_end(phone_number)
+            return result
+
+    async def _set(self, phone_number, result, ttl):
+        with self._lock:
+            self._entries[phone_number] = (self.clock() + ttl, result)
+            self._entries.move_to_end(phone_number)
+            evicted = 0
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.record('evictions', evicted)
+
+    async def _delete(self, phone_number):
+        with self._lock:
+            self._entries.pop(phone_number, None)
+
+    async def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        return {**super().info(), 'size': len(self._entries), 'max_size': self.max_size}
+
+
+class DjangoCheckCache(BaseCheckCache):
+    """
+    Stores results in a Django cache alias. Size limits and eviction are left
+    to the cache server (e.g. Redis with an LRU maxmemory-policy).
+
+    Entries are stored with the cache's generation, read in the same
+    round trip; clear() bumps the generation so every older entry misses.
+    """
+    backend = 'django'
+    key_prefix = 'phone:check:'
+    generation_key = 'phone:check-generation'
+
+    def __init__(self, ttl, negative_ttl, alias='default'):
+        super().__init__(ttl, negative_ttl)
+        self.cache = caches[alias]
+
+    async def _get(self, phone_number):
+        key = self.key_prefix + phone_number
+        values = await self.cache.aget_many([key, self.generation_key])
+        entry = values.get(key)
+        # Entries written before generations were stored are plain results
+        if not isinstance(entry, tuple) or entry[0] != values.get(self.generation_key, 0):
+            return None
+        return entry[1]
+
+    async def _set(self, phone_number, result, ttl):
+        generation = await self.cache.aget(self.generation_key, 0)
+        await self.cache.aset(self.key_prefix + phone_number, (generation, result), timeout=ttl)
+
+    async def _delete(self, phone_number):
+        await self.cache.adelete(self.key_prefix + phone_number)
+
+    async def _clear(self):
+        # The generation never expires; entries from older generations age out by TTL
+        if not await self.cache.aadd(self.generation_key, 1, timeout=None):
+            await self.cache.aincr(self.generation_key)
+
+
+def build_check_cache():
+    backend = settings.PHONE_CHECK_CACHE_BACKEND
+    ttl = settings.PHONE_CHECK_CACHE_TTL
+    negative_ttl = settings.PHONE_CHECK_CACHE_NEGATIVE_TTL
+    if backend == 'memory':
+        return MemoryCheckCache(ttl, negative_ttl, settings.PHONE_CHECK_CACHE_MAX_SIZE)
+    if backend == 'django':
+        return DjangoCheckCache(ttl, negative_ttl, settings.PHONE_CHECK_CACHE_ALIAS)
+    return NullCheckCache(ttl, negative_ttl)
+
+
+_check_cache = None
+_check_cache_lock = threading.Lock()
+
+
+def get_check_cache() -> BaseCheckCache:
+    global _check_cache
+    if _check_cache is None:
+        with _check_cache_lock:
+            if _check_cache is None:
+                _check_cache = build_check_cache()
+    return _check_cache
+
+
+def reset_check_cache():
+    """Drop the process-wide cache so it is rebuilt from current settings."""
+    global _check_cache
+    with _check_cache_lock:
+        _check_cache = None
@@ -0,0 +1,111 @@
+"""
+Process-wide pooled HTTP client for the external phone registry.
+
+Registry calls can originate from many event loops: ``async_to_sync`` spins
+up a fresh loop per call under WSGI, while an ASGI server runs one loop per
+worker. An ``httpx.AsyncClient`` is bound to the loop it first runs on, so
+the manager owns a dedicated background loop with a single pooled client and
+every registry coroutine is executed there. Connections are kept alive and
+reused across requests regardless of which loop the caller is on.
+"""
+import asyncio
+import atexit
+import importlib.util
+import logging
+import os
+import threading
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def http2_enabled() -> bool:
+    """Use HTTP/2 when configured and the optional ``h2`` package is installed."""
+    setting = str(settings.PHONE_REGISTRY_HTTP2).lower()
+    if setting in ('false', '0', 'no', 'off'):
+        return False
+    available = importlib.util.find_spec('h2') is not None
+    if setting in ('true', '1', 'yes', 'on') and not available:
+        logger.warning("PHONE_REGISTRY_HTTP2 is enabled but h2 is not installed, using HTTP/1.1")
+    return available
+
+
+def build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.PHONE_REGISTRY_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.PHONE_REGISTRY_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.PHONE_REGISTRY_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.PHONE_REGISTRY_TIMEOUT,
+        connect=settings.PHONE_REGISTRY_CONNECT_TIMEOUT,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2_enabled())
+
+
+class RegistryClientManager:
+    """Owns the background event loop and pooled client used for registry calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client; only use it from coroutines running via ``run()``."""
+        self._ensure_started()
+        return self._client
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_started()
+        return self._loop
+
+    async def run(self, coro):
+        """Await ``coro`` on the registry loop from any event loop."""
+        loop = self.loop
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _ensure_started(self):
+        # A forked worker inherits the parent's state but not its thread
+        if self._loop is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name='phone-registry-client', daemon=True
+            )
+            thread.start()
+            self._client = build_client()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+
+    def close(self, timeout: float = 5.0):
+        """Close pooled connections and stop the background loop."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = self._thread = self._client = None
+                return
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Error closing phone registry client: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+
+registry_client = RegistryClientManager()
+
+atexit.register(registry_client.close)
@@ -0,0 +1,121 @@
+"""
+Request coalescing for registry lookups.
+
+``SingleFlight`` lets concurrent callers asking for the same key share one
+in-flight upstream call. ``MicroBatcher`` goes further and gathers distinct
+keys requested within a short window into a single batch call. Both keep
+asyncio state and must only be used from the registry client's event loop
+(see ``phone_registry.client``).
+"""
+import asyncio
+
+from django.conf import settings
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls for the same key."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, factory):
+        """Await ``factory()`` for ``key``, joining an identical call already in flight."""
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        # One caller giving up must not cancel the call for everyone else
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def info(self):
+        return {'calls': self.calls, 'shared': self.shared, 'in_flight': len(self._inflight)}
+
+
+class MicroBatcher:
+    """
+    Collect keys for up to ``window`` seconds (or ``max_size`` keys) and
+    resolve them all with one ``send(keys)`` call returning ``{key: result}``.
+    """
+
+    def __init__(self, window, max_size):
+        self.window = window
+        self.max_size = max_size
+        self._pending = {}
+        self._send = None
+        self._timer = None
+        self.batches = 0
+
+    async def submit(self, key, send):
+        loop = asyncio.get_running_loop()
+        future = self._pending.get(key)
+        if future is None:
+            future = loop.create_future()
+            self._pending[key] = future
+            self._send = send
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self.batches += 1
+            asyncio.ensure_future(self._dispatch(batch, self._send))
+
+    async def _dispatch(self, batch, send):
+        try:
+            results = await send(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(Exception(f"No result for {key} in batch response"))
+
+    def info(self):
+        return {'batches': self.batches, 'pending': len(self._pending)}
+
+
+check_flights = SingleFlight()
+
+_check_batcher = None
+
+
+def get_check_batcher():
+    """Return the check batcher, or None when micro-batching is disabled."""
+    global _check_batcher
+    window_ms = settings.PHONE_REGISTRY_BATCH_CHECK_WINDOW_MS
+    if window_ms <= 0:
+        return None
+    if _check_batcher is None:
+        _check_batcher = MicroBatcher(window_ms / 1000, settings.PHONE_REGISTRY_BATCH_CHECK_MAX_SIZE)
+    return _check_batcher
+
+
+def reset_coalescing():
+    """Forget coalescing state so it is rebuilt from current settings."""
+    global check_flights, _check_batcher
+    check_flights = SingleFlight()
+    _check_batcher = None
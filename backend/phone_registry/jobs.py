@@ -0,0 +1,29 @@
+from jobs.queue import Retry, job
+
+from .resilience import RegistryUnavailable
+from .services import PhoneRegistryService
+
+
+@job('phone_registry.cleanup')
+async def cleanup_old_records(days=90):
+    try:
+        return await PhoneRegistryService().cleanup_old_records(days)
+    except RegistryUnavailable as e:
+        raise Retry(str(e), delay=e.retry_after)
+
+
+@job('phone_registry.bulk_register')
+async def bulk_register_phones(phone_numbers):
+    try:
+        return await PhoneRegistryService().bulk_register_phones(phone_numbers)
+    except RegistryUnavailable as e:
+        raise Retry(str(e), delay=e.retry_after)
+
+
+@job('phone_registry.sync_mirror')
+async def sync_mirror():
+    """Periodic delta sync of the local mirror, scheduled by PHONE_MIRROR_SYNC_INTERVAL."""
+    try:
+        return await PhoneRegistryService().sync_mirror()
+    except RegistryUnavailable as e:
+        raise Retry(str(e), delay=e.retry_after)
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MirrorSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cursor', models.CharField(blank=True, default='', max_length=255)),
+                ('full_sync_at', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'registered_phones_sync',
+            },
+        ),
+        migrations.CreateModel(
+            name='RegisteredPhone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=16, unique=True)),
+                ('registered_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'registered_phones',
+                'indexes': [models.Index(fields=['updated_at'], name='registered_phones_updated_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,312 @@
+"""
+Local mirror of the external phone registry.
+
+``registered_phones`` holds numbers known to be registered, in E.164 form.
+Rows come from our own registrations and registry check results
+(PhoneRegistryService records every confirmed number) and from the delta
+sync job, which pages through the registry's change feed
+(PHONE_REGISTRY_SYNC_PATH) from the saved cursor.
+
+Each worker keeps a Bloom filter of the table and tops it up with recently
+changed rows every PHONE_MIRROR_REFRESH_INTERVAL seconds. A check then goes:
+
+1. not in the filter: once a full sync has finished and the last sync is
+   under PHONE_MIRROR_MAX_STALENESS seconds old, the table's newest
+   ``updated_at`` is compared with the newest row the filter holds (at most
+   once per PHONE_MIRROR_CURRENT_TTL seconds). If no other process has
+   written since, the number is "not registered" and the registry is not
+   asked; otherwise the filter is refreshed first;
+2. in the filter: look the number up. A row is "registered" while the sync
+   is fresh, or without one for PHONE_MIRROR_POSITIVE_MAX_AGE seconds after
+   the row was written; no row is "not registered" under the sync condition;
+3. otherwise the registry is asked as before.
+"""
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bloom import BloomFilter
+from .models import MirrorSyncState, RegisteredPhone
+
+logger = logging.getLogger(__name__)
+
+E164 = re.compile(r'^\+[1-9][0-9]{1,14}$')
+SEPARATORS = re.compile(r'[\s().\-/]')
+
+# updated_at is set before a row's transaction commits, so a slow commit can
+# land behind rows a refresh already saw; each refresh re-reads this margin
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def normalize_e164(phone_number):
+    """``phone_number`` in E.164 form (``+15551234567``), or None if it cannot be read as one."""
+    number = SEPARATORS.sub('', phone_number or '')
+    if number.startswith('00'):
+        number = '+' + number[2:]
+    elif not number.startswith('+'):
+        country_code = settings.PHONE_DEFAULT_COUNTRY_CODE
+        if not country_code or not number.isdigit():
+            return None
+        # National format: drop the trunk prefix used in most countries
+        number = f'+{country_code}{number[1:] if number.startswith("0") else number}'
+    return number if E164.match(number) else None
+
+
+def parse_registered_at(value):
+    if isinstance(value, datetime):
+        return value
+    return (parse_datetime(value) if value else None) or timezone.now()
+
+
+class PhoneMirror:
+    """The mirror table plus this worker's Bloom filter of it."""
+
+    def __init__(self):
+        self.bloom = None
+        self.full_sync_at = None
+        self.synced_at = None
+        self._refreshed_at = None
+        self._current_at = None
+        self._seen_through = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'negatives': 0, 'filtered': 0, 'remote': 0}
+
+    def record(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def is_complete(self) -> bool:
+        """Whether a number missing from the table is known to be unregistered."""
+        if self.full_sync_at is None or self.synced_at is None:
+            return False
+        return timezone.now() - self.synced_at <= timedelta(seconds=settings.PHONE_MIRROR_MAX_STALENESS)
+
+    def refresh_due(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= settings.PHONE_MIRROR_REFRESH_INTERVAL
+        )
+
+    def refresh(self) -> bool:
+        """
+        Load the table into a new Bloom filter, or add rows changed since the
+        last refresh. Returns False if another thread is already refreshing.
+        """
+        # Checks keep using the current filter (or the registry) while one thread refreshes
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            rows = RegisteredPhone.objects.all()
+            bloom = self.bloom
+            if bloom is None or bloom.count >= bloom.capacity:
+                capacity = max(settings.PHONE_MIRROR_BLOOM_CAPACITY, rows.count() * 2)
+                bloom = BloomFilter(capacity, settings.PHONE_MIRROR_BLOOM_ERROR_RATE)
+                seen_through = None
+            else:
+                seen_through = self._seen_through
+                if seen_through is not None:
+                    rows = rows.filter(updated_at__gte=seen_through - REFRESH_OVERLAP)
+
+            for phone_number, updated_at in rows.values_list('phone_number', 'updated_at').iterator(chunk_size=5000):
+                bloom.add(phone_number)
+                if seen_through is None or updated_at > seen_through:
+                    seen_through = updated_at
+
+            state = MirrorSyncState.objects.filter(pk=1).first()
+            self.full_sync_at = state and state.full_sync_at
+            self.synced_at = state and state.synced_at
+            self.bloom = bloom
+            self._seen_through = seen_through
+            self._refreshed_at = self._current_at = time.monotonic()
+            return True
+        finally:
+            self._lock.release()
+
+    def ensure_current(self) -> bool:
+        """Whether the filter holds every row in the table, refreshing it if another process wrote since."""
+        # Misses within the TTL of the last probe trust the filter without a query
+        checked_at = time.monotonic()
+        if self._current_at is not None and checked_at - self._current_at < settings.PHONE_MIRROR_CURRENT_TTL:
+            return True
+        latest = RegisteredPhone.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+        if latest is None or (self._seen_through is not None and latest <= self._seen_through):
+            self._current_at = checked_at
+            return True
+        return self.refresh()
+
+    def lookup(self, phone_number):
+        return (
+            RegisteredPhone.objects.filter(phone_number=phone_number)
+            .values('registered_at', 'updated_at').first()
+        )
+
+    def is_fresh(self, row, complete) -> bool:
+        """Whether ``row`` may answer "registered" without asking the registry."""
+        max_age = timedelta(seconds=settings.PHONE_MIRROR_POSITIVE_MAX_AGE)
+        return complete or timezone.now() - row['updated_at'] <= max_age
+
+    async def check(self, phone_number):
+        """Answer a check from the mirror, or return None to ask the registry."""
+        number = normalize_e164(phone_number)
+        if number is None:
+            return None
+        try:
+            if self.refresh_due():
+                await sync_to_async(self.refresh)()
+            if self.bloom is None:
+                self.record('remote')
+                return None
+            complete = self.is_complete()
+            # A miss is only definite once rows other processes wrote since the last refresh are in
+            if number not in self.bloom and complete and not await sync_to_async(self.ensure_current)():
+                self.record('remote')
+                return None
+
+            if number in self.bloom:
+                row = await sync_to_async(self.lookup)(number)
+                if row is not None:
+                    if not self.is_fresh(row, complete):
+                        self.record('remote')
+                        return None
+                    self.record('hits')
+                    registered_at = row['registered_at']
+                    return {
+                        'exists': True,
+                        'phone_number': phone_number,
+                        'registered_at': registered_at.isoformat() if registered_at else None,
+                    }
+            else:
+                self.record('filtered')
+        except DatabaseError as exc:
+            logger.warning(f"Phone mirror unavailable, asking the registry: {exc}")
+            self.record('remote')
+            return None
+
+        if complete:
+            self.record('negatives')
+            return {'exists': False, 'phone_number': phone_number, 'registered_at': None}
+        self.record('remote')
+        return None
+
+    def upsert(self, rows: dict):
+        RegisteredPhone.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['phone_number'],
+            update_fields=['registered_at', 'updated_at'],
+            batch_size=500,
+        )
+
+    def remember(self, numbers):
+        bloom = self.bloom
+        # Before the first refresh the filter is built from the table anyway
+        if bloom is not None:
+            for number in numbers:
+                bloom.add(number)
+
+    def record_registered(self, results: list) -> int:
+        """Store numbers the registry confirmed (its result dicts) so later checks answer locally."""
+        rows = {}
+        for item in results:
+            number = normalize_e164(item.get('phone_number'))
+            if number is not None:
+                rows[number] = RegisteredPhone(
+                    phone_number=number, registered_at=parse_registered_at(item.get('registered_at'))
+                )
+        if rows:
+            self.upsert(rows)
+            self.remember(rows)
+        return len(rows)
+
+    def record_check(self, result: dict):
+        """Bring a number's row in line with a registry check result."""
+        if result.get('exists'):
+            self.record_registered([result])
+            return
+        number = normalize_e164(result.get('phone_number'))
+        # Only numbers in the filter can have a (now stale) row
+        if number is not None and self.bloom is not None and number in self.bloom:
+            RegisteredPhone.objects.filter(phone_number=number).delete()
+
+    def apply_changes(self, changes: list, cursor: str, finished: bool) -> dict:
+        """
+        Apply one page of the registry's change feed and save ``cursor``.
+
+        ``finished`` marks the last page; the first pass that finishes from an
+        empty cursor completes the full sync.
+        """
+        rows, deleted = {}, set()
+        for change in changes:
+            number = normalize_e164(change.get('phone_number'))
+            if number is None:
+                continue
+            if change.get('deleted'):
+                rows.pop(number, None)
+                deleted.add(number)
+            else:
+                deleted.discard(number)
+                rows[number] = RegisteredPhone(
+                    phone_number=number, registered_at=parse_registered_at(change.get('registered_at'))
+                )
+
+        with transaction.atomic():
+            if deleted:
+                RegisteredPhone.objects.filter(phone_number__in=deleted).delete()
+            if rows:
+                self.upsert(rows)
+            state = MirrorSyncState.load()
+            state.cursor = cursor
+            if finished:
+                state.synced_at = timezone.now()
+                state.full_sync_at = state.full_sync_at or state.synced_at
+            state.save()
+
+        self.remember(rows)
+        return {'upserted': len(rows), 'deleted': len(deleted)}
+
+    def forget_registered_before(self, cutoff) -> int:
+        """Drop rows the registry's cleanup removed (registered before ``cutoff``)."""
+        deleted, _ = RegisteredPhone.objects.filter(registered_at__lt=cutoff).delete()
+        return deleted
+
+    def info(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            'complete': self.is_complete(),
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None,
+            'bloom': self.bloom.info() if self.bloom else None,
+        }
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    """The process-wide mirror, or None when PHONE_MIRROR_ENABLED is off."""
+    global _mirror
+    if not settings.PHONE_MIRROR_ENABLED:
+        return None
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = PhoneMirror()
+    return _mirror
+
+
+def reset_mirror():
+    """Drop the process-wide mirror so its filter is rebuilt from the table."""
+    global _mirror
+    with _mirror_lock:
+        _mirror = None
@@ -1,3 +1,33 @@
 from django.db import models
 
-# Create your models here.
+
+class RegisteredPhone(models.Model):
+    """A number known to be in the external registry, stored in E.164 form."""
+    phone_number = models.CharField(max_length=16, unique=True)
+    registered_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'registered_phones'
+        indexes = [
+            # Workers pick up rows added since their last refresh
+            models.Index(fields=['updated_at'], name='registered_phones_updated_idx'),
+        ]
+
+    def __str__(self):
+        return self.phone_number
+
+
+class MirrorSyncState(models.Model):
+    """Progress of the delta sync from the registry's change feed (a single row)."""
+    cursor = models.CharField(max_length=255, blank=True, default='')
+    full_sync_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'registered_phones_sync'
+
+    @classmethod
+    def load(cls):
+        state, _ = cls.objects.get_or_create(pk=1)
+        return state
@@ -0,0 +1,220 @@
+"""
+Circuit breaker and adaptive concurrency limit for registry calls.
+
+The breaker opens after a run of consecutive failures (connection errors,
+timeouts, 429 and 5xx responses) and rejects calls until ``reset_timeout``
+has passed. It then lets a few half-open probes through: a successful probe
+closes it again, a failed one re-opens it.
+
+The limiter caps in-flight requests with an AIMD rule: each fast success
+raises the limit by ``1 / limit`` (about +1 per round trip's worth of
+calls) and a failure or call slower than ``latency_target`` shrinks it by
+``backoff``. Like TCP, it shrinks at most once per window: only calls sent
+after the previous decrease count, so a burst of slow calls that were all
+in flight together backs off once. Calls over the limit wait in FIFO order
+for a permit and are only rejected after ``queue_timeout`` seconds.
+
+Both keep plain state and are only touched from the registry client's
+event loop (see ``phone_registry.client``).
+"""
+import asyncio
+import collections
+import math
+import time
+
+from django.conf import settings
+
+
+class RegistryUnavailable(Exception):
+    """The registry is not being called right now; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RegistryUnavailable):
+    pass
+
+
+class ConcurrencyLimitExceeded(RegistryUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout, half_open_max_calls=1, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probes_in_flight = 0
+        self.times_opened = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        if self.state == self.OPEN:
+            remaining = self.reset_timeout - (self.clock() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError('Phone registry circuit is open', math.ceil(remaining))
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+
+        if self.state == self.HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_max_calls:
+                raise CircuitOpenError('Phone registry circuit is half-open', 1)
+            self.probes_in_flight += 1
+
+    def record(self, success):
+        if self.state == self.HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+        if success:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            return
+
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def abandon(self):
+        """A call finished without an outcome (e.g. cancelled)."""
+        if self.state == self.HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+        self.times_opened += 1
+
+    def retry_after(self):
+        if self.state != self.OPEN:
+            return 0
+        return max(0, math.ceil(self.reset_timeout - (self.clock() - self.opened_at)))
+
+    def info(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'times_opened': self.times_opened,
+            'retry_after': self.retry_after(),
+        }
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial, minimum, maximum, latency_target, backoff=0.75, queue_timeout=5.0,
+                 clock=time.monotonic):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self.in_flight = 0
+        self.rejected = 0
+        self.last_latency = None
+        self._decreased_at = None
+        self._waiters = collections.deque()
+
+    async def acquire(self):
+        """Take a permit, waiting up to ``queue_timeout`` seconds for one."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        permit = asyncio.get_running_loop().create_future()
+        self._waiters.append(permit)
+        try:
+            # Shielded so a timeout cannot cancel a permit granted at the same moment
+            await asyncio.wait_for(asyncio.shield(permit), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if permit.done():
+                return
+            self._waiters.remove(permit)
+            permit.cancel()
+            self.rejected += 1
+            raise ConcurrencyLimitExceeded('Phone registry concurrency limit reached', 1)
+        except asyncio.CancelledError:
+            if permit.done():
+                # Granted, but the caller went away: hand the permit on
+                self.release()
+            else:
+                self._waiters.remove(permit)
+                permit.cancel()
+            raise
+
+    def release(self, latency=None, success=True):
+        self.in_flight -= 1
+        if latency is not None:
+            self.last_latency = latency
+            if success and latency <= self.latency_target:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                now = self.clock()
+                # Calls sent before the last decrease already count towards it
+                if self._decreased_at is None or now - latency >= self._decreased_at:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._decreased_at = now
+        self._grant()
+
+    def _grant(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            permit = self._waiters.popleft()
+            if not permit.done():
+                self.in_flight += 1
+                permit.set_result(None)
+
+    def info(self):
+        return {
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'waiting': len(self._waiters),
+            'rejected': self.rejected,
+            'last_latency_ms': round(self.last_latency * 1000, 1) if self.last_latency is not None else None,
+        }
+
+
+_breaker = None
+_limiter = None
+
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            failure_threshold=settings.PHONE_REGISTRY_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.PHONE_REGISTRY_BREAKER_RESET_TIMEOUT,
+            half_open_max_calls=settings.PHONE_REGISTRY_BREAKER_HALF_OPEN_CALLS,
+        )
+    return _breaker
+
+
+def get_limiter() -> AdaptiveLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveLimiter(
+            initial=settings.PHONE_REGISTRY_LIMIT_INITIAL,
+            minimum=settings.PHONE_REGISTRY_LIMIT_MIN,
+            maximum=settings.PHONE_REGISTRY_LIMIT_MAX,
+            latency_target=settings.PHONE_REGISTRY_LIMIT_LATENCY_TARGET,
+            queue_timeout=settings.PHONE_REGISTRY_LIMIT_QUEUE_TIMEOUT,
+        )
+    return _limiter
+
+
+def reset_resilience():
+    """Forget breaker and limiter state so they are rebuilt from current settings."""
+    global _breaker, _limiter
+    _breaker = None
+    _limiter = None
+
+
+def resilience_info():
+    return {'circuit_breaker': get_breaker().info(), 'concurrency_limit': get_limiter().info()}
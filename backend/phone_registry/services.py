@@ -1,6 +1,18 @@
 import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.utils import timezone
 import logging
+import time
+from datetime import timedelta
+
+from dashboard.metrics import observe_upstream
+
+from . import coalesce, resilience
+from .cache import get_check_cache
+from .client import registry_client
+from .mirror import get_mirror
+from .models import MirrorSyncState
 
 logger = logging.getLogger(__name__)
 
@@ -12,34 +24,125 @@ class PhoneRegistryService:
         self.base_url = settings.PHONE_REGISTRY_URL
         self.api_key = settings.PHONE_REGISTRY_API_KEY
 
-    async def check_phone(self, phone_number: str) -> dict:
-        """Check if a phone number exists in the registry."""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/phone/check",
-                    json={"phone_number": phone_number},
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        """Send a request through the pooled registry client, guarded by the breaker and limiter."""
+        async def send():
+            breaker = resilience.get_breaker()
+            limiter = resilience.get_limiter()
+            breaker.before_call()
+            try:
+                await limiter.acquire()
+            except BaseException:
+                breaker.abandon()
+                raise
+
+            started = time.monotonic()
+            outcome = None
+            status = 'error'
+            try:
+                response = await registry_client.client.request(
+                    method,
+                    f"{self.base_url}{path}",
                     headers={"X-API-Key": self.api_key},
-                    timeout=10.0
+                    **kwargs
                 )
-                response.raise_for_status()
-                return response.json()
+                status = response.status_code
+                # Client errors are our fault, not a sign the registry is unhealthy
+                outcome = response.status_code < 500 and response.status_code != 429
+            except httpx.TransportError:
+                outcome = False
+                raise
+            finally:
+                observe_upstream(method, path, status, time.monotonic() - started)
+                if outcome is None:
+                    limiter.release()
+                    breaker.abandon()
+                else:
+                    limiter.release(time.monotonic() - started, outcome)
+                    breaker.record(outcome)
+
+            response.raise_for_status()
+            return response.json()
+
+        return await registry_client.run(send())
+
+    async def _remember_registered(self, results: list, phone_numbers: list):
+        """Update cached checks after a registration so stale "not found" answers are dropped."""
+        cache = get_check_cache()
+        confirmed = set()
+        for item in results:
+            if isinstance(item, dict) and item.get("success") and item.get("phone_number"):
+                confirmed.add(item["phone_number"])
+                await cache.mark_registered(item["phone_number"], item.get("registered_at"))
+        for phone_number in phone_numbers:
+            if phone_number not in confirmed:
+                await cache.delete(phone_number)
+
+        mirror = get_mirror()
+        if mirror is not None and confirmed:
+            await sync_to_async(mirror.record_registered)(
+                [item for item in results if isinstance(item, dict) and item.get("phone_number") in confirmed]
+            )
+
+    async def check_phone(self, phone_number: str) -> dict:
+        """Check if a phone number exists in the registry, answering from the mirror or cache when possible."""
+        mirror = get_mirror()
+        if mirror is not None:
+            # In the caller's context, not on the registry loop, so lookups use Django's sync thread
+            result = await mirror.check(phone_number)
+            if result is not None:
+                return result
+        try:
+            result, fetched = await registry_client.run(self._check_phone(phone_number))
         except httpx.HTTPError as e:
             logger.error(f"Error checking phone number: {e}")
             raise Exception(f"Failed to check phone number: {str(e)}")
+        if mirror is not None and fetched:
+            # Refreshes an aged-out row, or drops one the registry no longer has
+            await sync_to_async(mirror.record_check)(result)
+        return result
+
+    async def _check_phone(self, phone_number: str) -> tuple:
+        """Return the result and whether it came from the registry rather than the cache."""
+        # Runs on the registry loop, where the coalescing state lives
+        cached = await get_check_cache().get(phone_number)
+        if cached is not None:
+            return cached, False
+        result = await coalesce.check_flights.do(phone_number, lambda: self._fetch_check(phone_number))
+        return result, True
+
+    async def _fetch_check(self, phone_number: str) -> dict:
+        batcher = coalesce.get_check_batcher()
+        if batcher is not None:
+            result = await batcher.submit(phone_number, self._fetch_check_batch)
+        else:
+            result = await self._request(
+                "POST",
+                "/api/phone/check",
+                json={"phone_number": phone_number},
+            )
+        await get_check_cache().set(phone_number, result)
+        return result
+
+    async def _fetch_check_batch(self, phone_numbers: list) -> dict:
+        """Check many numbers with one upstream call, keyed by phone number."""
+        response = await self._request(
+            "POST",
+            settings.PHONE_REGISTRY_BATCH_CHECK_PATH,
+            json={"phone_numbers": phone_numbers},
+        )
+        return {item["phone_number"]: item for item in response.get("results", [])}
 
     async def register_phone(self, phone_number: str) -> dict:
         """Register a phone number in the registry."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/phone/register",
-                    json={"phone_number": phone_number},
-                    headers={"X-API-Key": self.api_key},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
+            result = await self._request(
+                "POST",
+                "/api/phone/register",
+                json={"phone_number": phone_number},
+            )
+            await self._remember_registered([result], [phone_number])
+            return result
         except httpx.HTTPError as e:
             logger.error(f"Error registering phone number: {e}")
             raise Exception(f"Failed to register phone number: {str(e)}")
@@ -47,31 +150,61 @@ class PhoneRegistryService:
     async def bulk_register_phones(self, phone_numbers: list) -> dict:
         """Bulk register phone numbers."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/phone/bulk-register",
-                    json={"phone_numbers": phone_numbers},
-                    headers={"X-API-Key": self.api_key},
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            result = await self._request(
+                "POST",
+                "/api/phone/bulk-register",
+                json={"phone_numbers": phone_numbers},
+                timeout=settings.PHONE_REGISTRY_BULK_TIMEOUT,
+            )
+            await self._remember_registered(result.get("results") or [], phone_numbers)
+            return result
         except httpx.HTTPError as e:
             logger.error(f"Error bulk registering phone numbers: {e}")
-            raise Exception(f"Failed to bulk register phone numbers: {str(e)}")
+            raise Exception(f"Failed to bulk register phone numbers: {str(e)}") from e
 
     async def cleanup_old_records(self, days: int = 90) -> dict:
         """Cleanup old phone registry records."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"{self.base_url}/api/phone/cleanup",
-                    params={"days": days},
-                    headers={"X-API-Key": self.api_key},
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            result = await self._request(
+                "DELETE",
+                "/api/phone/cleanup",
+                params={"days": days},
+                timeout=settings.PHONE_REGISTRY_BULK_TIMEOUT,
+            )
         except httpx.HTTPError as e:
             logger.error(f"Error cleaning up old records: {e}")
             raise Exception(f"Failed to cleanup old records: {str(e)}")
+
+        # Cached positives may name numbers the cleanup just removed
+        await get_check_cache().clear()
+        mirror = get_mirror()
+        if mirror is not None:
+            await sync_to_async(mirror.forget_registered_before)(timezone.now() - timedelta(days=days))
+        return result
+
+    async def sync_mirror(self) -> dict:
+        """Pull registry changes since the saved cursor into the local mirror."""
+        mirror = get_mirror()
+        if mirror is None:
+            return {"enabled": False}
+
+        cursor = (await sync_to_async(MirrorSyncState.load)()).cursor
+        totals = {"pages": 0, "upserted": 0, "deleted": 0}
+        try:
+            while True:
+                page = await self._request(
+                    "GET",
+                    settings.PHONE_REGISTRY_SYNC_PATH,
+                    params={"since": cursor, "limit": settings.PHONE_MIRROR_SYNC_BATCH_SIZE},
+                )
+                cursor = page.get("cursor") or cursor
+                finished = not page.get("has_more")
+                applied = await sync_to_async(mirror.apply_changes)(page.get("changes") or [], cursor, finished)
+                totals["pages"] += 1
+                totals["upserted"] += applied["upserted"]
+                totals["deleted"] += applied["deleted"]
+                if finished:
+                    return {**totals, "cursor": cursor}
+        except httpx.HTTPError as e:
+            logger.error(f"Error syncing phone registry mirror: {e}")
+            raise Exception(f"Failed to sync phone registry mirror: {str(e)}")
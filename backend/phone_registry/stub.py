@@ -0,0 +1,191 @@
+"""
+Local stand-in for the external phone registry.
+
+Implements the endpoints PhoneRegistryService talks to, with configurable
+latency and failure rate, for tests, benchmarks and offline development:
+
+    python -m phone_registry.stub --port 8001 --delay 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubRegistryHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; with Nagle on, keep-alive
+    # clients wait ~40 ms for a delayed ACK on every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+    def handle_request(self, method):
+        registry = self.server.registry
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        registry.record_request(url.path)
+        if registry.delay:
+            time.sleep(registry.delay)
+        if registry.should_fail():
+            return self.respond(503, {'detail': 'Registry unavailable'})
+
+        route = (method, url.path)
+        if route == ('POST', '/api/phone/check'):
+            self.respond(200, registry.check(body['phone_number']))
+        elif route == ('POST', '/api/phone/bulk-check'):
+            self.respond(200, {'results': [registry.check(number) for number in body['phone_numbers']]})
+        elif route == ('POST', '/api/phone/register'):
+            self.respond(201, registry.register(body['phone_number']))
+        elif route == ('POST', '/api/phone/bulk-register'):
+            results = [registry.register(number) for number in body['phone_numbers']]
+            self.respond(200, {'success': len(results), 'failed': 0, 'results': results})
+        elif route == ('GET', '/api/phone/changes'):
+            query = parse_qs(url.query)
+            since = int(query.get('since', ['0'])[0] or 0)
+            limit = int(query.get('limit', ['1000'])[0])
+            self.respond(200, registry.changes_since(since, limit))
+        elif route == ('DELETE', '/api/phone/cleanup'):
+            days = int(parse_qs(url.query).get('days', ['90'])[0])
+            self.respond(200, {'deleted': registry.cleanup(days)})
+        else:
+            self.respond(404, {'detail': 'Not found'})
+
+    def respond(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubRegistryServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open many connections at once
+    request_queue_size = 1024
+
+
+class StubRegistry:
+    """In-memory registry served over HTTP from a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, failure_rate=0.0):
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.numbers = {}
+        # Change feed for mirror syncs: (phone_number, registered_at, deleted)
+        self.changes = []
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.server = StubRegistryServer((host, port), StubRegistryHandler)
+        self.server.registry = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def record_request(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def should_fail(self):
+        with self._lock:
+            return self.failure_rate and self._random.random() < self.failure_rate
+
+    def check(self, phone_number):
+        registered_at = self.numbers.get(phone_number)
+        return {
+            'exists': registered_at is not None,
+            'phone_number': phone_number,
+            'registered_at': registered_at,
+        }
+
+    def register(self, phone_number):
+        with self._lock:
+            if phone_number not in self.numbers:
+                self.numbers[phone_number] = datetime.now(timezone.utc).isoformat()
+                self.changes.append((phone_number, self.numbers[phone_number], False))
+            registered_at = self.numbers[phone_number]
+        return {'success': True, 'phone_number': phone_number, 'registered_at': registered_at}
+
+    def cleanup(self, days):
+        with self._lock:
+            cutoff = time.time() - days * 86400
+            stale = [
+                number for number, registered_at in self.numbers.items()
+                if datetime.fromisoformat(registered_at).timestamp() < cutoff
+            ]
+            for number in stale:
+                del self.numbers[number]
+                self.changes.append((number, None, True))
+        return len(stale)
+
+    def changes_since(self, since, limit):
+        """A page of the change feed; the cursor is the position in the log."""
+        with self._lock:
+            page = self.changes[since:since + limit]
+            cursor = since + len(page)
+            has_more = cursor < len(self.changes)
+        return {
+            'changes': [
+                {'phone_number': number, 'registered_at': registered_at, 'deleted': deleted}
+                for number, registered_at, deleted in page
+            ],
+            'cursor': str(cursor),
+            'has_more': has_more,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local stand-in phone registry.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to sleep per request')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    registry = StubRegistry(args.host, args.port, args.delay, args.failure_rate)
+    print(f'Stub phone registry listening on {registry.url}')
+    try:
+        registry.server.serve_forever()
+    except KeyboardInterrupt:
+        registry.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,16 @@ from .views import (
     PhoneCheckView,
     PhoneRegisterView,
     PhoneBulkRegisterView,
-    PhoneCleanupView
+    PhoneBulkRegisterStreamView,
+    PhoneCleanupView,
+    PhoneCacheStatsView,
 )
 
 urlpatterns = [
     path('phone/check', PhoneCheckView.as_view(), name='phone-check'),
     path('phone/register', PhoneRegisterView.as_view(), name='phone-register'),
     path('phone/bulk-register', PhoneBulkRegisterView.as_view(), name='phone-bulk-register'),
+    path('phone/bulk-register/stream', PhoneBulkRegisterStreamView.as_view(), name='phone-bulk-register-stream'),
     path('phone/cleanup', PhoneCleanupView.as_view(), name='phone-cleanup'),
+    path('phone/cache', PhoneCacheStatsView.as_view(), name='phone-cache-stats'),
 ]
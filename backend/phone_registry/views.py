@@ -1,108 +1,212 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
+import json
+import logging
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
-from asgiref.sync import async_to_sync
+
+from jobs.queue import aenqueue
+from jobs.views import accepted_body
+
 from .serializers import (
     PhoneCheckSerializer,
     PhoneRegisterSerializer,
     PhoneBulkRegisterSerializer,
-    PhoneCheckResponseSerializer,
-    PhoneRegisterResponseSerializer,
-    PhoneBulkRegisterResponseSerializer
 )
+from . import coalesce
+from .cache import get_check_cache
+from .mirror import get_mirror
+from .bulk import chunk_numbers, parse_lines, read_lines, run_pipeline, stream_ndjson
+from .resilience import RegistryUnavailable
 from .services import PhoneRegistryService
-import logging
 
 logger = logging.getLogger(__name__)
 
 
-class PhoneCheckView(APIView):
-    """Check if a phone number exists."""
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """
+    Base for async-native JSON endpoints.
+
+    Served by an ASGI worker, handlers await the registry without holding a
+    thread, so one worker multiplexes many in-flight registry calls. Request
+    parsing and error bodies follow DRF's conventions.
+    """
+
+    def parse_json(self, request):
+        """Return the decoded JSON body, or a 400 response if it is malformed."""
+        try:
+            return json.loads(request.body or b'{}'), None
+        except ValueError as e:
+            return None, JsonResponse(
+                {'detail': f'JSON parse error - {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-    def post(self, request):
-        serializer = PhoneCheckSerializer(data=request.data)
+    def validate(self, serializer_class, request):
+        """Return validated data, or a 400 response with serializer errors."""
+        data, error = self.parse_json(request)
+        if error:
+            return None, error
+        serializer = serializer_class(data=data)
         if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return None, JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return serializer.validated_data, None
+
+    def accepted(self, job):
+        """202 pointing the client at the queued job's status URL."""
+        body = accepted_body(job)
+        response = JsonResponse(body, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = body['status_url']
+        return response
+
+    def unavailable(self, exc):
+        """Fail fast while the registry circuit is open or the concurrency limit is reached."""
+        response = JsonResponse(
+            {'detail': str(exc)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        response['Retry-After'] = str(exc.retry_after)
+        return response
+
+
+class PhoneCheckView(AsyncAPIView):
+    """Check if a phone number exists."""
+
+    async def post(self, request):
+        data, error = self.validate(PhoneCheckSerializer, request)
+        if error:
+            return error
+
+        phone_number = data['phone_number']
 
-        phone_number = serializer.validated_data['phone_number']
-        
         try:
             service = PhoneRegistryService()
-            result = async_to_sync(service.check_phone)(phone_number)
-            return Response(result, status=status.HTTP_200_OK)
+            result = await service.check_phone(phone_number)
+            return JsonResponse(result, status=status.HTTP_200_OK)
+        except RegistryUnavailable as e:
+            return self.unavailable(e)
         except Exception as e:
             logger.error(f"Error checking phone: {e}")
-            return Response(
+            return JsonResponse(
                 {'detail': 'Failed to check phone number'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
-class PhoneRegisterView(APIView):
+class PhoneRegisterView(AsyncAPIView):
     """Register a phone number."""
 
-    def post(self, request):
-        serializer = PhoneRegisterSerializer(data=request.data)
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    async def post(self, request):
+        data, error = self.validate(PhoneRegisterSerializer, request)
+        if error:
+            return error
+
+        phone_number = data['phone_number']
 
-        phone_number = serializer.validated_data['phone_number']
-        
         try:
             service = PhoneRegistryService()
-            result = async_to_sync(service.register_phone)(phone_number)
-            return Response(result, status=status.HTTP_201_CREATED)
+            result = await service.register_phone(phone_number)
+            return JsonResponse(result, status=status.HTTP_201_CREATED)
+        except RegistryUnavailable as e:
+            return self.unavailable(e)
         except Exception as e:
             logger.error(f"Error registering phone: {e}")
-            return Response(
+            return JsonResponse(
                 {'detail': 'Failed to register phone number'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
-class PhoneBulkRegisterView(APIView):
-    """Bulk register phone numbers."""
+class PhoneBulkRegisterView(AsyncAPIView):
+    """Queue a bulk registration job (202 Accepted)."""
 
-    def post(self, request):
-        serializer = PhoneBulkRegisterSerializer(data=request.data)
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    async def post(self, request):
+        data, error = self.validate(PhoneBulkRegisterSerializer, request)
+        if error:
+            return error
 
-        phone_numbers = serializer.validated_data['phone_numbers']
-        
-        try:
-            service = PhoneRegistryService()
-            result = async_to_sync(service.bulk_register_phones)(phone_numbers)
-            return Response(result, status=status.HTTP_200_OK)
-        except Exception as e:
-            logger.error(f"Error bulk registering phones: {e}")
-            return Response(
-                {'detail': 'Failed to bulk register phone numbers'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        # Queued for run_jobs; poll the returned status_url for the result
+        job = await aenqueue('phone_registry.bulk_register', {'phone_numbers': data['phone_numbers']})
+        return self.accepted(job)
+
+
+class PhoneBulkRegisterStreamView(AsyncAPIView):
+    """
+    Bulk register an arbitrarily large CSV or NDJSON upload.
+
+    Numbers are sent in chunks with bounded concurrency and retries, and each
+    chunk's outcome is streamed back as one NDJSON line.
+    """
+
+    content_types = ('text/csv', 'text/plain', 'application/x-ndjson', 'application/ndjson')
+
+    async def post(self, request):
+        if request.content_type not in self.content_types:
+            return JsonResponse(
+                {'detail': f'Unsupported media type "{request.content_type}" in request.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
             )
 
+        try:
+            chunk_size = self.bounded_int(request, 'chunk_size', settings.PHONE_BULK_CHUNK_SIZE, 1000)
+            concurrency = self.bounded_int(request, 'concurrency', settings.PHONE_BULK_CONCURRENCY, 32)
+        except ValueError as e:
+            return JsonResponse({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Reads the body line by line, off the event loop, instead of loading it whole
+        chunks = chunk_numbers(parse_lines(read_lines(request), request.content_type), chunk_size)
+        records = run_pipeline(
+            PhoneRegistryService(),
+            chunks,
+            concurrency=concurrency,
+            max_retries=settings.PHONE_BULK_MAX_RETRIES,
+            backoff=settings.PHONE_BULK_RETRY_BACKOFF,
+        )
+        return StreamingHttpResponse(stream_ndjson(records), content_type='application/x-ndjson')
+
+    @staticmethod
+    def bounded_int(request, name, default, maximum):
+        value = request.GET.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be an integer')
+        if not 1 <= value <= maximum:
+            raise ValueError(f'{name} must be between 1 and {maximum}')
+        return value
+
+
+class PhoneCleanupView(AsyncAPIView):
+    """Queue a cleanup of old phone registry records (202 Accepted)."""
 
-class PhoneCleanupView(APIView):
-    """Cleanup old phone registry records."""
+    async def delete(self, request):
+        days = request.GET.get('days', 90)
 
-    def delete(self, request):
-        days = request.query_params.get('days', 90)
-        
         try:
             days = int(days)
         except ValueError:
-            return Response(
+            return JsonResponse(
                 {'detail': 'days must be an integer'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        try:
-            service = PhoneRegistryService()
-            result = async_to_sync(service.cleanup_old_records)(days)
-            return Response(result, status=status.HTTP_200_OK)
-        except Exception as e:
-            logger.error(f"Error cleaning up phone records: {e}")
-            return Response(
-                {'detail': 'Failed to cleanup phone records'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+
+        job = await aenqueue('phone_registry.cleanup', {'days': days})
+        return self.accepted(job)
+
+
+class PhoneCacheStatsView(AsyncAPIView):
+    """Hit/miss counters for the local mirror, the phone check cache and request coalescing."""
+
+    async def get(self, request):
+        batcher = coalesce.get_check_batcher()
+        mirror = get_mirror()
+        return JsonResponse({
+            **get_check_cache().info(),
+            'single_flight': coalesce.check_flights.info(),
+            'micro_batching': batcher.info() if batcher else None,
+            'mirror': mirror.info() if mirror else None,
+        }, status=status.HTTP_200_OK)
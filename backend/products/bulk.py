@@ -0,0 +1,211 @@
+"""
+Bulk product import and streaming export.
+
+Imports validate each batch with ProductCreateSerializer(many=True), compute
+contract_end_date and status in Python instead of per-row save() calls,
+and insert valid rows with bulk_create one transaction per batch.
+
+Exports stream rows from a chunked (server-side on PostgreSQL) cursor as
+CSV or NDJSON, so the table is never loaded into memory at once.
+"""
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Product, contract_end_date_for, status_for
+from .rollups import RollupDelta, apply_delta, product_values
+from .serializers import ProductCreateSerializer, ProductSerializer
+from .signals import products_bulk_changed
+
+CSV_CONTENT_TYPES = ('text/csv',)
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson')
+
+EXPORT_FIELDS = ProductSerializer.Meta.fields
+
+# Per-row errors beyond this are counted but not reported individually
+MAX_REPORTED_ERRORS = 1000
+
+
+def iter_csv_rows(lines):
+    """Yield dicts from CSV lines, omitting empty cells so optional fields default."""
+    decoded = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in lines)
+    for row in csv.DictReader(decoded):
+        yield {key: value for key, value in row.items() if key and value not in ('', None)}
+
+
+def iter_ndjson_rows(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_batch(batch):
+    """Return ``(validated data, None)`` or ``(None, errors)`` for each row in ``batch``."""
+    # Unparseable lines arrive as None
+    rows = [row for row in batch if isinstance(row, dict)]
+    serializer = ProductCreateSerializer(data=rows, many=True)
+    if serializer.is_valid():
+        results = iter([(data, None) for data in serializer.validated_data])
+    else:
+        # One failing row discards the list's validated data, so only the
+        # rows that passed are validated again
+        row_errors = serializer.errors
+        if isinstance(row_errors, list):
+            # DRF's list error format (LIST_SERIALIZER_ERRORS_AS_DICT off)
+            row_errors = dict(enumerate(row_errors))
+        results = iter([
+            (None, row_errors[index]) if row_errors.get(index) else (serializer.child.run_validation(row), None)
+            for index, row in enumerate(rows)
+        ])
+    return [
+        next(results) if isinstance(row, dict) else (None, {'non_field_errors': ['Invalid row']})
+        for row in batch
+    ]
+
+
+def import_products(rows, batch_size=None) -> dict:
+    """
+    Validate and insert ``rows`` (an iterable of dicts) in batches.
+
+    Returns the number of products created and failed, with per-row errors
+    keyed by the row's position in the input (starting at 1).
+    """
+    batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+    now = timezone.now()
+    created = failed = 0
+    errors = []
+    row_number = 0
+
+    for batch in batched(rows, batch_size):
+        products = []
+        for data, row_errors in validate_batch(batch):
+            row_number += 1
+            if row_errors:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'errors': row_errors})
+                continue
+
+            end_date = contract_end_date_for(data['contract_start_date'], data['contract_months'])
+            products.append(Product(
+                **data,
+                contract_end_date=end_date,
+                status=status_for(end_date, now),
+            ))
+
+        if products:
+            rollup_delta = RollupDelta()
+            for product in products:
+                rollup_delta.add_product(product_values(product))
+            with transaction.atomic():
+                Product.objects.bulk_create(products)
+                apply_delta(rollup_delta)
+            created += len(products)
+
+    if created:
+        products_bulk_changed.send(sender=Product, action='import', count=created)
+    return {'created': created, 'failed': failed, 'errors': errors}
+
+
+def export_converters():
+    """Per-field converters producing the same values as ProductSerializer."""
+    datetime_field = serializers.DateTimeField()
+    converters = {
+        'id': str,
+        'contract_start_date': datetime_field.to_representation,
+        'contract_end_date': datetime_field.to_representation,
+        'created_at': datetime_field.to_representation,
+        'updated_at': datetime_field.to_representation,
+    }
+    return [converters.get(field) for field in EXPORT_FIELDS]
+
+
+def csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+class ExportWriter:
+    """Formats exported rows as CSV or NDJSON, handing back text every ``chunk_size`` rows."""
+
+    def __init__(self, export_format, chunk_size):
+        self.converters = export_converters()
+        self.chunk_size = chunk_size
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer) if export_format == 'csv' else None
+        if self.writer:
+            self.writer.writerow(EXPORT_FIELDS)
+        self.pending = 0
+
+    def write(self, row):
+        """Add a ``values()`` row; returns the buffered text once a chunk is full, else None."""
+        values = [
+            convert(row[field]) if convert and row[field] is not None else row[field]
+            for field, convert in zip(EXPORT_FIELDS, self.converters)
+        ]
+        if self.writer:
+            self.writer.writerow([csv_cell(value) for value in values])
+        else:
+            self.buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, values)), ensure_ascii=False))
+            self.buffer.write('\n')
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            return self.flush()
+        return None
+
+    def flush(self):
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.pending = 0
+        return text
+
+
+def export_products(queryset, export_format, chunk_size=2000):
+    """Yield ``queryset`` as CSV or NDJSON text, a chunk of rows at a time (WSGI)."""
+    writer = ExportWriter(export_format, chunk_size)
+    for row in queryset.values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        text = writer.write(row)
+        if text:
+            yield text
+    text = writer.flush()
+    if text:
+        yield text
+
+
+async def aexport_products(queryset, export_format, chunk_size=2000):
+    """Async export_products for ASGI, fetching each chunk of rows in a worker thread."""
+    writer = ExportWriter(export_format, chunk_size)
+    # values() rather than values_list(): its iterable defers the query until
+    # the first chunk is fetched in a worker thread
+    async for row in queryset.values(*EXPORT_FIELDS).aiterator(chunk_size=chunk_size):
+        text = writer.write(row)
+        if text:
+            yield text
+    text = writer.flush()
+    if text:
+        yield text
@@ -0,0 +1,28 @@
+"""
+Cache versioning for product read paths.
+
+Every product change bumps a version counter in the cache; cached results are
+keyed on it, so an increment invalidates all of them at once. With the
+default per-process cache each worker keeps its own counter, so point
+REDIS_URL at a shared cache to invalidate across workers immediately.
+"""
+from django.core.cache import cache
+
+STATS_VERSION_KEY = 'products:stats:version'
+
+
+def get_stats_version() -> int:
+    """Return the current stats cache version, bumped on every product change."""
+    version = cache.get(STATS_VERSION_KEY)
+    if version is None:
+        cache.add(STATS_VERSION_KEY, 1, timeout=None)
+        version = cache.get(STATS_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_stats_cache():
+    """Drop cached stats by moving every reader onto a new cache version."""
+    try:
+        cache.incr(STATS_VERSION_KEY)
+    except ValueError:
+        cache.add(STATS_VERSION_KEY, 1, timeout=None)
@@ -0,0 +1,56 @@
+"""
+HTTP conditional request support (ETag / Last-Modified) for product reads.
+
+Validators come from cheap queries or cached values, so a client holding a
+current copy gets a 304 before anything is serialized.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_stats_version
+
+
+def make_etag(*parts) -> str:
+    """Return a quoted strong ETag hashed from ``parts``."""
+    digest = hashlib.blake2b('|'.join(str(part) for part in parts).encode(), digest_size=16)
+    return quote_etag(digest.hexdigest())
+
+
+def list_etag(request) -> str:
+    """
+    Return the ETag for a product listing, before anything is queried.
+
+    Hashes the table-wide stats version (bumped by every save, delete and
+    bulk write), the accepted media type and the normalized query string, so
+    any product change or different page/filter/field set changes the tag.
+    With the default per-process cache each worker keeps its own version;
+    point REDIS_URL at a shared cache so a write elsewhere is seen at once.
+    """
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    return make_etag('list', get_stats_version(), request.accepted_media_type, *params)
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 (or 412) response when the client's copy is current, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach validators and revalidation directives to a product read response."""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # private: responses must not be shared by intermediaries; browsers keep
+    # them for PRODUCT_HTTP_MAX_AGE seconds and then revalidate with the ETag.
+    patch_cache_control(
+        response, private=True, max_age=settings.PRODUCT_HTTP_MAX_AGE, must_revalidate=True,
+    )
+    patch_vary_headers(response, ('Accept',))
+    return response
@@ -0,0 +1,263 @@
+"""
+Live product change events.
+
+Product signals publish small JSON events after their transaction commits.
+Every process fans events out to its own subscribers (SSE or WebSocket
+connections) from one in-memory EventBroker, so a single change or database
+notification serves every open tab. Subscribers also get a debounced
+``stats`` event carrying fresh dashboard stats and their delta, computed once
+per process rather than once per client.
+
+With the ``memory`` layer events only reach subscribers in the publishing
+process. The ``postgres`` layer routes them through ``NOTIFY`` instead, and
+each process that has subscribers ``LISTEN``s on one dedicated connection.
+"""
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import select
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'product_events'
+
+
+class EventBroker:
+    """In-process fan-out of events to subscriber queues on the server's event loop."""
+
+    def __init__(self, queue_size=100, stats_debounce=0.5):
+        self.queue_size = queue_size
+        self.stats_debounce = stats_debounce
+        self.loop = None
+        self.subscribers = set()
+        self.last_stats = None
+        self._stats_pending = False
+
+    def subscribe(self):
+        """Register a subscriber on the running loop and return its queue."""
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def dispatch(self, event):
+        """Deliver ``event`` to every subscriber; safe to call from any thread."""
+        loop = self.loop
+        if loop is None or loop.is_closed() or not self.subscribers:
+            return
+        # Run in a fresh context: the publisher may be inside sync_to_async, whose
+        # context would otherwise leak into the stats task and trip its deadlock guard
+        loop.call_soon_threadsafe(self._deliver, event, context=contextvars.Context())
+
+    def _deliver(self, event):
+        for queue in list(self.subscribers):
+            put(queue, event)
+        if event['type'] != 'stats' and not self._stats_pending:
+            self._stats_pending = True
+            self.loop.create_task(self._publish_stats())
+
+    async def _publish_stats(self):
+        """Recompute stats once per burst of changes and broadcast them with a delta."""
+        from .services import get_dashboard_stats
+
+        await asyncio.sleep(self.stats_debounce)
+        self._stats_pending = False
+        if not self.subscribers:
+            return
+        try:
+            stats = await sync_to_async(get_dashboard_stats)()
+        except Exception:
+            logger.exception("Failed to compute stats for live subscribers")
+            return
+        previous = self.last_stats or {}
+        self.last_stats = stats
+        delta = {key: value - previous.get(key, 0) for key, value in stats.items() if value != previous.get(key)}
+        if delta:
+            self._deliver({'type': 'stats', 'stats': stats, 'delta': delta})
+
+
+def put(queue, event):
+    """Queue ``event``, replacing a slow subscriber's backlog with a single resync."""
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({'type': 'resync'})
+
+
+class MemoryChannelLayer:
+    """Delivers events to subscribers of the publishing process only."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, event):
+        self.broker.dispatch(event)
+
+    def ensure_listening(self):
+        pass
+
+
+class PostgresChannelLayer:
+    """Routes events through Postgres NOTIFY so every process's subscribers see them."""
+
+    def __init__(self, broker, alias='default', channel=NOTIFY_CHANNEL):
+        self.broker = broker
+        self.alias = alias
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def publish(self, event):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps(event)])
+
+    def ensure_listening(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, name='product-events-listen', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                self._listen_once()
+            except Exception:
+                logger.exception("Product event listener failed, reconnecting")
+                time.sleep(5)
+
+    def _listen_once(self):
+        # A dedicated connection outside Django's per-thread handling and any
+        # connection pool, kept in autocommit
+        wrapper = connections[self.alias]
+        conn = wrapper.Database.connect(**wrapper.get_connection_params())
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.channel}')
+            for payload in notify_payloads(conn):
+                try:
+                    self.broker.dispatch(json.loads(payload))
+                except ValueError:
+                    logger.warning(f"Ignoring malformed product event: {payload!r}")
+        finally:
+            conn.close()
+
+
+def notify_payloads(conn, timeout=30):
+    """Yield NOTIFY payloads received on ``conn`` forever, with psycopg 2 or 3."""
+    while True:
+        if is_psycopg3:
+            for notify in conn.notifies(timeout=timeout):
+                yield notify.payload
+            continue
+        if select.select([conn], [], [], timeout) == ([], [], []):
+            continue
+        conn.poll()
+        while conn.notifies:
+            yield conn.notifies.pop(0).payload
+
+
+broker = EventBroker()
+_layer = None
+
+
+def get_channel_layer():
+    global _layer
+    if _layer is None:
+        backend = settings.PRODUCT_EVENTS_BACKEND
+        if backend == 'auto':
+            backend = 'postgres' if connection.vendor == 'postgresql' else 'memory'
+        _layer = PostgresChannelLayer(broker) if backend == 'postgres' else MemoryChannelLayer(broker)
+    return _layer
+
+
+def reset_channel_layer():
+    global _layer
+    _layer = None
+
+
+def publish_product_event(event):
+    """Publish ``event`` once the surrounding transaction commits."""
+    def send():
+        try:
+            get_channel_layer().publish(event)
+        except Exception:
+            logger.exception("Failed to publish product event")
+
+    transaction.on_commit(send)
+
+
+def stats_snapshot():
+    """Current dashboard stats as a ``stats`` event, sent when a subscriber connects."""
+    from .services import get_dashboard_stats
+
+    stats = get_dashboard_stats()
+    broker.last_stats = broker.last_stats or stats
+    return {'type': 'stats', 'stats': stats, 'delta': {}}
+
+
+@contextlib.asynccontextmanager
+async def subscription():
+    """Subscribe the current connection and yield its event queue."""
+    await sync_to_async(get_channel_layer().ensure_listening)()
+    queue = broker.subscribe()
+    try:
+        yield queue
+    finally:
+        broker.unsubscribe(queue)
+
+
+def sse_message(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def sse_stream(heartbeat):
+    """Server-Sent Events for one client, with a comment line every ``heartbeat`` seconds."""
+    async with subscription() as queue:
+        yield sse_message(await sync_to_async(stats_snapshot)())
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield sse_message(event)
+
+
+async def websocket_application(scope, receive, send):
+    """ASGI WebSocket endpoint pushing the same events as the SSE stream."""
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    await send({'type': 'websocket.accept'})
+    async with subscription() as queue:
+        await send({'type': 'websocket.send', 'text': json.dumps(await sync_to_async(stats_snapshot)())})
+        client = asyncio.ensure_future(receive())
+        try:
+            while True:
+                event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({client, event}, return_when=asyncio.FIRST_COMPLETED)
+                if event in done:
+                    await send({'type': 'websocket.send', 'text': json.dumps(event.result())})
+                    continue
+                event.cancel()
+                if client.result()['type'] == 'websocket.disconnect':
+                    return
+                # Incoming messages are ignored; keep listening for disconnect
+                client = asyncio.ensure_future(receive())
+        finally:
+            client.cancel()
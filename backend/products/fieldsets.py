@@ -0,0 +1,49 @@
+"""
+Sparse fieldsets for product listings.
+
+``?fields=`` and ``?exclude=`` take comma-separated field names or preset
+names and narrow both the SQL SELECT and the response to the result.
+"""
+from rest_framework.exceptions import ValidationError
+
+from .serializers import ProductSerializer
+
+FIELDS_QUERY_PARAM = 'fields'
+EXCLUDE_QUERY_PARAM = 'exclude'
+
+PRODUCT_FIELD_PRESETS = {
+    'summary': ['id', 'name', 'status', 'contract_end_date', 'customer_telegram'],
+    # What the Products page renders
+    'table': [
+        'id', 'name', 'description', 'bot_username', 'website_link', 'contract_months',
+        'contract_end_date', 'status', 'customer_telegram',
+    ],
+}
+
+
+def expand_fields(param, value, available):
+    names = []
+    for name in filter(None, (part.strip() for part in value.split(','))):
+        names.extend(PRODUCT_FIELD_PRESETS.get(name, [name]))
+    unknown = sorted(set(names) - set(available))
+    if unknown:
+        raise ValidationError({param: [f"Unknown field(s): {', '.join(unknown)}"]})
+    return set(names)
+
+
+def requested_fields(request, serializer_class=ProductSerializer):
+    """Return the field names selected by ``?fields=``/``?exclude=``, or None for all of them."""
+    fields_param = request.query_params.get(FIELDS_QUERY_PARAM)
+    exclude_param = request.query_params.get(EXCLUDE_QUERY_PARAM)
+    if not fields_param and not exclude_param:
+        return None
+
+    available = list(serializer_class.Meta.fields)
+    selected = set(available)
+    if fields_param:
+        selected = expand_fields(FIELDS_QUERY_PARAM, fields_param, available)
+    if exclude_param:
+        selected -= expand_fields(EXCLUDE_QUERY_PARAM, exclude_param, available)
+    if not selected:
+        raise ValidationError({FIELDS_QUERY_PARAM: ['No fields selected']})
+    return [name for name in available if name in selected]
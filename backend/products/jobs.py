@@ -0,0 +1,9 @@
+from jobs.queue import job
+
+from .services import refresh_statuses
+
+
+@job('products.refresh_statuses')
+def refresh_product_statuses():
+    """Periodic status refresh, scheduled by STATUS_REFRESH_INTERVAL."""
+    return refresh_statuses()
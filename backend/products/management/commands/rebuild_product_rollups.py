@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-customer, per-month contract rollups from the products table.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        groups = rebuild_rollups()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'Rebuilt {groups} rollup groups in {elapsed_ms:.1f} ms')
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from products.search import rebuild_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the SQLite product search index from the products table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not rebuild_search(connections[options['database']]):
+            self.stdout.write('No SQLite search index to rebuild')
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'Rebuilt the product search index in {elapsed_ms:.1f} ms')
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.services import refresh_statuses
+
+
+class Command(BaseCommand):
+    help = 'Recompute product statuses from contract end dates with set-based UPDATEs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every N seconds (default: run once).',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            self.refresh()
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    def refresh(self):
+        started = time.perf_counter()
+        changed = refresh_statuses()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        details = ', '.join(f'{name}: {count}' for name, count in changed.items())
+        self.stdout.write(
+            f'Updated {sum(changed.values())} products ({details}) in {elapsed_ms:.1f} ms'
+        )
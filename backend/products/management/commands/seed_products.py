@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from products.seeding import seed_products
+
+
+class Command(BaseCommand):
+    help = 'Insert generated products and customers for benchmarks, load tests and local development.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000, help='Products to insert (default: 100000).')
+        parser.add_argument('--customers', type=int, default=None, help='Distinct customers (default: count / 20).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for repeatable datasets.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help='Delete all existing products first.')
+        parser.add_argument('--force', action='store_true', help='Allow seeding outside development.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to seed synthetic products outside development; pass --force.')
+
+        started = time.perf_counter()
+        count = seed_products(
+            options['count'],
+            customers=options['customers'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            clear=options['clear'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Inserted {count} products in {elapsed:.1f} s ({count / elapsed:,.0f} rows/s)')
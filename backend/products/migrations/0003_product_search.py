@@ -0,0 +1,95 @@
+from django.db import migrations
+
+SEARCH_FIELDS = ('name', 'description', 'bot_username', 'customer_telegram')
+
+# FTS5 trigram index over the implicit rowid of products (replaced in 0006)
+SQLITE_INSTALL_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_search USING fts5(
+        name, description, bot_username, customer_telegram,
+        content='products', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    'DROP TRIGGER IF EXISTS products_search_ai',
+    'DROP TRIGGER IF EXISTS products_search_ad',
+    'DROP TRIGGER IF EXISTS products_search_au',
+    """
+    CREATE TRIGGER products_search_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        VALUES (new.rowid, new.name, new.description, new.bot_username, new.customer_telegram);
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_search(products_search, rowid, name, description, bot_username, customer_telegram)
+        VALUES ('delete', old.rowid, old.name, old.description, old.bot_username, old.customer_telegram);
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_au AFTER UPDATE OF name, description, bot_username, customer_telegram
+    ON products BEGIN
+        INSERT INTO products_search(products_search, rowid, name, description, bot_username, customer_telegram)
+        VALUES ('delete', old.rowid, old.name, old.description, old.bot_username, old.customer_telegram);
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        VALUES (new.rowid, new.name, new.description, new.bot_username, new.customer_telegram);
+    END
+    """,
+    "INSERT INTO products_search(products_search) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL_SQL = [
+    'DROP TRIGGER IF EXISTS products_search_ai',
+    'DROP TRIGGER IF EXISTS products_search_ad',
+    'DROP TRIGGER IF EXISTS products_search_au',
+    'DROP TABLE IF EXISTS products_search',
+]
+
+# pg_trgm GIN indexes backing icontains on UPPER(column)
+POSTGRES_INSTALL_SQL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS products_{field}_trgm_idx '
+    f'ON products USING gin (UPPER({field}::text) gin_trgm_ops)'
+    for field in SEARCH_FIELDS
+]
+
+POSTGRES_UNINSTALL_SQL = [f'DROP INDEX IF EXISTS products_{field}_trgm_idx' for field in SEARCH_FIELDS]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_INSTALL_SQL
+    elif vendor == 'sqlite' and sqlite_has_fts5(schema_editor.connection):
+        statements = SQLITE_INSTALL_SQL
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_UNINSTALL_SQL
+    elif vendor == 'sqlite':
+        statements = SQLITE_UNINSTALL_SQL
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_created_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
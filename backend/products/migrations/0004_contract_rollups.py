@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:37
+
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    """Backfill one rollup row per customer and contract end month (UTC)."""
+    Product = apps.get_model('products', 'Product')
+    ContractRollup = apps.get_model('products', 'ContractRollup')
+    groups = (
+        Product.objects.order_by()
+        .annotate(
+            rollup_customer=Coalesce('customer_telegram', models.Value('')),
+            rollup_month=TruncMonth('contract_end_date', output_field=models.DateField(), tzinfo=dt_timezone.utc),
+        )
+        .values('rollup_customer', 'rollup_month')
+        .annotate(
+            contracts=models.Count('pk'),
+            renewed=models.Count('pk', filter=models.Q(is_renewed=True)),
+            contract_months=models.Sum('contract_months'),
+        )
+    )
+    ContractRollup.objects.bulk_create([
+        ContractRollup(
+            customer_telegram=group['rollup_customer'], month=group['rollup_month'],
+            contracts=group['contracts'], renewed=group['renewed'],
+            contract_months=group['contract_months'] or 0,
+        )
+        for group in groups
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_telegram', models.CharField(blank=True, default='', max_length=255)),
+                ('month', models.DateField()),
+                ('contracts', models.IntegerField(default=0)),
+                ('renewed', models.IntegerField(default=0)),
+                ('contract_months', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'product_contract_rollups',
+                'indexes': [models.Index(fields=['month'], name='rollup_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('customer_telegram', 'month'), name='rollup_customer_month_uniq')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
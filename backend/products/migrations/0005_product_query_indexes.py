@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:54
+
+import uuid
+from django.db import migrations, models
+
+# The triggers from 0003, keyed on the implicit rowid of products
+SQLITE_TRIGGER_SQL = [
+    'DROP TRIGGER IF EXISTS products_search_ai',
+    'DROP TRIGGER IF EXISTS products_search_ad',
+    'DROP TRIGGER IF EXISTS products_search_au',
+    """
+    CREATE TRIGGER products_search_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        VALUES (new.rowid, new.name, new.description, new.bot_username, new.customer_telegram);
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_search(products_search, rowid, name, description, bot_username, customer_telegram)
+        VALUES ('delete', old.rowid, old.name, old.description, old.bot_username, old.customer_telegram);
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_au AFTER UPDATE OF name, description, bot_username, customer_telegram
+    ON products BEGIN
+        INSERT INTO products_search(products_search, rowid, name, description, bot_username, customer_telegram)
+        VALUES ('delete', old.rowid, old.name, old.description, old.bot_username, old.customer_telegram);
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        VALUES (new.rowid, new.name, new.description, new.bot_username, new.customer_telegram);
+    END
+    """,
+    "INSERT INTO products_search(products_search) VALUES ('rebuild')",
+]
+
+
+def reinstall_search(apps, schema_editor):
+    # SQLite rebuilds the products table to alter a field, which drops the
+    # search triggers and renumbers the rowids the FTS index points at
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or 'products_search' not in connection.introspection.table_names():
+        return
+    for statement in SQLITE_TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_contract_rollups'),
+    ]
+
+    operations = [
+        # Runs last when unapplying, after status is altered back
+        migrations.RunPython(migrations.RunPython.noop, reinstall_search),
+        # The primary key never had a separate index, so this only updates state
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='product',
+                name='id',
+                field=models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False),
+            ),
+        ]),
+        # Superseded by products_status_end_idx, which leads with status
+        migrations.AlterField(
+            model_name='product',
+            name='status',
+            field=models.CharField(choices=[('Active', 'Active'), ('Expired', 'Expired'), ('ExpiringSoon', 'Expiring Soon')], default='Active', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='products_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'contract_end_date'], name='products_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('status', 'Expired'), _negated=True), fields=['contract_end_date'], name='products_live_end_idx'),
+        ),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+    ]
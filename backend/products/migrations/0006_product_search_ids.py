@@ -0,0 +1,113 @@
+from django.db import migrations
+
+# Key the SQLite FTS5 index on an explicit INTEGER PRIMARY KEY instead of the
+# implicit rowid of products (a UUID-keyed table), which VACUUM and Django's
+# table rebuilds renumber. products_search_ids maps each product id to a
+# stable search rowid. The index keeps its own copy of the text: an external
+# content view over products would break Django's SQLite table rebuilds.
+SQLITE_INSTALL_SQL = [
+    'DROP TRIGGER IF EXISTS products_search_ai',
+    'DROP TRIGGER IF EXISTS products_search_ad',
+    'DROP TRIGGER IF EXISTS products_search_au',
+    'DROP TABLE IF EXISTS products_search',
+    """
+    CREATE TABLE products_search_ids (
+        search_rowid INTEGER PRIMARY KEY,
+        product_id char(32) NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE products_search USING fts5(
+        name, description, bot_username, customer_telegram, tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER products_search_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_search_ids(product_id) VALUES (new.id);
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        SELECT search_rowid, new.name, new.description, new.bot_username, new.customer_telegram
+        FROM products_search_ids WHERE product_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_ad AFTER DELETE ON products BEGIN
+        DELETE FROM products_search
+        WHERE rowid IN (SELECT search_rowid FROM products_search_ids WHERE product_id = old.id);
+        DELETE FROM products_search_ids WHERE product_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_au AFTER UPDATE OF name, description, bot_username, customer_telegram
+    ON products BEGIN
+        UPDATE products_search
+        SET name = new.name, description = new.description,
+            bot_username = new.bot_username, customer_telegram = new.customer_telegram
+        WHERE rowid IN (SELECT search_rowid FROM products_search_ids WHERE product_id = new.id);
+    END
+    """,
+    'INSERT INTO products_search_ids(product_id) SELECT id FROM products',
+    """
+    INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+    SELECT ids.search_rowid, p.name, p.description, p.bot_username, p.customer_telegram
+    FROM products_search_ids ids JOIN products p ON p.id = ids.product_id
+    """,
+]
+
+# Back to the rowid-keyed index from 0003
+SQLITE_UNINSTALL_SQL = [
+    'DROP TRIGGER IF EXISTS products_search_ai',
+    'DROP TRIGGER IF EXISTS products_search_ad',
+    'DROP TRIGGER IF EXISTS products_search_au',
+    'DROP TABLE IF EXISTS products_search',
+    'DROP TABLE IF EXISTS products_search_ids',
+    """
+    CREATE VIRTUAL TABLE products_search USING fts5(
+        name, description, bot_username, customer_telegram,
+        content='products', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER products_search_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        VALUES (new.rowid, new.name, new.description, new.bot_username, new.customer_telegram);
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_search(products_search, rowid, name, description, bot_username, customer_telegram)
+        VALUES ('delete', old.rowid, old.name, old.description, old.bot_username, old.customer_telegram);
+    END
+    """,
+    """
+    CREATE TRIGGER products_search_au AFTER UPDATE OF name, description, bot_username, customer_telegram
+    ON products BEGIN
+        INSERT INTO products_search(products_search, rowid, name, description, bot_username, customer_telegram)
+        VALUES ('delete', old.rowid, old.name, old.description, old.bot_username, old.customer_telegram);
+        INSERT INTO products_search(rowid, name, description, bot_username, customer_telegram)
+        VALUES (new.rowid, new.name, new.description, new.bot_username, new.customer_telegram);
+    END
+    """,
+    "INSERT INTO products_search(products_search) VALUES ('rebuild')",
+]
+
+
+def run_if_installed(statements):
+    def run(apps, schema_editor):
+        # Only SQLite builds with FTS5 got the search table in 0003
+        connection = schema_editor.connection
+        if connection.vendor != 'sqlite' or 'products_search' not in connection.introspection.table_names():
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_if_installed(SQLITE_INSTALL_SQL), run_if_installed(SQLITE_UNINSTALL_SQL)),
+    ]
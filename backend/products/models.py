@@ -9,8 +9,24 @@ class ProductStatus(models.TextChoices):
     EXPIRING_SOON = 'ExpiringSoon', 'Expiring Soon'
 
 
+def contract_end_date_for(contract_start_date, contract_months):
+    """Contracts run for 30 days per contract month."""
+    return contract_start_date + timedelta(days=30 * contract_months)
+
+
+def status_for(contract_end_date, now):
+    """Return the ProductStatus for a contract ending at ``contract_end_date``."""
+    days_until_expiry = (contract_end_date - now).days
+
+    if days_until_expiry < 0:
+        return ProductStatus.EXPIRED
+    elif days_until_expiry <= 7:
+        return ProductStatus.EXPIRING_SOON
+    return ProductStatus.ACTIVE
+
+
 class Product(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, db_index=True)
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     bot_username = models.CharField(max_length=255, blank=True, null=True)
@@ -23,7 +39,6 @@ class Product(models.Model):
         max_length=20,
         choices=ProductStatus.choices,
         default=ProductStatus.ACTIVE,
-        db_index=True
     )
     customer_telegram = models.CharField(max_length=255, blank=True, null=True, db_index=True)
     customer_link = models.CharField(max_length=500, blank=True, null=True)
@@ -33,11 +48,25 @@ class Product(models.Model):
     class Meta:
         db_table = 'products'
         ordering = ['-created_at']
+        indexes = [
+            # Backs keyset pagination ordered by (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='products_created_id_idx'),
+            # Status-filtered listings in the default order, without a sort
+            models.Index(fields=['status', '-created_at', '-id'], name='products_status_created_idx'),
+            # Status counts (covering the stats aggregate) and end date ranges within a status
+            models.Index(fields=['status', 'contract_end_date'], name='products_status_end_idx'),
+            # Contracts still running, searched by end date (status refresh, expiry windows)
+            models.Index(
+                fields=['contract_end_date'],
+                condition=~models.Q(status=ProductStatus.EXPIRED),
+                name='products_live_end_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         # Calculate contract_end_date if not set
         if self.contract_start_date and self.contract_months and not self.contract_end_date:
-            self.contract_end_date = self.contract_start_date + timedelta(days=30 * self.contract_months)
+            self.contract_end_date = contract_end_date_for(self.contract_start_date, self.contract_months)
         
         # Update status before saving
         self.update_status()
@@ -49,14 +78,28 @@ class Product(models.Model):
             return
         
         now = datetime.now(self.contract_end_date.tzinfo) if self.contract_end_date.tzinfo else datetime.utcnow()
-        days_until_expiry = (self.contract_end_date - now).days
-        
-        if days_until_expiry < 0:
-            self.status = ProductStatus.EXPIRED
-        elif days_until_expiry <= 7:
-            self.status = ProductStatus.EXPIRING_SOON
-        else:
-            self.status = ProductStatus.ACTIVE
+        self.status = status_for(self.contract_end_date, now)
 
     def __str__(self):
         return self.name
+
+
+class ContractRollup(models.Model):
+    """Contracts per customer and contract end month, maintained by products.rollups."""
+    customer_telegram = models.CharField(max_length=255, blank=True, default='')
+    month = models.DateField()  # first day of the contract_end_date month (UTC)
+    contracts = models.IntegerField(default=0)
+    renewed = models.IntegerField(default=0)
+    contract_months = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'product_contract_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['customer_telegram', 'month'], name='rollup_customer_month_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='rollup_month_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.customer_telegram or "-"} {self.month:%Y-%m}'
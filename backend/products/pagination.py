@@ -0,0 +1,141 @@
+import base64
+import json
+import uuid
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+class ProductPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode.
+
+    Passing ``?cursor=`` switches to cursor mode: rows are ordered by
+    ``(created_at, id)`` descending and each page seeks past the last row of
+    the previous one, so deep pages cost the same as the first. The total is
+    then controlled by ``?count=exact|estimate|none`` (default ``none``).
+    Both modes return the ``{total, page, per_page, products}`` shape.
+    """
+    page_size = 50
+    page_size_query_param = 'per_page'
+    max_page_size = 100
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('exact', 'estimate', 'none')
+    ordering = ('-created_at', '-id')
+    cursor_fields = ('created_at', 'id')
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        self.page_number, position = self.decode_cursor(cursor) if cursor else (1, None)
+
+        self.total = self.get_total(queryset, request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = rows[-1]
+            if isinstance(last, dict):
+                created_at, pk = last['created_at'], last['id']
+            else:
+                created_at, pk = last.created_at, last.pk
+            self.next_cursor = self.encode_cursor(self.page_number + 1, created_at, pk)
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return Response({
+                'total': self.page.paginator.count,
+                'page': self.page.number,
+                'per_page': len(data),
+                'products': data,
+            })
+        return Response({
+            'total': self.total,
+            'page': self.page_number,
+            'per_page': len(data),
+            'products': data,
+            'next_cursor': self.next_cursor,
+        })
+
+    def get_total(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, 'none')
+        if mode not in self.count_modes:
+            mode = 'none'
+        if mode == 'none':
+            return None
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate
+        return queryset.count()
+
+    def encode_cursor(self, page_number, created_at, pk):
+        payload = json.dumps([page_number, created_at.isoformat(), str(pk)])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            page_number, created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError(cursor)
+            return int(page_number), (created_at, uuid.UUID(pk))
+        # uuid.UUID() raises AttributeError for non-string ids
+        except (AttributeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+def estimate_count(queryset):
+    """
+    Return a planner estimate of the row count, or None when unavailable.
+
+    On PostgreSQL an unfiltered table uses ``pg_class.reltuples`` and a
+    filtered queryset uses the row estimate from ``EXPLAIN``. Other backends
+    have no cheap estimate, so callers fall back to an exact count.
+    """
+    # Count on the alias the queryset reads from, which may be a replica
+    alias = queryset.db
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return None
+
+    query = queryset.order_by().query
+    with connection.cursor() as cursor:
+        if not query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = query.get_compiler(using=alias).as_sql()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
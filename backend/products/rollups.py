@@ -0,0 +1,154 @@
+"""
+Incrementally maintained contract rollups.
+
+ContractRollup keeps one row per (customer_telegram, contract end month)
+with contract, renewal and contract-month totals, so analytics read
+O(groups) rows instead of scanning products. Single-row saves and deletes
+adjust it from signals. Set-based writes compute grouped before/after deltas
+in the database and apply them inside their own transaction.
+rebuild_rollups() recomputes the table from scratch.
+"""
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import ContractRollup, Product
+
+MEASURES = ('contracts', 'renewed', 'contract_months')
+ROLLUP_SOURCE_FIELDS = ('customer_telegram', 'contract_end_date', 'is_renewed', 'contract_months')
+
+
+def month_of(value):
+    """First day of ``value``'s month in UTC, matching the TruncMonth used in SQL."""
+    return value.astimezone(dt_timezone.utc).date().replace(day=1)
+
+
+class RollupDelta(defaultdict):
+    """Pending changes to rollup rows: (customer, month) -> [contracts, renewed, contract_months]."""
+
+    def __init__(self):
+        super().__init__(lambda: [0, 0, 0])
+
+    def add(self, customer, month, contracts, renewed, contract_months, sign=1):
+        totals = self[(customer or '', month)]
+        totals[0] += sign * contracts
+        totals[1] += sign * renewed
+        totals[2] += sign * contract_months
+
+    def add_product(self, values, sign=1):
+        """Count one product given a mapping of ROLLUP_SOURCE_FIELDS."""
+        if values.get('contract_end_date') is None:
+            return
+        self.add(
+            values['customer_telegram'], month_of(values['contract_end_date']),
+            1, int(bool(values['is_renewed'])), values['contract_months'] or 0, sign,
+        )
+
+    def add_groups(self, groups, sign=1):
+        for group in groups:
+            self.add(
+                group['rollup_customer'], group['rollup_month'],
+                group['contracts'], group['renewed'], group['contract_months'] or 0, sign,
+            )
+
+
+def product_values(product):
+    return {field: getattr(product, field) for field in ROLLUP_SOURCE_FIELDS}
+
+
+def grouped(queryset, end=None, customer=None, renewed=False):
+    """
+    Aggregate ``queryset`` into rollup groups in the database.
+
+    ``end`` and ``customer`` override the grouping expressions and ``renewed``
+    counts every row as renewed, which lets callers compute the groups a
+    set-based UPDATE is about to produce before running it.
+    """
+    return (
+        queryset.order_by()
+        .annotate(
+            rollup_customer=Coalesce(customer if customer is not None else F('customer_telegram'), Value('')),
+            rollup_month=TruncMonth(
+                end if end is not None else F('contract_end_date'),
+                output_field=DateField(), tzinfo=dt_timezone.utc,
+            ),
+        )
+        .values('rollup_customer', 'rollup_month')
+        .annotate(
+            contracts=Count('pk'),
+            renewed=Count('pk') if renewed else Count('pk', filter=Q(is_renewed=True)),
+            contract_months=Sum('contract_months'),
+        )
+    )
+
+
+def apply_delta(delta):
+    """Add ``delta`` to the rollup table, creating and dropping groups as needed."""
+    shrunk = False
+    with transaction.atomic():
+        for (customer, month), (contracts, renewed, contract_months) in delta.items():
+            if not (contracts or renewed or contract_months):
+                continue
+            shrunk = shrunk or contracts < 0
+            changes = {
+                'contracts': F('contracts') + contracts,
+                'renewed': F('renewed') + renewed,
+                'contract_months': F('contract_months') + contract_months,
+            }
+            rows = ContractRollup.objects.filter(customer_telegram=customer, month=month)
+            if rows.update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    ContractRollup.objects.create(
+                        customer_telegram=customer, month=month, contracts=contracts,
+                        renewed=renewed, contract_months=contract_months,
+                    )
+            except IntegrityError:
+                # Another writer created the group first
+                rows.update(**changes)
+        if shrunk:
+            ContractRollup.objects.filter(contracts__lte=0).delete()
+
+
+def rebuild_rollups() -> int:
+    """Recompute every rollup group from the products table; returns the number of groups."""
+    groups = [
+        ContractRollup(
+            customer_telegram=group['rollup_customer'], month=group['rollup_month'],
+            contracts=group['contracts'], renewed=group['renewed'],
+            contract_months=group['contract_months'] or 0,
+        )
+        for group in grouped(Product.objects.all())
+    ]
+    with transaction.atomic():
+        ContractRollup.objects.all().delete()
+        ContractRollup.objects.bulk_create(groups, batch_size=1000)
+    return len(groups)
+
+
+def with_rate(row):
+    row['renewal_rate'] = round(row['renewed'] / row['contracts'], 4) if row['contracts'] else 0.0
+    return row
+
+
+def contract_analytics(queryset=None) -> dict:
+    """Totals, per-customer and per-month contract figures read from the rollup table."""
+    if queryset is None:
+        queryset = ContractRollup.objects.all()
+    queryset = queryset.order_by()
+    sums = {measure: Sum(measure) for measure in MEASURES}
+
+    totals = {measure: value or 0 for measure, value in queryset.aggregate(**sums).items()}
+    by_customer = [
+        with_rate(row) for row in
+        queryset.values('customer_telegram').annotate(**sums).order_by('-contracts', 'customer_telegram')
+    ]
+    by_month = [
+        with_rate({**row, 'month': row['month'].strftime('%Y-%m')}) for row in
+        queryset.values('month').annotate(**sums).order_by('month')
+    ]
+    return {'totals': with_rate(totals), 'by_customer': by_customer, 'by_month': by_month}
@@ -0,0 +1,71 @@
+"""
+Fast read path for product listings.
+
+Rows are fetched with ``values()`` and converted by per-field functions
+compiled once from a serializer class, producing the same representation the
+serializer would without building model instances or walking DRF fields per
+row.
+"""
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Field types whose representation of a database value is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+def utc_isoformat(value):
+    """DateTimeField.to_representation for aware values under a UTC current timezone."""
+    if value.tzinfo is not dt_timezone.utc:
+        value = value.astimezone(dt_timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def compile_converter(field):
+    """Return a function mapping a database value to ``field``'s representation, or None for identity."""
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        utc = (
+            settings.USE_TZ and not hasattr(field, 'timezone')
+            and timezone.get_current_timezone_name() == 'UTC'
+        )
+        if utc and output_format and output_format.lower() == ISO_8601:
+            return utc_isoformat
+    return field.to_representation
+
+
+class RowSerializer:
+    """Serialize ``values()`` rows exactly as ``serializer_class`` serializes instances."""
+
+    def __init__(self, serializer_class, fields=None):
+        readable = [
+            field for name, field in serializer_class().fields.items()
+            if not field.write_only and (fields is None or name in fields)
+        ]
+        self.fields = [(field.field_name, field.source, compile_converter(field)) for field in readable]
+        self.sources = [source for _, source, _ in self.fields]
+
+    def to_representation(self, row):
+        return {
+            name: convert(row[source]) if convert is not None and row[source] is not None else row[source]
+            for name, source, convert in self.fields
+        }
+
+    def many(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
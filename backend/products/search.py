@@ -0,0 +1,120 @@
+"""
+Product search backends.
+
+PostgreSQL uses pg_trgm GIN indexes on ``UPPER(column)`` so the existing
+``icontains`` filters become index scans, ranked by trigram word similarity.
+SQLite uses an FTS5 table with the trigram tokenizer, kept in sync by
+triggers, whose hits are ranked by the fields they match in. Anything else,
+or terms too short for trigrams, falls back to plain ``icontains`` filtering.
+
+The FTS5 table holds its own copy of the searched text, keyed on
+``products_search_ids``, which gives every product id an INTEGER PRIMARY KEY,
+so VACUUM and Django's SQLite table rebuilds (which renumber the implicit
+rowids of the UUID-keyed products table) leave it intact. The schema and triggers live in migrations 0003 and 0006; a
+migration that makes SQLite rebuild ``products`` drops the triggers and must
+recreate them (see 0005). Bulk loads with the triggers dropped finish with
+rebuild_search().
+"""
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Greatest
+
+SEARCH_FIELDS = ('name', 'description', 'bot_username', 'customer_telegram')
+
+# Trigram matching needs at least three characters
+MIN_TRIGRAM_LENGTH = 3
+
+SQLITE_SEARCH_TABLE = 'products_search'
+# Stable INTEGER keys for the index: product id -> search rowid
+SQLITE_SEARCH_IDS_TABLE = 'products_search_ids'
+
+# Rank of an FTS5 hit: the weights of the fields the term appears in
+# (powers of two, so a name match outranks any mix of the others)
+SQLITE_SEARCH_WEIGHTS = {'name': 8, 'bot_username': 4, 'customer_telegram': 2, 'description': 1}
+
+
+def rebuild_search(connection) -> bool:
+    """
+    Bring the SQLite search index in line with the products table; False when there is none.
+
+    Adds id map rows for products loaded while the triggers were dropped,
+    removes those of deleted products, then re-indexes every product.
+    """
+    if connection.vendor != 'sqlite' or SQLITE_SEARCH_TABLE not in connection.introspection.table_names():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SQLITE_SEARCH_IDS_TABLE} WHERE product_id NOT IN (SELECT id FROM products)'
+        )
+        cursor.execute(
+            f'INSERT INTO {SQLITE_SEARCH_IDS_TABLE}(product_id) SELECT id FROM products '
+            f'WHERE id NOT IN (SELECT product_id FROM {SQLITE_SEARCH_IDS_TABLE})'
+        )
+        cursor.execute(f'DELETE FROM {SQLITE_SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, {", ".join(SEARCH_FIELDS)}) '
+            f'SELECT ids.search_rowid, {", ".join(f"p.{field}" for field in SEARCH_FIELDS)} '
+            f'FROM {SQLITE_SEARCH_IDS_TABLE} ids JOIN products p ON p.id = ids.product_id'
+        )
+    return True
+
+
+def icontains_filter(queryset, term):
+    """The original four-column substring filter."""
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': term})
+    return queryset.filter(condition)
+
+
+def postgres_search(queryset, term):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    similarities = [
+        Coalesce(TrigramWordSimilarity(term, field), Value(0.0), output_field=FloatField())
+        for field in SEARCH_FIELDS
+    ]
+    return icontains_filter(queryset, term).annotate(
+        search_rank=Greatest(*similarities)
+    ).order_by('-search_rank', '-created_at')
+
+
+def sqlite_search(queryset, term):
+    match = '"{}"'.format(term.replace('"', '""'))
+    table = queryset.model._meta.db_table
+    # MATCH runs once; only its hits are ranked, by the fields they match in
+    matches = RawSQL(
+        f'{table}.id IN (SELECT ids.product_id FROM {SQLITE_SEARCH_TABLE} '
+        f'JOIN {SQLITE_SEARCH_IDS_TABLE} ids ON ids.search_rowid = {SQLITE_SEARCH_TABLE}.rowid '
+        f'WHERE {SQLITE_SEARCH_TABLE} MATCH %s)',
+        [match], output_field=BooleanField(),
+    )
+    rank = sum(
+        Case(When(**{f'{field}__icontains': term}, then=Value(weight)), default=Value(0))
+        for field, weight in SQLITE_SEARCH_WEIGHTS.items()
+    )
+    return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', '-created_at')
+
+
+def sqlite_search_available(connection) -> bool:
+    available = getattr(connection, '_products_search_available', None)
+    if available is None:
+        available = SQLITE_SEARCH_TABLE in connection.introspection.table_names()
+        connection._products_search_available = available
+    return available
+
+
+def search_products(queryset, term):
+    """Filter ``queryset`` to products matching ``term``, best matches first."""
+    term = term.strip()
+    if not term:
+        return queryset
+
+    connection = connections[queryset.db]
+    if len(term) >= MIN_TRIGRAM_LENGTH:
+        if connection.vendor == 'postgresql':
+            return postgres_search(queryset, term)
+        if connection.vendor == 'sqlite' and sqlite_search_available(connection):
+            return sqlite_search(queryset, term)
+    return icontains_filter(queryset, term)
@@ -0,0 +1,181 @@
+"""
+Synthetic product data for benchmarks, load tests and local development.
+
+Generates realistic-looking products: a skewed customer base (a few
+customers own many bots), common contract lengths, mostly recent start
+dates and a share of renewals. Rows skip model instances entirely:
+PostgreSQL is loaded with COPY, other databases with one executemany per
+batch. Rollups and the stats cache are refreshed afterwards since neither
+path sends model signals.
+"""
+import contextlib
+import csv
+import io
+import random
+import uuid
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, models, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+
+from .cache import invalidate_stats_cache
+from .models import Product, contract_end_date_for, status_for
+from .rollups import rebuild_rollups
+from .search import rebuild_search
+
+ADJECTIVES = [
+    'swift', 'lucky', 'silver', 'quiet', 'bright', 'royal', 'smart', 'happy', 'rapid', 'crypto',
+    'golden', 'daily', 'secret', 'green', 'cosmic', 'urban', 'prime', 'magic', 'north', 'pixel',
+]
+NOUNS = [
+    'shop', 'news', 'trade', 'quiz', 'music', 'weather', 'support', 'deals', 'fitness', 'recipes',
+    'travel', 'tickets', 'games', 'market', 'signals', 'jobs', 'books', 'cinema', 'wallet', 'tutor',
+]
+FIRST_NAMES = ['alex', 'maria', 'ivan', 'li', 'sara', 'omar', 'nina', 'tom', 'yuki', 'lena', 'raj', 'ana']
+# Search terms that occur in generated names and descriptions
+SEARCH_TERMS = ADJECTIVES + NOUNS
+
+CONTRACT_MONTHS = [1, 3, 6, 12]
+CONTRACT_MONTH_WEIGHTS = [40, 30, 20, 10]
+
+COLUMNS = [
+    'id', 'name', 'description', 'bot_username', 'website_link', 'contract_months',
+    'contract_start_date', 'contract_end_date', 'is_renewed', 'status',
+    'customer_telegram', 'customer_link', 'created_at', 'updated_at',
+]
+
+
+def customer_handles(count, rng):
+    return [f'@{rng.choice(FIRST_NAMES)}_{rng.choice(NOUNS)}{i}' for i in range(count)]
+
+
+def generate_rows(count, customers=None, seed=42, now=None):
+    """Yield ``count`` product rows as dicts keyed by column name."""
+    if now is None:
+        now = timezone.now()
+    rng = random.Random(seed)
+    handles = customer_handles(customers or max(1, count // 20), rng)
+    # Long-tailed ownership: customer k is picked with weight 1 / (k + 10)
+    cumulative, total = [], 0.0
+    for k in range(len(handles)):
+        total += 1 / (k + 10)
+        cumulative.append(total)
+
+    for i in range(count):
+        adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        handle = rng.choices(handles, cum_weights=cumulative)[0]
+        months = rng.choices(CONTRACT_MONTHS, weights=CONTRACT_MONTH_WEIGHTS)[0]
+        # Most contracts started recently; the tail reaches back two years
+        start = now - timedelta(days=min(rng.expovariate(1 / 120), 730))
+        end = contract_end_date_for(start, months)
+        renewed = rng.random() < 0.3
+        if renewed:
+            end += timedelta(days=30 * months)
+        yield {
+            'id': uuid.UUID(int=rng.getrandbits(128), version=4),
+            'name': f'{adjective.title()} {noun.title()} Bot {i}',
+            'description': f'{adjective.title()} {noun} assistant for {handle[1:]}',
+            'bot_username': f'{adjective}_{noun}_{i}_bot',
+            'website_link': f'https://{noun}.example.com/{i}' if rng.random() < 0.4 else None,
+            'contract_months': months,
+            'contract_start_date': start,
+            'contract_end_date': end,
+            'is_renewed': renewed,
+            'status': status_for(end, now).value,
+            'customer_telegram': handle,
+            'customer_link': f'https://t.me/{handle[1:]}',
+            'created_at': start,
+            'updated_at': start,
+        }
+
+
+def seed_products(count, customers=None, seed=42, batch_size=5000, clear=False) -> int:
+    """Insert ``count`` generated products and refresh derived data; returns rows inserted."""
+    rows = generate_rows(count, customers, seed)
+    with transaction.atomic():
+        if clear:
+            # Seeding sends no model signals either; rollups are rebuilt below
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {Product._meta.db_table}')
+        if connection.vendor == 'postgresql':
+            copy_rows(rows, batch_size)
+        elif connection.vendor == 'sqlite' and count > Product.objects.count():
+            with deferred_sqlite_indexes():
+                insert_rows(rows, batch_size)
+        else:
+            insert_rows(rows, batch_size)
+        rebuild_rollups()
+    invalidate_stats_cache()
+    return count
+
+
+def batches(rows, batch_size):
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def db_adapter(field):
+    """Convert a Python value to what the backend stores, without Field.get_db_prep_save overhead."""
+    if isinstance(field, models.UUIDField) and not connection.features.has_native_uuid_field:
+        return lambda value: value.hex
+    if isinstance(field, models.DateTimeField):
+        return connection.ops.adapt_datetimefield_value
+    return None
+
+
+def insert_rows(rows, batch_size):
+    adapters = [db_adapter(Product._meta.get_field(name)) for name in COLUMNS]
+    placeholders = ', '.join(['%s'] * len(COLUMNS))
+    sql = f'INSERT INTO {Product._meta.db_table} ({", ".join(COLUMNS)}) VALUES ({placeholders})'
+    with connection.cursor() as cursor:
+        for batch in batches(rows, batch_size):
+            cursor.executemany(sql, [
+                [value if adapt is None or value is None else adapt(value)
+                 for adapt, value in zip(adapters, (row[name] for name in COLUMNS))]
+                for row in batch
+            ])
+
+
+@contextlib.contextmanager
+def deferred_sqlite_indexes():
+    """
+    Drop the products indexes and search triggers for a bulk load, then rebuild them.
+
+    Building an index once over sorted data is far cheaper than updating it
+    row by row, and one FTS rebuild beats per-row trigger inserts.
+    """
+    table = Product._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE tbl_name = %s AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+            [table],
+        )
+        objects = cursor.fetchall()
+        for kind, name, _ in objects:
+            cursor.execute(f'DROP {kind.upper()} "{name}"')
+        yield
+        for _, _, sql in objects:
+            cursor.execute(sql)
+        if any(kind == 'trigger' for kind, _, _ in objects):
+            rebuild_search(connection)
+
+
+def copy_rows(rows, batch_size):
+    """Stream rows into PostgreSQL with COPY, ``batch_size`` rows per round trip."""
+    sql = f'COPY {Product._meta.db_table} ({", ".join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)'
+    with connection.cursor() as cursor:
+        for batch in batches(rows, batch_size):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # Empty unquoted CSV fields load as NULL
+            writer.writerows(['' if row[name] is None else row[name] for name in COLUMNS] for row in batch)
+            # COPY lives on the driver's cursor, beneath Django's wrapper
+            if is_psycopg3:
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                buffer.seek(0)
+                cursor.cursor.copy_expert(sql, buffer)
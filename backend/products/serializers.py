@@ -3,6 +3,14 @@ from .models import Product, ProductStatus
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        # Optional sparse fieldset: only these fields are serialized
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = Product
         fields = [
@@ -60,3 +68,59 @@ class DashboardStatsSerializer(serializers.Serializer):
     expired_products = serializers.IntegerField()
     expiring_in_7_days = serializers.IntegerField()
     expiring_in_30_days = serializers.IntegerField()
+
+
+class BatchFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=ProductStatus.choices, required=False)
+    customer_telegram = serializers.CharField(required=False)
+    contract_end_after = serializers.DateTimeField(required=False)
+    contract_end_before = serializers.DateTimeField(required=False)
+
+
+class BatchSelectionSerializer(serializers.Serializer):
+    """Selects products for a batch mutation by explicit ids and/or a filter."""
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=10000)
+    filter = BatchFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('ids') and not attrs.get('filter'):
+            raise serializers.ValidationError("Provide a non-empty ids list or filter")
+        return attrs
+
+
+class BatchRenewSerializer(BatchSelectionSerializer):
+    months = serializers.IntegerField(min_value=1, max_value=12)
+
+
+class BatchPatchSerializer(BatchSelectionSerializer):
+    changes = serializers.DictField()
+
+    def validate_changes(self, value):
+        if not value:
+            raise serializers.ValidationError("changes must not be empty")
+        writable = {name for name, field in ProductUpdateSerializer().fields.items() if not field.read_only}
+        unknown = value.keys() - writable
+        if unknown:
+            raise serializers.ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # Contract dates drive contract_end_date and status; use renew for those
+        contract_fields = {'contract_months', 'contract_start_date'} & value.keys()
+        if contract_fields:
+            raise serializers.ValidationError(
+                f"Cannot batch patch {', '.join(sorted(contract_fields))}; use batch renew"
+            )
+        serializer = ProductUpdateSerializer(data=value, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+
+class MonthField(serializers.DateField):
+    """A ``YYYY-MM`` month, parsed to its first day."""
+
+    def __init__(self, **kwargs):
+        super().__init__(input_formats=['%Y-%m'], **kwargs)
+
+
+class ContractAnalyticsQuerySerializer(serializers.Serializer):
+    customer_telegram = serializers.CharField(required=False, allow_blank=True)
+    from_month = MonthField(required=False)
+    to_month = MonthField(required=False)
@@ -0,0 +1,182 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+
+from dashboard.replicas import current_read_alias
+
+from .cache import get_stats_version
+from .models import Product, ProductStatus
+from .rollups import RollupDelta, apply_delta, grouped
+from .signals import products_bulk_changed
+
+
+def compute_dashboard_stats(queryset=None) -> dict:
+    """Compute all dashboard counters in a single conditional-aggregate query."""
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    now = timezone.now()
+    seven_days = now + timedelta(days=7)
+    thirty_days = now + timedelta(days=30)
+    not_expired = Q(status__in=[ProductStatus.ACTIVE, ProductStatus.EXPIRING_SOON])
+
+    # Counting status (never NULL) rather than pk lets the whole aggregate be
+    # answered from the (status, contract_end_date) index without touching rows
+    return queryset.order_by().aggregate(
+        total_products=Count('*'),
+        active_products=Count('status', filter=Q(status=ProductStatus.ACTIVE)),
+        expired_products=Count('status', filter=Q(status=ProductStatus.EXPIRED)),
+        expiring_in_7_days=Count('status', filter=not_expired & Q(
+            contract_end_date__gte=now,
+            contract_end_date__lte=seven_days,
+        )),
+        expiring_in_30_days=Count('status', filter=not_expired & Q(
+            contract_end_date__gte=now,
+            contract_end_date__lte=thirty_days,
+        )),
+    )
+
+
+def get_dashboard_stats() -> dict:
+    """Return dashboard stats, cached per time bucket and stats version."""
+    ttl = settings.PRODUCT_STATS_CACHE_TTL
+    if ttl <= 0:
+        return compute_dashboard_stats()
+
+    bucket = int(time.time() // ttl)
+    # Replica results are kept apart so clients pinned to the primary never see them
+    alias = current_read_alias()
+    key = f'products:stats:{get_stats_version()}:{bucket}:{alias}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        if alias != DEFAULT_DB_ALIAS:
+            # The replica may not have caught up with the write that bumped the version yet
+            ttl = min(ttl, settings.DB_REPLICA_MAX_LAG)
+        cache.set(key, stats, timeout=ttl)
+    return stats
+
+
+def refresh_statuses(queryset=None, now=None) -> dict:
+    """
+    Bring stored statuses in line with contract_end_date using set-based UPDATEs.
+
+    Mirrors Product.update_status(): a contract is Expired once its end date has
+    passed and ExpiringSoon while fewer than 8 whole days remain. Returns the
+    number of rows moved into each status.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    if now is None:
+        now = timezone.now()
+    soon = now + timedelta(days=8)
+
+    targets = [
+        (ProductStatus.EXPIRED, Q(contract_end_date__lt=now)),
+        (ProductStatus.EXPIRING_SOON, Q(contract_end_date__gte=now, contract_end_date__lt=soon)),
+        (ProductStatus.ACTIVE, Q(contract_end_date__gte=soon)),
+    ]
+    changed = {}
+    with transaction.atomic():
+        for new_status, condition in targets:
+            changed[new_status.value] = (
+                queryset.order_by()
+                .filter(condition)
+                .exclude(status=new_status)
+                .update(status=new_status, updated_at=now)
+            )
+
+    if any(changed.values()):
+        products_bulk_changed.send(sender=Product, action='refresh_status', count=sum(changed.values()))
+    return changed
+
+
+def select_products(queryset, ids=None, filter=None):
+    """Narrow ``queryset`` to a batch selection of ids and/or filter fields."""
+    queryset = queryset.order_by()
+    if ids:
+        queryset = queryset.filter(pk__in=ids)
+    filter = filter or {}
+    if 'status' in filter:
+        queryset = queryset.filter(status=filter['status'])
+    if 'customer_telegram' in filter:
+        queryset = queryset.filter(customer_telegram=filter['customer_telegram'])
+    if 'contract_end_after' in filter:
+        queryset = queryset.filter(contract_end_date__gte=filter['contract_end_after'])
+    if 'contract_end_before' in filter:
+        queryset = queryset.filter(contract_end_date__lt=filter['contract_end_before'])
+    return queryset
+
+
+def renew_products(queryset, months, now=None) -> int:
+    """
+    Extend every selected contract by ``months`` in a single UPDATE.
+
+    The new status is derived from the shifted end date in the same statement,
+    using the thresholds of refresh_statuses().
+    """
+    if now is None:
+        now = timezone.now()
+    delta = timedelta(days=30 * months)
+    new_status = Case(
+        When(contract_end_date__lt=now - delta, then=Value(ProductStatus.EXPIRED)),
+        When(contract_end_date__lt=now + timedelta(days=8) - delta, then=Value(ProductStatus.EXPIRING_SOON)),
+        default=Value(ProductStatus.ACTIVE),
+    )
+    with transaction.atomic():
+        # Move rollup groups to the shifted end months, computed before the rows change
+        rollup_delta = RollupDelta()
+        rollup_delta.add_groups(grouped(queryset), sign=-1)
+        rollup_delta.add_groups(grouped(queryset, end=F('contract_end_date') + delta, renewed=True))
+        updated = queryset.order_by().update(
+            contract_end_date=F('contract_end_date') + delta,
+            is_renewed=True,
+            status=new_status,
+            updated_at=now,
+        )
+        apply_delta(rollup_delta)
+    if updated:
+        products_bulk_changed.send(sender=Product, action='renew', count=updated)
+    return updated
+
+
+def patch_products(queryset, changes, now=None) -> int:
+    """Apply validated non-contract field ``changes`` to the selection in one UPDATE."""
+    if now is None:
+        now = timezone.now()
+    with transaction.atomic():
+        rollup_delta = RollupDelta()
+        if 'customer_telegram' in changes:
+            rollup_delta.add_groups(grouped(queryset), sign=-1)
+            rollup_delta.add_groups(grouped(queryset, customer=Value(changes['customer_telegram'] or '')))
+        updated = queryset.order_by().update(**changes, updated_at=now)
+        apply_delta(rollup_delta)
+    if updated:
+        products_bulk_changed.send(sender=Product, action='patch', count=updated)
+    return updated
+
+
+def delete_products(queryset) -> int:
+    """Delete the selection with a single DELETE, without loading instances."""
+    # The selection may come from a read replica; select and delete on the primary
+    alias = router.db_for_write(Product)
+    queryset = queryset.using(alias)
+    with transaction.atomic(using=alias):
+        rollup_delta = RollupDelta()
+        rollup_delta.add_groups(grouped(queryset), sign=-1)
+        # An explicit DELETE rather than QuerySet.delete(): Product has no
+        # reverse relations and rollups are adjusted here, so the collector
+        # would only load every row to send post_delete for it.
+        select_sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {Product._meta.db_table} WHERE id IN ({select_sql})', params)
+            deleted = cursor.rowcount
+        apply_delta(rollup_delta)
+    if deleted:
+        products_bulk_changed.send(sender=Product, action='delete', count=deleted)
+    return deleted
@@ -0,0 +1,66 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from .cache import invalidate_stats_cache
+from .events import publish_product_event
+from .models import Product
+from .rollups import ROLLUP_SOURCE_FIELDS, RollupDelta, apply_delta, product_values
+
+# Sent after set-based writes (bulk_create, QuerySet.update/delete) that bypass
+# the per-instance model signals. Provides ``action`` and ``count``.
+products_bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(products_bulk_changed, sender=Product)
+def product_changed(sender, **kwargs):
+    """Invalidate cached dashboard stats whenever a product changes."""
+    invalidate_stats_cache()
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_delete, sender=Product)
+def remember_rollup_values(sender, instance, raw=False, **kwargs):
+    """Read the row's stored rollup values before a write moves or removes them."""
+    if raw or instance._state.adding:
+        return
+    instance._rollup_values = sender._default_manager.filter(pk=instance.pk).values(*ROLLUP_SOURCE_FIELDS).first()
+
+
+@receiver(post_save, sender=Product)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the product's contribution between rollup groups."""
+    if raw:
+        return
+    delta = RollupDelta()
+    previous = instance.__dict__.pop('_rollup_values', None)
+    if previous is not None and not created:
+        delta.add_product(previous, sign=-1)
+    delta.add_product(product_values(instance))
+    apply_delta(delta)
+
+
+@receiver(post_save, sender=Product)
+def publish_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish_product_event({
+            'type': 'product.saved', 'id': str(instance.pk), 'created': created, 'status': instance.status,
+        })
+
+
+@receiver(post_delete, sender=Product)
+def publish_deleted(sender, instance, **kwargs):
+    publish_product_event({'type': 'product.deleted', 'id': str(instance.pk)})
+
+
+@receiver(products_bulk_changed, sender=Product)
+def publish_bulk_changed(sender, action, count, **kwargs):
+    publish_product_event({'type': 'products.changed', 'action': action, 'count': count})
+
+
+@receiver(post_delete, sender=Product)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    delta = RollupDelta()
+    delta.add_product(instance.__dict__.pop('_rollup_values', None) or product_values(instance), sign=-1)
+    apply_delta(delta)
@@ -1,8 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet
+from .views import ProductEventsView, ProductViewSet
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
 
-urlpatterns = router.urls
+urlpatterns = [
+    # Before the router so 'events' is not taken for a product id
+    path('products/events/', ProductEventsView.as_view(), name='product-events'),
+] + router.urls
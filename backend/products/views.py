@@ -1,27 +1,62 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Count
-from datetime import datetime, timedelta
-from .models import Product, ProductStatus
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from dashboard.replicas import replica_reads
+from .bulk import (
+    CSV_CONTENT_TYPES,
+    NDJSON_CONTENT_TYPES,
+    aexport_products,
+    export_products,
+    import_products,
+    iter_csv_rows,
+    iter_ndjson_rows,
+)
+from .conditional import list_etag, make_etag, not_modified, set_validators
+from .events import sse_stream
+from .fieldsets import requested_fields
+from .models import ContractRollup, Product, ProductStatus
+from .pagination import ProductPagination
+from .renderers import FastJSONRenderer
+from .rollups import contract_analytics
+from .rows import RowSerializer
+from .search import search_products
+from .services import (
+    delete_products,
+    get_dashboard_stats,
+    patch_products,
+    renew_products,
+    select_products,
+)
 from .serializers import (
     ProductSerializer, 
     ProductCreateSerializer, 
     ProductUpdateSerializer,
-    DashboardStatsSerializer
+    DashboardStatsSerializer,
+    BatchPatchSerializer,
+    BatchRenewSerializer,
+    BatchSelectionSerializer,
+    ContractAnalyticsQuerySerializer,
 )
 
 
-class ProductPagination(PageNumberPagination):
-    page_size = 50
-    page_size_query_param = 'per_page'
-    max_page_size = 100
-
-
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     pagination_class = ProductPagination
+    renderer_classes = [FastJSONRenderer]
+    # Reads that may be served slightly stale from the read replica
+    replica_actions = {'list', 'retrieve', 'stats'}
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.action_map.get(request.method.lower()) not in self.replica_actions:
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads(request):
+            return super().dispatch(request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -59,61 +94,89 @@ class ProductViewSet(viewsets.ModelViewSet):
         if status_param:
             queryset = queryset.filter(status=status_param)
         
-        # Search filter
+        # Search filter, ranked by relevance
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(bot_username__icontains=search) |
-                Q(customer_telegram__icontains=search)
-            )
+            queryset = search_products(queryset, search)
         
         return queryset
 
     def list(self, request, *args, **kwargs):
+        # Revalidations get an empty 304 before the page is queried
+        etag = list_etag(request)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
         queryset = self.filter_queryset(self.get_queryset())
-        
+
+        fields = requested_fields(request, self.get_serializer_class())
+        if settings.PRODUCT_FAST_READ_PATH:
+            # Serialize values() rows with precompiled converters instead of model instances
+            rows = RowSerializer(self.get_serializer_class(), fields)
+            queryset = queryset.values(*self.selected_columns(rows.sources))
+            serialize = rows.many
+        else:
+            if fields is not None:
+                queryset = queryset.only(*self.selected_columns(fields))
+            serialize = lambda objects: self.get_serializer(objects, many=True, fields=fields).data
+
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-            # Transform response to match FastAPI format
-            return Response({
-                'total': response.data['count'],
-                'page': int(request.query_params.get('page', 1)),
-                'per_page': len(serializer.data),
-                'products': serializer.data
-            })
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+            # Paginator responds in the FastAPI-compatible {total, page, per_page, products} shape
+            response = self.get_paginated_response(serialize(page))
+        else:
+            response = Response(serialize(queryset))
+        return set_validators(response, etag)
+
+    def selected_columns(self, fields):
+        """Columns to SELECT for ``fields``, plus the keys cursor pagination seeks on."""
+        return list(dict.fromkeys([*fields, *self.paginator.cursor_fields]))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            last_modified = (
+                self.get_queryset().filter(pk=kwargs['pk'])
+                .values_list('updated_at', flat=True).first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            last_modified = None
+        if last_modified is None:
+            # Let get_object() raise the usual 404 (or reject a malformed id)
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag(kwargs['pk'], request.accepted_media_type, last_modified.isoformat())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get dashboard statistics."""
-        now = datetime.utcnow()
-        seven_days = now + timedelta(days=7)
-        thirty_days = now + timedelta(days=30)
-
-        stats = {
-            'total_products': Product.objects.count(),
-            'active_products': Product.objects.filter(status=ProductStatus.ACTIVE).count(),
-            'expired_products': Product.objects.filter(status=ProductStatus.EXPIRED).count(),
-            'expiring_in_7_days': Product.objects.filter(
-                contract_end_date__lte=seven_days,
-                contract_end_date__gte=now,
-                status__in=[ProductStatus.ACTIVE, ProductStatus.EXPIRING_SOON]
-            ).count(),
-            'expiring_in_30_days': Product.objects.filter(
-                contract_end_date__lte=thirty_days,
-                contract_end_date__gte=now,
-                status__in=[ProductStatus.ACTIVE, ProductStatus.EXPIRING_SOON]
-            ).count(),
-        }
-
-        serializer = DashboardStatsSerializer(stats)
-        return Response(serializer.data)
+        stats = get_dashboard_stats()
+        # Stats also move with the clock, so validate on the values themselves
+        etag = make_etag(request.accepted_media_type, *sorted(stats.items()))
+        response = not_modified(request, etag)
+        if response is None:
+            response = Response(DashboardStatsSerializer(stats).data)
+        return set_validators(response, etag)
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """Contracts, expirations and renewal rates per customer and per end month."""
+        serializer = ContractAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        rollups = ContractRollup.objects.all()
+        if 'customer_telegram' in params:
+            rollups = rollups.filter(customer_telegram=params['customer_telegram'])
+        if 'from_month' in params:
+            rollups = rollups.filter(month__gte=params['from_month'])
+        if 'to_month' in params:
+            rollups = rollups.filter(month__lte=params['to_month'])
+        return Response(contract_analytics(rollups))
 
     @action(detail=True, methods=['post'])
     def renew(self, request, pk=None):
@@ -144,3 +207,92 @@ class ProductViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(product)
         return Response(serializer.data)
+
+    def get_batch_selection(self, serializer_class):
+        serializer = serializer_class(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = select_products(Product.objects.all(), data.get('ids'), data.get('filter'))
+        return queryset, data
+
+    @action(detail=False, methods=['post'], url_path='batch/renew')
+    def batch_renew(self, request):
+        """Renew every selected product in one UPDATE."""
+        queryset, data = self.get_batch_selection(BatchRenewSerializer)
+        return Response({'updated': renew_products(queryset, data['months'])})
+
+    @action(detail=False, methods=['post'], url_path='batch/patch')
+    def batch_patch(self, request):
+        """Apply the same field changes to every selected product in one UPDATE."""
+        queryset, data = self.get_batch_selection(BatchPatchSerializer)
+        return Response({'updated': patch_products(queryset, data['changes'])})
+
+    @action(detail=False, methods=['post'], url_path='batch/delete')
+    def batch_delete(self, request):
+        """Delete every selected product in one DELETE."""
+        queryset, data = self.get_batch_selection(BatchSelectionSerializer)
+        return Response({'deleted': delete_products(queryset)})
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_products(self, request):
+        """Bulk import products from a JSON array, NDJSON or CSV body."""
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type in CSV_CONTENT_TYPES:
+            rows = iter_csv_rows(request._request)
+        elif content_type in NDJSON_CONTENT_TYPES:
+            rows = iter_ndjson_rows(request._request)
+        else:
+            rows = request.data
+            if not isinstance(rows, list):
+                return Response(
+                    {'detail': 'Expected a list of products'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        result = import_products(rows)
+        if result['created']:
+            response_status = status.HTTP_201_CREATED
+        elif result['failed']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(result, status=response_status)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream all products matching the list filters as CSV or NDJSON."""
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response(
+                {'detail': 'output must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        content_type = 'text/csv' if output == 'csv' else 'application/x-ndjson'
+        # Each handler can only stream its own kind of iterator without buffering it all
+        export = aexport_products if isinstance(request._request, ASGIRequest) else export_products
+        response = StreamingHttpResponse(
+            export(self.get_queryset(), output),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{output}"'
+        return response
+
+
+class ProductEventsView(View):
+    """Server-Sent Events stream of product changes and dashboard stats."""
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            # A WSGI worker would buffer the endless stream and tie up a thread
+            return JsonResponse(
+                {'detail': 'Live events require the ASGI server'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        response = StreamingHttpResponse(
+            sse_stream(settings.PRODUCT_EVENTS_HEARTBEAT),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
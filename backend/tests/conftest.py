@@ -1,6 +1,41 @@
 import pytest
 
+from phone_registry.stub import StubRegistry
+
 
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def registry(settings):
+    from phone_registry.cache import reset_check_cache
+    from phone_registry.client import registry_client
+    from phone_registry.coalesce import reset_coalescing
+    from phone_registry.mirror import reset_mirror
+    from phone_registry.resilience import reset_resilience
+
+    def reset():
+        reset_check_cache()
+        reset_coalescing()
+        reset_resilience()
+        reset_mirror()
+
+    reset()
+    # The mirror lives in the database; tests that exercise it turn it back on
+    settings.PHONE_MIRROR_ENABLED = False
+    with StubRegistry() as stub:
+        settings.PHONE_REGISTRY_URL = stub.url
+        yield stub
+    # Drop pooled connections to this stub so the next test starts clean
+    registry_client.close()
+    reset()
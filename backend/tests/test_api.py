@@ -21,3 +21,105 @@ def test_products_list():
     data = response.json()
     assert 'total' in data
     assert 'products' in data
+
+
+@pytest.mark.django_db
+def test_products_stats_single_query_and_invalidation(django_assert_num_queries):
+    """Stats are computed in one query, cached, and refreshed on product save."""
+    from datetime import timedelta
+    from django.utils import timezone
+    from products.models import Product
+
+    now = timezone.now()
+    Product.objects.create(name='Active', contract_months=3, contract_start_date=now)
+    Product.objects.create(
+        name='Expired', contract_months=1,
+        contract_start_date=now - timedelta(days=60),
+        contract_end_date=now - timedelta(days=30),
+    )
+
+    client = Client()
+    with django_assert_num_queries(1):
+        response = client.get('/api/products/stats/')
+    assert response.json() == {
+        'total_products': 2,
+        'active_products': 1,
+        'expired_products': 1,
+        'expiring_in_7_days': 0,
+        'expiring_in_30_days': 0,
+    }
+
+    with django_assert_num_queries(0):
+        client.get('/api/products/stats/')
+
+    Product.objects.create(
+        name='Soon', contract_months=1,
+        contract_start_date=now - timedelta(days=27),
+    )
+    data = client.get('/api/products/stats/').json()
+    assert data['total_products'] == 3
+    assert data['expiring_in_7_days'] == 1
+
+
+@pytest.mark.django_db
+def test_products_cursor_pagination():
+    """Cursor mode walks every row exactly once and keeps the legacy response keys."""
+    from django.utils import timezone
+    from products.models import Product
+
+    now = timezone.now()
+    for i in range(5):
+        Product.objects.create(name=f'Bot {i}', contract_months=1, contract_start_date=now)
+
+    client = Client()
+    seen = []
+    url = '/api/products/?cursor=&per_page=2&count=exact'
+    pages = 0
+    while url:
+        data = client.get(url).json()
+        pages += 1
+        assert data['total'] == 5
+        assert data['page'] == pages
+        seen.extend(product['name'] for product in data['products'])
+        url = data['next_cursor'] and f"/api/products/?cursor={data['next_cursor']}&per_page=2&count=exact"
+
+    assert pages == 3
+    assert seen == [f'Bot {i}' for i in reversed(range(5))]
+    assert client.get('/api/products/?cursor=bogus').status_code == 404
+    # Well-formed JSON with the wrong types is just as invalid
+    import base64
+    wrong_types = base64.urlsafe_b64encode(b'[1,"2024-01-01T00:00:00+00:00",5]').decode()
+    response = client.get(f'/api/products/?cursor={wrong_types}')
+    assert (response.status_code, response.json()['detail']) == (404, 'Invalid cursor.')
+
+
+@pytest.mark.django_db
+def test_products_conditional_get(django_assert_num_queries):
+    """Unchanged product reads revalidate with a 304 and change after a write."""
+    from django.utils import timezone
+    from products.models import Product
+
+    product = Product.objects.create(name='Bot', contract_months=1, contract_start_date=timezone.now())
+    client = Client()
+
+    for url in ('/api/products/', f'/api/products/{product.id}/', '/api/products/stats/'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert 'private' in response['Cache-Control']
+        etag = response['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    response = client.get(f'/api/products/{product.id}/')
+    last_modified = response['Last-Modified']
+    assert client.get(f'/api/products/{product.id}/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    list_etag = client.get('/api/products/')['ETag']
+    # Lists revalidate without touching the database
+    with django_assert_num_queries(0):
+        assert client.get('/api/products/', HTTP_IF_NONE_MATCH=list_etag).status_code == 304
+    product.name = 'Renamed'
+    product.save()
+    response = client.get('/api/products/', HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == 200
+    assert response.json()['products'][0]['name'] == 'Renamed'
+    assert client.get('/api/products/not-a-uuid/').status_code == 404
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from products.models import Product, ProductStatus
+
+
+def make_product(name, end_offset_days, customer='@alice'):
+    now = timezone.now()
+    return Product.objects.create(
+        name=name, contract_months=1, customer_telegram=customer,
+        contract_start_date=now - timedelta(days=30),
+        contract_end_date=now + timedelta(days=end_offset_days),
+    )
+
+
+@pytest.mark.django_db
+def test_batch_renew_by_filter_updates_status_in_one_statement():
+    """Renewing a customer's products is one UPDATE and keeps status consistent."""
+    expired = make_product('Expired', -40)
+    soon = make_product('Soon', 3)
+    other = make_product('Other', -5, customer='@bob')
+    client = APIClient()
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post('/api/products/batch/renew/', {
+            'months': 1, 'filter': {'customer_telegram': '@alice'},
+        }, format='json')
+
+    assert response.status_code == 200
+    assert response.json() == {'updated': 2}
+    assert len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "products"')]) == 1
+    expired.refresh_from_db()
+    soon.refresh_from_db()
+    other.refresh_from_db()
+    assert expired.status == ProductStatus.EXPIRED
+    assert soon.status == ProductStatus.ACTIVE and soon.is_renewed
+    assert other.status == ProductStatus.EXPIRED and not other.is_renewed
+
+
+@pytest.mark.django_db
+def test_batch_patch_and_delete_by_ids():
+    first = make_product('First', 60)
+    second = make_product('Second', 60)
+    client = APIClient()
+
+    response = client.post('/api/products/batch/patch/', {
+        'ids': [str(first.id), str(second.id)], 'changes': {'customer_link': 'https://t.me/x'},
+    }, format='json')
+    assert response.json() == {'updated': 2}
+    assert set(Product.objects.values_list('customer_link', flat=True)) == {'https://t.me/x'}
+
+    response = client.post('/api/products/batch/patch/', {
+        'ids': [str(first.id)], 'changes': {'contract_months': 3},
+    }, format='json')
+    assert response.status_code == 400
+    for changes in ({'customer_telegarm': '@typo'}, {}):
+        response = client.post('/api/products/batch/patch/', {'ids': [str(first.id)], 'changes': changes}, format='json')
+        assert response.status_code == 400
+
+    response = client.post('/api/products/batch/delete/', {'ids': [str(first.id)]}, format='json')
+    assert response.json() == {'deleted': 1}
+    assert list(Product.objects.values_list('id', flat=True)) == [second.id]
+
+    assert client.post('/api/products/batch/delete/', {}, format='json').status_code == 400
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from django.test import Client
+
+from products.models import Product, ProductStatus
+
+
+@pytest.mark.django_db
+def test_import_csv_creates_valid_rows_and_reports_errors():
+    body = (
+        'name,contract_months,contract_start_date,customer_telegram\n'
+        'Weather Bot,3,2020-01-01T00:00:00Z,@alice\n'
+        'Broken Bot,13,2020-01-01T00:00:00Z,\n'
+        'Shop Bot,12,2999-01-01T00:00:00Z,\n'
+    )
+    response = Client().post('/api/products/import/', body, content_type='text/csv')
+
+    assert response.status_code == 201
+    data = response.json()
+    assert (data['created'], data['failed']) == (2, 1)
+    assert data['errors'][0]['row'] == 2
+    assert 'contract_months' in data['errors'][0]['errors']
+
+    weather = Product.objects.get(name='Weather Bot')
+    assert weather.status == ProductStatus.EXPIRED
+    assert (weather.contract_end_date - weather.contract_start_date).days == 90
+    assert Product.objects.get(name='Shop Bot').customer_telegram is None
+
+
+@pytest.mark.django_db
+def test_export_streams_ndjson_matching_serializer_output():
+    client = Client()
+    rows = '\n'.join(json.dumps({
+        'name': f'Bot {i}', 'contract_months': 1, 'contract_start_date': '2030-01-01T00:00:00Z',
+    }) for i in range(3))
+    client.post('/api/products/import/', rows, content_type='application/x-ndjson')
+
+    response = client.get('/api/products/export/?output=ndjson')
+    assert response.status_code == 200
+    exported = [json.loads(line) for line in b''.join(response).splitlines()]
+
+    listed = client.get('/api/products/').json()['products']
+    assert sorted(exported, key=lambda p: p['id']) == sorted(listed, key=lambda p: p['id'])
+
+    response = client.get('/api/products/export/?output=csv')
+    lines = b''.join(response).decode().splitlines()
+    assert lines[0].startswith('id,name,description')
+    assert len(lines) == 4
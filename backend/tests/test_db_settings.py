@@ -0,0 +1,36 @@
+import runpy
+from pathlib import Path
+
+import dashboard
+
+SETTINGS_FILE = Path(dashboard.__file__).with_name('settings.py')
+
+
+def load_settings(monkeypatch, **env):
+    monkeypatch.setenv('USE_SQLITE', 'false')
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(SETTINGS_FILE))
+
+
+def test_pool_is_sized_from_worker_count(monkeypatch):
+    """Each worker's pool gets an equal share of DB_MAX_CONNECTIONS; pooling turns CONN_MAX_AGE off."""
+    settings = load_settings(monkeypatch, DB_POOL='true', API_WORKERS='8', DB_MAX_CONNECTIONS='40')
+    database = settings['DATABASES']['default']
+
+    assert database['CONN_MAX_AGE'] == 0
+    assert database['CONN_HEALTH_CHECKS'] is True
+    assert database['OPTIONS']['pool']['max_size'] == 5
+    assert database['OPTIONS']['pool']['min_size'] == 2
+
+
+def test_persistent_connections_without_pool(monkeypatch):
+    # Off by default: under ASGI they would never be reused
+    monkeypatch.delenv('DB_CONN_MAX_AGE', raising=False)
+    assert load_settings(monkeypatch, DB_POOL='false')['DATABASES']['default']['CONN_MAX_AGE'] == 0
+
+    settings = load_settings(monkeypatch, DB_POOL='false', DB_CONN_MAX_AGE='120')
+    database = settings['DATABASES']['default']
+
+    assert database['CONN_MAX_AGE'] == 120
+    assert 'pool' not in database.get('OPTIONS', {})
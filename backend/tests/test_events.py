@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from django.utils import timezone
+
+from dashboard.asgi import application
+from products import events
+from products.models import Product
+
+
+@pytest.fixture
+def memory_events(settings):
+    settings.PRODUCT_EVENTS_BACKEND = 'memory'
+    events.reset_channel_layer()
+    events.broker.stats_debounce = 0
+    events.broker.last_stats = None
+    yield events.broker
+    events.broker.stats_debounce = 0.5
+    events.broker.subscribers.clear()
+    events.reset_channel_layer()
+
+
+async def next_ws_event(outbox):
+    message = await asyncio.wait_for(outbox.get(), 5)
+    return json.loads(message['text'])
+
+
+@pytest.mark.anyio
+@pytest.mark.django_db(transaction=True)
+async def test_one_change_fans_out_to_websocket_and_sse_subscribers(memory_events):
+    inbox, outbox = asyncio.Queue(), asyncio.Queue()
+    await inbox.put({'type': 'websocket.connect'})
+    scope = {'type': 'websocket', 'path': '/api/products/events/ws'}
+    websocket = asyncio.ensure_future(application(scope, inbox.get, outbox.put))
+    assert (await outbox.get())['type'] == 'websocket.accept'
+    assert (await next_ws_event(outbox))['stats']['total_products'] == 0
+
+    response = await AsyncClient().get('/api/products/events/')
+    assert response['Content-Type'] == 'text/event-stream'
+    stream = response.streaming_content
+    assert (await anext(stream)).startswith(b'event: stats\n')
+    assert len(memory_events.subscribers) == 2
+
+    product = await sync_to_async(Product.objects.create)(
+        name='Bot', contract_months=3, contract_start_date=timezone.now(),
+    )
+
+    saved = await next_ws_event(outbox)
+    assert saved == {'type': 'product.saved', 'id': str(product.pk), 'created': True, 'status': 'Active'}
+    chunk = await asyncio.wait_for(anext(stream), 5)
+    assert chunk.startswith(b'event: product.saved\n')
+    stats = await next_ws_event(outbox)
+    assert stats['type'] == 'stats'
+    assert stats['delta'] == {'total_products': 1, 'active_products': 1}
+
+    await inbox.put({'type': 'websocket.disconnect'})
+    await asyncio.wait_for(websocket, 5)
+    assert len(memory_events.subscribers) == 1
+    await stream.aclose()
@@ -0,0 +1,53 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['', '?per_page=2', '?cursor=&per_page=2', '?search=bot', '?status=Active'])
+def test_fast_read_path_is_byte_compatible(settings, query):
+    """values() rows rendered with orjson match ProductSerializer + JSONRenderer exactly."""
+    now = timezone.now().replace(microsecond=0)
+    Product.objects.create(
+        name='Bot \u2028\u2029 "quoted" é\U0001F600', description='line\nbreak\t\x01',
+        bot_username='@bot_one', contract_months=3, contract_start_date=now,
+        customer_telegram=None,
+    )
+    Product.objects.create(
+        name='Second bot', contract_months=1, contract_start_date=now - timedelta(days=40, microseconds=123),
+        website_link='https://example.com/?a=1&b=</script>',
+    )
+    Product.objects.create(name='Third', contract_months=12, contract_start_date=now)
+    client = Client()
+
+    settings.PRODUCT_FAST_READ_PATH = True
+    fast = client.get(f'/api/products/{query}')
+    settings.PRODUCT_FAST_READ_PATH = False
+    slow = client.get(f'/api/products/{query}')
+
+    assert fast.status_code == 200
+    assert fast.content == slow.content
+    assert fast.content == JSONRenderer().render(json.loads(slow.content))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('fast_path', [True, False])
+def test_sparse_fieldsets_narrow_select_and_output(settings, fast_path):
+    settings.PRODUCT_FAST_READ_PATH = fast_path
+    Product.objects.create(name='Bot', description='x' * 1000, contract_months=1, contract_start_date=timezone.now())
+    client = Client()
+
+    with CaptureQueriesContext(connection) as ctx:
+        data = client.get('/api/products/?cursor=&fields=summary&exclude=customer_telegram').json()
+    assert list(data['products'][0]) == ['id', 'name', 'contract_end_date', 'status']
+    assert not any('"description"' in query['sql'] for query in ctx.captured_queries)
+
+    assert client.get('/api/products/?fields=name,bogus').status_code == 400
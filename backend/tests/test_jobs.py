@@ -0,0 +1,90 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import Client
+from django.utils import timezone
+
+from jobs.models import Job, JobStatus
+from jobs.queue import Retry, claim, enqueue, enqueue_periodic, handlers, job, requeue_expired, run_job
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cleanup_returns_202_and_worker_runs_it(registry):
+    """Cleanup is queued, run by the worker command, and pollable at /api/jobs/{id}."""
+    registry.numbers['+15550001'] = (timezone.now() - timedelta(days=200)).isoformat()
+    client = Client()
+
+    response = client.delete('/api/phone/cleanup?days=90')
+    assert response.status_code == 202
+    body = response.json()
+    assert response['Location'] == body['status_url'] == f"/api/jobs/{body['job_id']}"
+    assert client.get(body['status_url']).json()['status'] == JobStatus.QUEUED
+
+    call_command('run_jobs', '--once', '--no-schedule', stdout=StringIO())
+
+    polled = client.get(body['status_url']).json()
+    assert polled['status'] == JobStatus.SUCCEEDED
+    assert polled['result'] == {'deleted': 1}
+    assert polled['attempts'] == 1
+
+
+@pytest.mark.django_db
+def test_claims_are_exclusive_and_failures_retry(settings):
+    settings.JOB_RETRY_BACKOFF = 0
+    calls = []
+
+    @job('tests.flaky')
+    def flaky(value):
+        calls.append(value)
+        if len(calls) == 1:
+            raise Retry('not yet', delay=0)
+        return {'value': value}
+
+    try:
+        queued = enqueue('tests.flaky', {'value': 7}, max_attempts=2)
+        first = claim('worker-a')
+        assert first.pk == queued.pk and first.attempts == 1
+        assert claim('worker-b') is None
+
+        run_job(first)
+        assert Job.objects.get(pk=queued.pk).status == JobStatus.QUEUED
+        run_job(claim('worker-b'))
+        finished = Job.objects.get(pk=queued.pk)
+        assert (finished.status, finished.result, finished.attempts) == (JobStatus.SUCCEEDED, {'value': 7}, 2)
+
+        # A worker that dies mid-job loses its lease and the job goes back to the queue
+        enqueue('tests.flaky', {'value': 8})
+        claim('worker-c')
+        assert requeue_expired(now=timezone.now() + timedelta(seconds=settings.JOB_LEASE_SECONDS + 1)) == 1
+        assert Job.objects.filter(status=JobStatus.QUEUED).count() == 1
+
+        # ...unless that was its last attempt
+        Job.objects.all().delete()
+        last = enqueue('tests.flaky', {'value': 9}, max_attempts=1)
+        claim('worker-d')
+        assert requeue_expired(now=timezone.now() + timedelta(seconds=settings.JOB_LEASE_SECONDS + 1)) == 1
+        assert Job.objects.get(pk=last.pk).status == JobStatus.FAILED
+    finally:
+        handlers.pop('tests.flaky')
+
+
+@pytest.mark.django_db
+def test_periodic_jobs_queue_once():
+    @job('tests.periodic')
+    def periodic():
+        return None
+
+    try:
+        assert len(enqueue_periodic({'tests.periodic': 60})) == 1
+        assert enqueue_periodic({'tests.periodic': 60}) == []
+        # A worker that raced past the checks is stopped by the constraint
+        with pytest.raises(IntegrityError), transaction.atomic():
+            enqueue('tests.periodic', periodic=True)
+        # Request-queued jobs of the same kind are not limited
+        enqueue('tests.periodic')
+        assert Job.objects.filter(kind='tests.periodic').count() == 2
+    finally:
+        handlers.pop('tests.periodic')
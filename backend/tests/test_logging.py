@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import sys
+
+from dashboard.logs import JSONFormatter, QueueLogHandler, SamplingFilter, SharedRotatingFileHandler
+
+
+def make_record(name='products', level=logging.INFO, msg='hello %s', args=('world',), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_queue_handler_writes_json_lines_off_thread(tmp_path):
+    """Records are formatted by the listener with extras and exceptions as JSON fields."""
+    path = tmp_path / 'app.log'
+    handler = QueueLogHandler(str(path), console=False)
+    handler.setFormatter(JSONFormatter())
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        failed = logging.LogRecord('jobs', logging.ERROR, __file__, 1, 'job %s failed', ('42',), sys.exc_info())
+    handler.handle(make_record(status_code=404))
+    handler.handle(failed)
+    handler.close()
+
+    first, second = [json.loads(line) for line in path.read_text().splitlines()]
+    assert first['message'] == 'hello world'
+    assert first['status_code'] == 404
+    assert second['level'] == 'ERROR' and second['message'] == 'job 42 failed'
+    assert 'ValueError: boom' in second['exc']
+
+
+def test_queue_handler_drops_instead_of_blocking(tmp_path):
+    handler = QueueLogHandler(str(tmp_path / 'app.log'), console=False, queue_size=1)
+    handler.listener.stop()
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.dropped == 1
+    handler.listener = None
+    handler.close()
+
+
+def test_sampling_keeps_errors_and_every_nth_record():
+    sampler = SamplingFilter({'django.server': 0.25, 'noisy': 0})
+    kept = [sampler.filter(make_record('django.server')) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert sampler.filter(make_record('django.server', logging.ERROR))
+    assert not sampler.filter(make_record('noisy.child'))
+    assert sampler.filter(make_record('products'))
+
+
+def test_rotation_is_shared_between_processes(tmp_path):
+    """A handler notices another process's rotation and writes to the new file."""
+    path = str(tmp_path / 'app.log')
+    first = SharedRotatingFileHandler(path, max_bytes=200, backup_count=2)
+    second = SharedRotatingFileHandler(path, max_bytes=200, backup_count=2)
+    for i in range(12):
+        (first if i % 2 else second).handle(make_record(msg='line %02d ' + 'x' * 40, args=(i,)))
+    first.close()
+    second.close()
+
+    files = sorted(os.listdir(tmp_path))
+    assert files == ['app.log', 'app.log.1', 'app.log.2', 'app.log.lock']
+    lines = [line for name in ('app.log.2', 'app.log.1', 'app.log') for line in open(tmp_path / name)]
+    assert all(os.path.getsize(tmp_path / name) <= 200 for name in files)
+    # Nothing was interleaved into a rotated-away file after its rotation
+    assert [int(line.split()[1]) for line in lines] == sorted(int(line.split()[1]) for line in lines)
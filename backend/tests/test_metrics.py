@@ -0,0 +1,41 @@
+import pytest
+from django.test import Client
+
+from dashboard.metrics import REQUEST_QUERIES, UPSTREAM_DURATION, render_metrics
+
+
+@pytest.mark.django_db
+def test_server_timing_and_route_metrics():
+    """Requests report their DB work in Server-Timing and under their URL pattern."""
+    client = Client()
+    response = client.get('/api/products/stats/')
+    assert response.status_code == 200
+    timing = response['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'db;dur=' in timing and 'queries"' in timing
+
+    route = response.wsgi_request.resolver_match.route
+    series = REQUEST_QUERIES._values[('GET', route)]
+    assert series[-1] >= 1
+
+    body = client.get('/api/metrics').content.decode()
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert f'http_requests_total{{method="GET",route="{route}",status="200"}}' in body
+
+
+@pytest.mark.django_db
+def test_registry_calls_are_timed(registry):
+    """Outbound registry calls made on the registry loop count toward the request."""
+    before = UPSTREAM_DURATION._values.get(('POST', '/api/phone/register', '201'), [0])[-1]
+    response = Client().post(
+        '/api/phone/register', {'phone_number': '+15550042'}, content_type='application/json'
+    )
+    assert response.status_code == 201
+    assert 'registry;dur=' in response['Server-Timing']
+    assert UPSTREAM_DURATION._values[('POST', '/api/phone/register', '201')][-1] == before + 1
+    assert 'phone_registry_request_duration_seconds_bucket{method="POST"' in render_metrics()
+
+
+def test_metrics_can_be_disabled(settings):
+    settings.METRICS_ENABLED = False
+    assert Client().get('/api/metrics').status_code == 404
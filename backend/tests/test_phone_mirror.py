@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import Client
+
+from phone_registry.mirror import get_mirror, normalize_e164
+from phone_registry.models import RegisteredPhone
+from phone_registry.services import PhoneRegistryService
+
+
+@pytest.fixture
+def mirror(registry, settings):
+    settings.PHONE_MIRROR_ENABLED = True
+    settings.PHONE_MIRROR_REFRESH_INTERVAL = 0
+    return registry
+
+
+def check(client, phone_number):
+    return client.post('/api/phone/check', {'phone_number': phone_number}, content_type='application/json').json()
+
+
+def test_normalize_e164(settings):
+    assert normalize_e164('+1 (555) 000-1234') == '+15550001234'
+    assert normalize_e164('0044 20 7946 0958') == '+442079460958'
+    assert normalize_e164('020 7946 0958') is None
+    assert normalize_e164('+0123') is None
+
+    settings.PHONE_DEFAULT_COUNTRY_CODE = '44'
+    assert normalize_e164('020 7946 0958') == '+442079460958'
+
+
+@pytest.mark.django_db
+def test_registered_numbers_are_answered_locally(mirror):
+    """Numbers we register are stored in E.164 form and checked without calling the registry."""
+    client = Client()
+    client.post('/api/phone/register', {'phone_number': '+1 555 000 2001'}, content_type='application/json')
+
+    assert RegisteredPhone.objects.filter(phone_number='+15550002001').exists()
+    result = check(client, '+1-555-000-2001')
+    assert result['exists'] is True
+    assert result['registered_at']
+
+    # Without a full sync, a number missing from the mirror still goes upstream
+    assert check(client, '+15550002002')['exists'] is False
+    assert mirror.requests['/api/phone/check'] == 1
+
+
+@pytest.mark.django_db
+def test_delta_sync_answers_unregistered_numbers_locally(mirror):
+    """After a full sync, misses are answered in-process and deletions in the feed are applied."""
+    for number in ('+15550003001', '+15550003002'):
+        mirror.register(number)
+    result = async_to_sync(PhoneRegistryService().sync_mirror)()
+    assert (result['upserted'], result['cursor']) == (2, '2')
+
+    client = Client()
+    assert check(client, '+15550003001')['exists'] is True
+    assert check(client, '+15550003999')['exists'] is False
+    assert '/api/phone/check' not in mirror.requests
+
+    # The registry's cleanup drops a number; the next sync removes it here too
+    mirror.numbers['+15550003002'] = datetime(2020, 1, 1, tzinfo=timezone.utc).isoformat()
+    mirror.cleanup(90)
+    assert async_to_sync(PhoneRegistryService().sync_mirror)()['deleted'] == 1
+    assert check(client, '+15550003002')['exists'] is False
+    assert '/api/phone/check' not in mirror.requests
+
+    stats = client.get('/api/phone/cache').json()['mirror']
+    assert (stats['hits'], stats['negatives'], stats['filtered']) == (1, 2, 1)
+    assert stats['complete'] is True
+
+
+@pytest.mark.django_db
+def test_misses_wait_for_rows_other_workers_wrote(mirror, settings, django_assert_num_queries):
+    """A filter miss is rechecked against the table before a number is reported unregistered."""
+    settings.PHONE_MIRROR_REFRESH_INTERVAL = 60
+    settings.PHONE_MIRROR_CURRENT_TTL = 0
+    async_to_sync(PhoneRegistryService().sync_mirror)()
+    client = Client()
+    assert check(client, '+15550004001')['exists'] is False
+
+    # Written by another process; this worker's filter is not due for a refresh
+    RegisteredPhone.objects.create(phone_number='+15550004002', registered_at=datetime.now(timezone.utc))
+    assert check(client, '+15550004002')['exists'] is True
+    assert '/api/phone/check' not in mirror.requests
+
+    # Within the TTL, misses are answered without touching the database
+    settings.PHONE_MIRROR_CURRENT_TTL = 60
+    phone_mirror = get_mirror()
+    assert async_to_sync(phone_mirror.check)('+15550004003')['exists'] is False
+    with django_assert_num_queries(0):
+        assert async_to_sync(phone_mirror.check)('+15550004004')['exists'] is False
+
+
+@pytest.mark.django_db
+def test_positive_rows_age_out_without_sync(mirror, settings):
+    """Without a fresh sync, old rows are rechecked upstream and dropped when the registry lost them."""
+    settings.PHONE_CHECK_CACHE_BACKEND = 'none'
+    client = Client()
+    client.post('/api/phone/register', {'phone_number': '+15550005001'}, content_type='application/json')
+    RegisteredPhone.objects.update(updated_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+    del mirror.numbers['+15550005001']
+
+    assert check(client, '+15550005001')['exists'] is False
+    assert mirror.requests['/api/phone/check'] == 1
+    assert not RegisteredPhone.objects.exists()
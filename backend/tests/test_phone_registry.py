@@ -0,0 +1,273 @@
+import pytest
+from django.test import Client
+
+
+def test_register_then_check_reuses_pooled_connection(registry):
+    """Registry calls go through the shared client and keep the connection alive."""
+    from phone_registry.client import registry_client
+
+    client = Client()
+    response = client.post(
+        '/api/phone/register', {'phone_number': '+15550001'}, content_type='application/json'
+    )
+    assert response.status_code == 201
+
+    response = client.post(
+        '/api/phone/check', {'phone_number': '+15550001'}, content_type='application/json'
+    )
+    assert response.status_code == 200
+    assert response.json()['exists'] is True
+
+    pool = registry_client.client._transport._pool
+    assert len(pool.connections) == 1
+
+
+@pytest.mark.anyio
+async def test_phone_views_are_async_native(registry):
+    """Phone endpoints run on the event loop without an async_to_sync bridge."""
+    import asyncio
+    from django.test import AsyncClient
+    from phone_registry.views import PhoneCheckView
+
+    assert PhoneCheckView.view_is_async
+
+    client = AsyncClient()
+    responses = await asyncio.gather(*(
+        client.post('/api/phone/check', {'phone_number': f'+1555000{i}'}, content_type='application/json')
+        for i in range(5)
+    ))
+    assert [response.status_code for response in responses] == [200] * 5
+
+    response = await client.post('/api/phone/check', 'not json', content_type='application/json')
+    assert response.status_code == 400
+    response = await client.post('/api/phone/check', {}, content_type='application/json')
+    assert response.json() == {'phone_number': ['This field is required.']}
+
+
+@pytest.mark.anyio
+async def test_bulk_register_stream_chunks_and_reports_progress(registry, settings):
+    """CSV uploads are registered in chunks and each chunk is streamed back as NDJSON."""
+    import json
+    from django.test import AsyncClient
+
+    settings.PHONE_BULK_RETRY_BACKOFF = 0
+    body = 'phone_number\n' + ''.join(f'+1555{i:07d}\n' for i in range(25)) + '+123456789012345678901\n'
+
+    response = await AsyncClient().post(
+        '/api/phone/bulk-register/stream?chunk_size=10&concurrency=2', body, content_type='text/csv'
+    )
+    assert response.status_code == 200
+    content = b''.join([chunk async for chunk in response.streaming_content])
+    lines = [json.loads(line) for line in content.splitlines()]
+
+    chunks, summary = lines[:-1], lines[-1]
+    assert sorted(chunk['size'] for chunk in chunks) == [5, 10, 10]
+    assert summary == {'done': True, 'chunks': 3, 'success': 25, 'failed': 1}
+    assert registry.requests['/api/phone/bulk-register'] == 3
+    assert len(registry.numbers) == 25
+
+
+@pytest.mark.anyio
+async def test_bulk_chunk_retries_with_backoff():
+    """A chunk that fails transiently is retried instead of failing the batch."""
+    from phone_registry.bulk import send_chunk
+
+    import httpx
+
+    class FlakyService:
+        calls = 0
+
+        def __init__(self, status_code=503):
+            self.status_code = status_code
+
+        async def bulk_register_phones(self, numbers):
+            self.calls += 1
+            if self.calls < 3:
+                request = httpx.Request('POST', 'http://registry/api/phone/bulk-register')
+                response = httpx.Response(self.status_code, request=request)
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    raise Exception(f'Failed to bulk register phone numbers: {e}') from e
+            return {'success': len(numbers), 'failed': 0, 'results': []}
+
+    result = await send_chunk(FlakyService(), 0, ['+1', '+2'], [], max_retries=3, backoff=0)
+    assert result['attempts'] == 3
+    assert result['success'] == 2
+
+    result = await send_chunk(FlakyService(), 1, ['+1'], [], max_retries=1, backoff=0)
+    assert result['failed'] == 1
+    assert 'error' in result
+
+    # A rejected chunk would be rejected again, so it is not retried
+    result = await send_chunk(FlakyService(status_code=422), 2, ['+1'], [], max_retries=3, backoff=0)
+    assert (result['attempts'], result['failed']) == (1, 1)
+
+
+def test_check_cache_serves_repeats_and_is_refreshed_by_register(registry):
+    """Repeated checks hit the cache; registering replaces a cached negative answer and cleanup drops positives."""
+    from datetime import datetime, timezone
+    from asgiref.sync import async_to_sync
+    from phone_registry.services import PhoneRegistryService
+
+    client = Client()
+
+    def check():
+        return client.post(
+            '/api/phone/check', {'phone_number': '+15550002'}, content_type='application/json'
+        ).json()
+
+    assert check()['exists'] is False
+    assert check()['exists'] is False
+    assert registry.requests['/api/phone/check'] == 1
+
+    client.post('/api/phone/register', {'phone_number': '+15550002'}, content_type='application/json')
+    assert check()['exists'] is True
+    assert registry.requests['/api/phone/check'] == 1
+
+    stats = client.get('/api/phone/cache').json()
+    assert stats['backend'] == 'memory'
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+    # The registry's cleanup drops the number; its cached positive goes too
+    registry.numbers['+15550002'] = datetime(2020, 1, 1, tzinfo=timezone.utc).isoformat()
+    async_to_sync(PhoneRegistryService().cleanup_old_records)(90)
+    assert check()['exists'] is False
+    assert registry.requests['/api/phone/check'] == 2
+
+
+@pytest.mark.anyio
+async def test_memory_check_cache_ttls_and_lru_eviction():
+    from phone_registry.cache import MemoryCheckCache
+
+    now = [0.0]
+    cache = MemoryCheckCache(ttl=60, negative_ttl=5, max_size=2, clock=lambda: now[0])
+    await cache.set('+1', {'exists': True})
+    await cache.set('+2', {'exists': False})
+
+    now[0] = 10
+    assert await cache.get('+1') == {'exists': True}
+    assert await cache.get('+2') is None
+
+    await cache.set('+3', {'exists': True})
+    await cache.get('+1')
+    await cache.set('+4', {'exists': True})
+    assert await cache.get('+3') is None
+    assert cache.info()['evictions'] == 1
+
+
+@pytest.mark.anyio
+async def test_django_check_cache_clear_bumps_generation():
+    from phone_registry.cache import DjangoCheckCache
+
+    cache = DjangoCheckCache(ttl=60, negative_ttl=5)
+    await cache.set('+1', {'exists': True})
+    assert await cache.get('+1') == {'exists': True}
+    await cache.clear()
+    assert await cache.get('+1') is None
+    await cache.set('+1', {'exists': False})
+    await cache.clear()
+    assert await cache.get('+1') is None
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_checks_share_one_upstream_call(registry):
+    import asyncio
+    from phone_registry.services import PhoneRegistryService
+
+    registry.delay = 0.1
+    service = PhoneRegistryService()
+    results = await asyncio.gather(*(service.check_phone('+15550003') for _ in range(10)))
+
+    assert all(result['phone_number'] == '+15550003' for result in results)
+    assert registry.requests['/api/phone/check'] == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_distinct_checks_are_micro_batched(registry, settings):
+    import asyncio
+    from phone_registry.services import PhoneRegistryService
+
+    settings.PHONE_REGISTRY_BATCH_CHECK_WINDOW_MS = 20
+    registry.register('+15550004')
+    service = PhoneRegistryService()
+    numbers = [f'+1555000{i}' for i in range(4, 9)]
+    results = await asyncio.gather(*(service.check_phone(number) for number in numbers))
+
+    assert [result['phone_number'] for result in results] == numbers
+    assert [result['exists'] for result in results] == [True, False, False, False, False]
+    assert registry.requests == {'/api/phone/bulk-check': 1}
+
+
+def test_open_circuit_fails_fast_with_retry_after(registry, settings):
+    """After repeated registry failures views answer 503 without calling upstream."""
+    settings.PHONE_REGISTRY_BREAKER_FAILURE_THRESHOLD = 2
+    registry.failure_rate = 1.0
+    client = Client()
+
+    def check():
+        return client.post('/api/phone/check', {'phone_number': '+15550009'}, content_type='application/json')
+
+    assert check().status_code == 500
+    assert check().status_code == 500
+    response = check()
+    assert response.status_code == 503
+    assert int(response['Retry-After']) > 0
+    assert registry.requests['/api/phone/check'] == 2
+
+    health = client.get('/api/health').json()
+    assert health['status'] == 'degraded'
+    assert health['phone_registry']['circuit_breaker']['state'] == 'open'
+
+
+def test_circuit_half_open_probe_and_aimd_limit():
+    from phone_registry.resilience import AdaptiveLimiter, CircuitBreaker, CircuitOpenError
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record(False)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 11
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8, latency_target=0.5, clock=lambda: now[0])
+    for _ in range(8):
+        limiter.in_flight += 1
+        limiter.release(0.1, True)
+    assert int(limiter.limit) == 5
+
+    # Slow calls that were in flight together shrink the limit once
+    now[0] = 20
+    for _ in range(5):
+        limiter.in_flight += 1
+        limiter.release(2.0, True)
+    assert int(limiter.limit) == 4
+    now[0] = 23
+    limiter.in_flight += 1
+    limiter.release(2.0, True)
+    assert int(limiter.limit) == 3
+
+
+@pytest.mark.anyio
+async def test_concurrent_checks_over_the_limit_wait_for_a_permit(registry, settings):
+    """A healthy but slow registry gets every call, at most the limit at a time."""
+    import asyncio
+    from phone_registry.resilience import get_limiter
+    from phone_registry.services import PhoneRegistryService
+
+    settings.PHONE_CHECK_CACHE_BACKEND = 'none'
+    settings.PHONE_REGISTRY_LIMIT_INITIAL = 10
+    registry.delay = 0.05
+    service = PhoneRegistryService()
+    numbers = [f'+1555100{i:04d}' for i in range(100)]
+    results = await asyncio.gather(*(service.check_phone(number) for number in numbers))
+
+    assert [result['phone_number'] for result in results] == numbers
+    assert registry.requests['/api/phone/check'] == 100
+    assert get_limiter().info()['rejected'] == 0
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from benchmarks.common import seed_products
+from products.models import Product, ProductStatus
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='asserts SQLite query plans')
+
+
+def query_plan(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def request_plans(url):
+    """Plans of every query a GET of ``url`` runs against the products table."""
+    with CaptureQueriesContext(connection) as ctx:
+        assert Client().get(url).status_code == 200
+    return {
+        query['sql']: query_plan(query['sql'])
+        for query in ctx.captured_queries
+        if 'FROM "products"' in query['sql']
+    }
+
+
+@pytest.mark.django_db
+def test_hot_queries_use_indexes():
+    """List, search, stats and status refresh queries never scan or sort the whole table."""
+    seed_products(100_000)
+
+    plans = {url: request_plans(url) for url in [
+        '/api/products/',
+        '/api/products/?status=Active',
+        '/api/products/?status=ExpiringSoon&cursor=',
+        '/api/products/?search=cosmic_news',
+        '/api/products/stats/',
+    ]}
+    for url, queries in plans.items():
+        assert queries, url
+        for sql, plan in queries.items():
+            assert 'SCAN products' not in plan, (url, sql, plan)
+            if 'search' not in url:
+                assert not any('TEMP B-TREE' in step for step in plan), (url, sql, plan)
+
+    status_list = ' '.join(step for plan in plans['/api/products/?status=Active'].values() for step in plan)
+    assert 'products_status_created_idx' in status_list
+    assert list(plans['/api/products/stats/'].values()) == [
+        ['SCAN products USING COVERING INDEX products_status_end_idx'],
+    ]
+
+    # refresh_statuses' most common transition reads the partial index of live contracts
+    expiring = Product.objects.filter(contract_end_date__lt=timezone.now()).exclude(status=ProductStatus.EXPIRED)
+    sql, params = expiring.order_by().values('pk').query.sql_with_params()
+    assert any('products_live_end_idx' in step for step in query_plan(sql, params))
@@ -0,0 +1,70 @@
+import sqlite3
+from datetime import timedelta
+
+import pytest
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dashboard import replicas
+from products.models import Product
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='copies the SQLite test database')
+
+
+@pytest.fixture(scope='module')
+def replica(tmp_path_factory, django_db_setup, django_db_blocker):
+    """A second SQLite file holding a snapshot of the primary, registered as the replica alias."""
+    target = tmp_path_factory.mktemp('replica') / 'replica.sqlite3'
+    with django_db_blocker.unblock():
+        connection.ensure_connection()
+        destination = sqlite3.connect(target)
+        connection.connection.backup(destination)
+        destination.close()
+
+    connections.settings[replicas.REPLICA] = {**connection.settings_dict, 'NAME': str(target)}
+    yield connections[replicas.REPLICA]
+    connections[replicas.REPLICA].close()
+    del connections[replicas.REPLICA]
+    del connections.settings[replicas.REPLICA]
+
+
+def make_product(name):
+    now = timezone.now()
+    return Product.objects.create(
+        name=name, contract_months=1, contract_start_date=now, contract_end_date=now + timedelta(days=30),
+    )
+
+
+def listed_names(client):
+    return {product['name'] for product in client.get('/api/products/').json()['products']}
+
+
+@pytest.mark.django_db(databases=['default', replicas.REPLICA])
+def test_reads_follow_replica_pin_and_lag(replica, monkeypatch):
+    """Product reads use the replica until the client writes or the replica falls behind."""
+    monkeypatch.setattr(replicas, '_lag_checks', {})
+    make_product('Unreplicated Bot')
+    client = Client()
+
+    with CaptureQueriesContext(replica) as replica_queries:
+        assert 'Unreplicated Bot' not in listed_names(client)
+        assert client.get('/api/products/stats/').json()['total_products'] == 0
+    assert replica_queries.captured_queries
+
+    # The client's own write pins it to the primary for DB_REPLICA_PIN_SECONDS
+    response = client.post('/api/products/', {
+        'name': 'My Bot', 'contract_months': 1, 'contract_start_date': timezone.now().isoformat(),
+    }, content_type='application/json')
+    assert response.status_code == 201
+    assert response.cookies[replicas.PIN_COOKIE]['max-age'] == 10
+    assert {'Unreplicated Bot', 'My Bot'} <= listed_names(client)
+    assert client.get('/api/products/stats/').json()['total_products'] == 2
+    # Writes always go to the primary
+    assert not Product.objects.using(replicas.REPLICA).filter(name='My Bot').exists()
+
+    # Other clients stay on the replica until it lags too far behind
+    assert listed_names(Client()) == set()
+    monkeypatch.setattr(replicas, 'replica_lag', lambda alias=replicas.REPLICA: 30.0)
+    assert {'Unreplicated Bot', 'My Bot'} <= listed_names(Client())
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from products.models import ContractRollup, Product
+from products.rollups import rebuild_rollups
+
+
+def rollup_snapshot():
+    return sorted(ContractRollup.objects.values_list(
+        'customer_telegram', 'month', 'contracts', 'renewed', 'contract_months',
+    ))
+
+
+@pytest.mark.django_db
+def test_rollups_track_every_write_path():
+    """Incremental maintenance always matches a full rebuild."""
+    start = datetime(2026, 1, 10, tzinfo=dt_timezone.utc)
+    client = APIClient()
+    alice = [
+        Product.objects.create(name=f'A{i}', contract_months=1, contract_start_date=start, customer_telegram='@alice')
+        for i in range(3)
+    ]
+    Product.objects.create(name='B', contract_months=2, contract_start_date=start, customer_telegram='@bob')
+    client.post('/api/products/import/', [
+        {'name': 'C', 'contract_months': 1, 'contract_start_date': '2026-03-01T00:00:00Z'},
+    ], format='json')
+
+    product = Product.objects.get(pk=alice[0].pk)
+    product.customer_telegram = '@carol'
+    product.save()
+    client.post(f'/api/products/{alice[1].pk}/renew/?months=1')
+    client.post('/api/products/batch/renew/', {'months': 2, 'filter': {'customer_telegram': '@bob'}}, format='json')
+    client.post('/api/products/batch/patch/', {
+        'ids': [str(alice[2].pk)], 'changes': {'customer_telegram': '@dave'},
+    }, format='json')
+    client.delete(f'/api/products/{alice[0].pk}/')
+    client.post('/api/products/batch/delete/', {'filter': {'customer_telegram': '@dave'}}, format='json')
+
+    incremental = rollup_snapshot()
+    rebuild_rollups()
+    assert incremental == rollup_snapshot()
+    assert all(row[2] > 0 for row in incremental)
+
+    data = client.get('/api/products/analytics/').json()
+    assert data['totals'] == {'contracts': 3, 'renewed': 2, 'contract_months': 4, 'renewal_rate': 0.6667}
+    assert [row['month'] for row in data['by_month']] == ['2026-03', '2026-05']
+    assert [row['customer_telegram'] for row in data['by_customer']] == ['', '@alice', '@bob']
+    filtered = client.get('/api/products/analytics/?customer_telegram=@bob&from_month=2026-05').json()
+    assert filtered['totals']['contracts'] == 1
+
+    out = StringIO()
+    call_command('rebuild_product_rollups', stdout=out)
+    assert 'Rebuilt 3 rollup groups' in out.getvalue()
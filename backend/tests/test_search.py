@@ -0,0 +1,70 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from products.models import Product
+
+
+def create(name, **kwargs):
+    return Product.objects.create(
+        name=name, contract_months=1, contract_start_date=timezone.now(), **kwargs
+    )
+
+
+def search(term):
+    data = Client().get('/api/products/', {'search': term}).json()
+    return [product['name'] for product in data['products']]
+
+
+@pytest.mark.django_db
+def test_search_matches_substrings_across_fields():
+    create('Weather Bot', bot_username='weather_helper')
+    create('Shop Bot', description='Sells weather stations')
+    create('Quiz Bot', customer_telegram='@quizmaster')
+
+    # Name matches rank above description matches, newer products first otherwise
+    assert search('WEATHER') == ['Weather Bot', 'Shop Bot']
+    assert search('quizm') == ['Quiz Bot']
+    # Terms shorter than a trigram fall back to substring filtering
+    assert search('Qu') == ['Quiz Bot']
+
+
+@pytest.mark.django_db
+def test_search_index_follows_updates_and_deletes():
+    product = create('Weather Bot')
+    product.name = 'Trivia Bot'
+    product.save()
+    assert search('weather') == []
+    assert search('trivia') == ['Trivia Bot']
+
+    product.delete()
+    assert search('trivia') == []
+
+
+@pytest.mark.django_db
+def test_rebuild_restores_a_stale_index():
+    create('Weather Bot')
+    # What a bulk load with the triggers dropped leaves behind
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM products_search')
+    assert search('weather') == []
+
+    out = StringIO()
+    call_command('rebuild_product_search', stdout=out)
+    assert 'Rebuilt' in out.getvalue()
+    assert search('weather') == ['Weather Bot']
+
+
+@pytest.mark.django_db
+def test_search_survives_renumbered_rowids():
+    """VACUUM and SQLite table rebuilds renumber the rowids of products; the index does not use them."""
+    create('Weather Bot')
+    create('Trivia Bot')
+    with connection.cursor() as cursor:
+        cursor.execute('UPDATE products SET rowid = rowid + 1000')
+    assert search('weather') == ['Weather Bot']
+    assert search('trivia') == ['Trivia Bot']
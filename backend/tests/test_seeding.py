@@ -0,0 +1,37 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, Sum
+
+from products.models import ContractRollup, Product, ProductStatus
+from products.search import search_products
+
+
+@pytest.mark.django_db
+def test_seed_products_command(settings):
+    """Seeded rows look like real data and derived tables are kept in step."""
+    settings.DEBUG = True
+    call_command('seed_products', count=2000, customers=50, stdout=StringIO())
+
+    assert Product.objects.count() == 2000
+    statuses = dict(Product.objects.values_list('status').annotate(n=Count('pk')).order_by())
+    assert set(statuses) == set(ProductStatus.values)
+    assert Product.objects.values('customer_telegram').distinct().count() <= 50
+    # created_at comes from the generator, not auto_now_add
+    assert Product.objects.values('created_at').distinct().count() > 1000
+    assert ContractRollup.objects.aggregate(total=Sum('contracts'))['total'] == 2000
+
+    # Search structures were rebuilt after the deferred-index load
+    product = Product.objects.order_by('created_at').first()
+    assert product in search_products(Product.objects.all(), product.bot_username)
+
+    call_command('seed_products', count=100, seed=7, clear=True, stdout=StringIO())
+    assert Product.objects.count() == 100
+
+
+def test_seed_products_refuses_outside_development(settings):
+    settings.DEBUG = False
+    with pytest.raises(CommandError):
+        call_command('seed_products', count=1)
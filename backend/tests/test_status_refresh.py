@@ -0,0 +1,34 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from products.models import Product, ProductStatus
+
+
+@pytest.mark.django_db
+def test_refresh_product_statuses_moves_stale_rows():
+    """Rows whose contracts ran out without a save() are moved to the right status."""
+    now = timezone.now()
+    expired = Product.objects.create(
+        name='Expired', contract_months=1,
+        contract_start_date=now - timedelta(days=60),
+        contract_end_date=now - timedelta(days=30),
+    )
+    soon = Product.objects.create(
+        name='Soon', contract_months=1,
+        contract_start_date=now - timedelta(days=27),
+    )
+    active = Product.objects.create(name='Active', contract_months=6, contract_start_date=now)
+    Product.objects.update(status=ProductStatus.ACTIVE)
+
+    out = StringIO()
+    call_command('refresh_product_statuses', stdout=out)
+
+    assert 'Updated 2 products' in out.getvalue()
+    statuses = dict(Product.objects.values_list('id', 'status'))
+    assert statuses[expired.id] == ProductStatus.EXPIRED
+    assert statuses[soon.id] == ProductStatus.EXPIRING_SOON
+    assert statuses[active.id] == ProductStatus.ACTIVE
@@ -84,6 +84,11 @@ cmd_dev() {
     nohup python manage.py runserver 0.0.0.0:8000 > "$LOG_DIR/backend.log" 2>&1 &
     BACKEND_PID=$!
     echo $BACKEND_PID > "$LOG_DIR/backend.pid"
+    
+    # Job worker: cleanup and bulk registration return 202 and run here
+    nohup python manage.py run_jobs > "$LOG_DIR/jobs.log" 2>&1 &
+    JOBS_PID=$!
+    echo $JOBS_PID > "$LOG_DIR/jobs.pid"
     deactivate
     
     # Start Vite frontend in its own process group
@@ -97,6 +102,7 @@ cmd_dev() {
     
     log_success "Development servers started!"
     log_info "Backend: http://localhost:8000 (PID: $BACKEND_PID)"
+    log_info "Job worker: PID $JOBS_PID"
     log_info "Frontend: http://localhost:7082 (PID: $FRONTEND_PID)"
     log_info "Admin: http://localhost:8000/admin"
     log_info ""
@@ -127,15 +133,14 @@ cmd_start() {
     source venv/bin/activate
     python manage.py collectstatic --noinput
     
-    # Start Django with gunicorn (install if needed)
-    if ! command -v gunicorn &> /dev/null; then
-        log_info "Installing gunicorn..."
-        pip install gunicorn
-    fi
-    
-    nohup gunicorn dashboard.wsgi:application --bind 0.0.0.0:8000 --workers 4 > "$LOG_DIR/backend.log" 2>&1 &
+    # Start Django under gunicorn with uvicorn (ASGI) workers
+    nohup gunicorn dashboard.asgi:application -c gunicorn.conf.py > "$LOG_DIR/backend.log" 2>&1 &
     BACKEND_PID=$!
     echo $BACKEND_PID > "$LOG_DIR/backend.pid"
+    
+    # Background job worker: queued cleanup/bulk jobs plus periodic status refreshes
+    nohup python manage.py run_jobs > "$LOG_DIR/jobs.log" 2>&1 &
+    echo $! > "$LOG_DIR/jobs.pid"
     deactivate
     
     sleep 2
@@ -164,6 +169,12 @@ cmd_stop() {
         rm -f "$LOG_DIR/backend.pid"
     fi
     
+    # Stop job worker (SIGTERM lets running jobs finish)
+    if [ -f "$LOG_DIR/jobs.pid" ]; then
+        kill $(cat "$LOG_DIR/jobs.pid") 2>/dev/null && STOPPED=1 || true
+        rm -f "$LOG_DIR/jobs.pid"
+    fi
+    
     # Stop frontend - kill entire process group for proper Vite cleanup
     if [ -f "$LOG_DIR/frontend.pid" ]; then
         FRONTEND_PID=$(cat "$LOG_DIR/frontend.pid")
@@ -181,7 +192,8 @@ cmd_stop() {
     
     # Cleanup any lingering processes
     pkill -f "manage.py runserver" 2>/dev/null && STOPPED=1 || true
-    pkill -f "gunicorn dashboard.wsgi" 2>/dev/null && STOPPED=1 || true
+    pkill -f "gunicorn dashboard" 2>/dev/null && STOPPED=1 || true
+    pkill -f "manage.py run_jobs" 2>/dev/null && STOPPED=1 || true
     pkill -f "vite.*--port.*7082" 2>/dev/null && STOPPED=1 || true
     pkill -f "npm.*run.*dev" 2>/dev/null && STOPPED=1 || true
     
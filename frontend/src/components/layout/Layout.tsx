@@ -1,6 +1,7 @@
 import { Link, useLocation } from 'react-router-dom'
 import { LayoutDashboard, Package, Phone } from 'lucide-react'
 import { cn } from '@/lib/utils'
+import { useProductEvents } from '@/lib/events'
 
 interface LayoutProps {
   children: React.ReactNode
@@ -8,6 +9,7 @@ interface LayoutProps {
 
 export default function Layout({ children }: LayoutProps) {
   const location = useLocation()
+  useProductEvents()
 
   const navigation = [
     { name: 'Dashboard', href: '/', icon: LayoutDashboard },
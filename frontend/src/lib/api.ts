@@ -3,10 +3,16 @@ import { toast } from 'sonner'
 
 // Use relative URL in production, or VITE_API_URL for development
 // When building for production, set VITE_API_URL to empty string or your backend URL
-const API_BASE_URL = import.meta.env.VITE_API_URL || ''
+export const API_BASE_URL = import.meta.env.VITE_API_URL || ''
 
+// Product reads carry ETag/Last-Modified and `Cache-Control: private, max-age=0,
+// must-revalidate`. The browser HTTP cache revalidates them with If-None-Match and
+// turns a 304 into the cached 200 body, so don't set no-store/no-cache request headers here.
+// withCredentials: the API pins a client to the primary database for a few seconds
+// after its own writes with a cookie, so reads right after a change see it.
 export const apiClient = axios.create({
   baseURL: API_BASE_URL,
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -28,11 +34,42 @@ apiClient.interceptors.response.use(
   }
 )
 
+// Poll a background job (202 Accepted responses) until it finishes and return its result.
+// Gives up after maxWaitMs, e.g. when no job worker (manage.py run_jobs) is running.
+async function waitForJob(jobId: string, intervalMs = 1000, maxWaitMs = 5 * 60 * 1000) {
+  const deadline = Date.now() + maxWaitMs
+  for (;;) {
+    const { data: job } = await apiClient.get(`/api/jobs/${jobId}`)
+    if (job.status === 'succeeded') return job.result
+    if (job.status === 'failed') {
+      toast.error(job.error || 'Job failed')
+      throw new Error(job.error || 'Job failed')
+    }
+    if (Date.now() >= deadline) {
+      const message = job.status === 'queued'
+        ? 'Job is still queued; is the job worker (run_jobs) running?'
+        : 'Job is taking too long; check its status later'
+      toast.error(message)
+      throw new Error(`${message} (job ${jobId})`)
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs))
+  }
+}
+
 // API functions
 export const api = {
   // Products
   products: {
-    list: async (params?: { page?: number; per_page?: number; status?: string; search?: string }) => {
+    list: async (params?: {
+      page?: number
+      per_page?: number
+      status?: string
+      search?: string
+      cursor?: string
+      count?: 'exact' | 'estimate' | 'none'
+      fields?: string
+      exclude?: string
+    }) => {
       const response = await apiClient.get('/api/products', { params })
       return response.data
     },
@@ -73,14 +110,22 @@ export const api = {
     },
     bulkRegister: async (phoneNumbers: string[], metadata?: any) => {
       const response = await apiClient.post('/api/phone/bulk-register', { phone_numbers: phoneNumbers, metadata })
-      return response.data
+      return waitForJob(response.data.job_id)
     },
     cleanup: async () => {
       const response = await apiClient.delete('/api/phone/cleanup')
-      return response.data
+      return waitForJob(response.data.job_id)
     },
   },
   
+  // Background jobs
+  jobs: {
+    get: async (id: string) => {
+      const response = await apiClient.get(`/api/jobs/${id}`)
+      return response.data
+    },
+  },
+
   // Health
   health: async () => {
     const response = await apiClient.get('/health')
@@ -0,0 +1,28 @@
+import { useEffect } from 'react'
+import { useQueryClient } from '@tanstack/react-query'
+import { API_BASE_URL } from './api'
+
+const PRODUCT_EVENTS = ['product.saved', 'product.deleted', 'products.changed', 'resync']
+
+// Subscribe to /api/products/events/ (Server-Sent Events) and keep cached
+// queries fresh: stats events replace the dashboard stats in place, and
+// product changes invalidate product listings. One stream per tab replaces polling.
+export function useProductEvents() {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    const source = new EventSource(`${API_BASE_URL}/api/products/events/`, { withCredentials: true })
+
+    source.addEventListener('stats', (event) => {
+      const { stats } = JSON.parse((event as MessageEvent).data)
+      queryClient.setQueryData(['dashboard-stats'], stats)
+    })
+    PRODUCT_EVENTS.forEach((type) =>
+      source.addEventListener(type, () => {
+        queryClient.invalidateQueries({ queryKey: ['products'] })
+      })
+    )
+
+    return () => source.close()
+  }, [queryClient])
+}
@@ -15,7 +15,7 @@ export default function Products() {
 
   const { data, isLoading } = useQuery({
     queryKey: ['products', page],
-    queryFn: () => api.products.list({ page, per_page: 50 }),
+    queryFn: () => api.products.list({ page, per_page: 50, fields: 'table' }),
   })
 
   const deleteMutation = useMutation({